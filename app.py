@@ -2,32 +2,316 @@
 """
 Reddit Moderation Dashboard - Web Interface
 """
-import requests
-from openai import OpenAI
 import os
+
+# Green-thread server mode: SOCKETIO_ASYNC_MODE=gevent must be set in the real
+# environment (not .env) because sockets have to be patched before any other import
+ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading')
+if ASYNC_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+from openai import OpenAI
 import time
 import json
 import base64
-import requests
 import secrets
 import urllib.parse
-from datetime import datetime
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from datetime import datetime, timedelta
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response
 from flask_socketio import SocketIO, emit
 import logging
 import base64
 from dotenv import load_dotenv
 import threading
+import queue
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from decision_cache import DecisionCache, make_cache_key
+from reddit_client import RedditClient, RedditAPIError
+from rate_limiter import TokenBucket
+from rule_engine import RuleEngine
+from job_manager import JobManager, JobQueueFull
+from shared_state import create_store
+from decision_store import DecisionStore
+from author_index import AuthorIndex
+from near_duplicate import NearDuplicateIndex
+from features import extract_features, priority_scores, low_risk_mask
+from scheduler import PriorityExecutor, LatencyStats, priority_band
+from tracing import Tracer
+from metrics import REGISTRY
+from collections import Counter
 
 # Load environment variables
 load_dotenv()
 
+# Running more than one worker process (gunicorn --workers / WEB_CONCURRENCY) or node needs
+# a message queue so any worker can emit to any client, and a shared store for job, login
+# and session-signing state. Both default to in-process; point them at Redis (or mini_redis.py)
+SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
+state_store = create_store(os.getenv('SHARED_STATE_URL', SOCKETIO_MESSAGE_QUEUE))
+WEB_CONCURRENCY = max(1, int(os.getenv('WEB_CONCURRENCY', 1)))
+
+# Socket.IO transports offered to browsers, e.g. "websocket" behind a load balancer
+# without sticky sessions (HTTP long-polling needs every request to hit the same worker)
+SOCKETIO_TRANSPORTS = [t.strip() for t in os.getenv('SOCKETIO_TRANSPORTS', '').split(',') if t.strip()]
+
+def shared_secret_key():
+    """Session-signing key shared by every worker (the first worker to start picks it)."""
+    state_store.set('flask_secret_key', secrets.token_hex(16), nx=True)
+    return state_store.get('flask_secret_key')
+
 app = Flask(__name__)
-app.secret_key = os.getenv('FLASK_SECRET_KEY', secrets.token_hex(16))
-socketio = SocketIO(app, cors_allowed_origins="*")
+app.secret_key = os.getenv('FLASK_SECRET_KEY') or shared_secret_key()
+
+# Seconds a dashboard login lasts; the OpenAI key kept in the shared store for it expires with it
+SESSION_LIFETIME = int(os.getenv('SESSION_LIFETIME', 86400))
+app.permanent_session_lifetime = timedelta(seconds=SESSION_LIFETIME)
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=ASYNC_MODE,
+                    message_queue=SOCKETIO_MESSAGE_QUEUE)
+
+# Maximum number of OpenAI analysis calls in flight per moderation run
+# (green threads are cheap, so gevent mode allows more by default)
+AI_MAX_CONCURRENCY = int(os.getenv('AI_MAX_CONCURRENCY', 20 if ASYNC_MODE == 'gevent' else 5))
+
+# Items packed into one OpenAI request in batched mode (1 = one request per item),
+# and the estimated prompt+response token budget for a single batched request
+AI_BATCH_SIZE = int(os.getenv('AI_BATCH_SIZE', 1))
+AI_BATCH_TOKEN_BUDGET = int(os.getenv('AI_BATCH_TOKEN_BUDGET', 3000))
+AI_BATCH_RESPONSE_TOKENS_PER_ITEM = 80
+
+# Streamed ai_chat and removal reason text is forwarded at most this often (seconds);
+# the first chunk is always sent as soon as it arrives
+AI_STREAM_EMIT_INTERVAL = float(os.getenv('AI_STREAM_EMIT_INTERVAL', 0.05))
+
+# Reddit OAuth API and login hosts (overridable so benchmarks can point at a local stand-in)
+REDDIT_API_BASE = os.getenv('REDDIT_API_BASE', 'https://oauth.reddit.com').rstrip('/')
+REDDIT_WWW_BASE = os.getenv('REDDIT_WWW_BASE', 'https://www.reddit.com').rstrip('/')
+
+# One pooled, rate-limit-aware session for every Reddit API call
+reddit_client = RedditClient(
+    pool_size=int(os.getenv('REDDIT_POOL_SIZE', 10)),
+    max_retries=int(os.getenv('REDDIT_MAX_RETRIES', 3)),
+    action_burst=float(os.getenv('REDDIT_ACTION_BURST', 60))
+)
+
+# Approve/remove requests in flight per batch of moderator actions (the rate
+# limiter still paces them; more than REDDIT_POOL_SIZE just queues for a connection)
+BATCH_ACTION_CONCURRENCY = int(os.getenv('BATCH_ACTION_CONCURRENCY', 8))
+
+# Outside human review mode, decisions below this confidence (1-10), and analysis
+# errors, are left for a moderator instead of being acted on
+AUTO_ACTION_MIN_CONFIDENCE = int(os.getenv('AUTO_ACTION_MIN_CONFIDENCE', 6))
+
+# Shared scheduler for OpenAI calls across all moderation runs; the account-wide
+# limit is split evenly between worker processes
+ai_limiter = TokenBucket(
+    rate=float(os.getenv('OPENAI_REQUESTS_PER_MINUTE', 3500)) / 60 / WEB_CONCURRENCY,
+    capacity=max(1.0, float(os.getenv('OPENAI_BURST', 20)) / WEB_CONCURRENCY),
+    name='openai'
+)
+
+# Bounded pool for moderation runs started from the dashboard
+job_manager = JobManager(
+    max_workers=int(os.getenv('MODERATION_MAX_JOBS', 4)),
+    max_queued=int(os.getenv('MODERATION_MAX_QUEUED', 20)),
+    store=state_store
+)
+
+# Local rules tier: items it decides with at least this confidence (1-10) skip OpenAI
+# (triage approves with confidence 5 at most, so by default only clear-cut removals qualify)
+rule_engine = RuleEngine()
+LOCAL_RULES_MIN_CONFIDENCE = int(os.getenv('LOCAL_RULES_MIN_CONFIDENCE', 8))
+
+# Model and prompt version used for moderation decisions (both are part of the cache key)
+AI_MODEL = "gpt-3.5-turbo"
+PROMPT_VERSION = "1"
+
+# Shared across moderation runs; set DECISION_CACHE_PATH to persist across restarts
+decision_cache = DecisionCache(
+    max_size=int(os.getenv('DECISION_CACHE_SIZE', 10000)),
+    ttl=float(os.getenv('DECISION_CACHE_TTL', 86400)),
+    db_path=os.getenv('DECISION_CACHE_PATH')
+)
+
+# History of every decision and the final action taken, written off the hot path
+# (set DECISION_STORE_PATH to an empty value to disable)
+decision_store = DecisionStore(
+    db_path=os.getenv('DECISION_STORE_PATH', 'moderation_decisions.sqlite') or None,
+    batch_size=int(os.getenv('DECISION_STORE_BATCH_SIZE', 200))
+)
+
+# Per-author outcomes; clear-cut repeat offenders and consistently approved authors skip OpenAI
+author_index = AuthorIndex(
+    db_path=os.getenv('AUTHOR_INDEX_PATH', decision_store.db_path or '') or None,
+    window=int(os.getenv('AUTHOR_HISTORY_WINDOW', 20)),
+    min_items=int(os.getenv('AUTHOR_MIN_ITEMS', 5)),
+    remove_ratio=float(os.getenv('AUTHOR_REMOVE_RATIO', 0.9)),
+    approve_ratio=float(os.getenv('AUTHOR_APPROVE_RATIO', 0.0))
+)
+
+# Upvoted items (at least this score) with no reports, links or shouting that the rules
+# would approve are approved without OpenAI
+FEATURE_SKIP_MIN_SCORE = float(os.getenv('FEATURE_SKIP_MIN_SCORE', 5))
+
+# Per-stage timing spans; set TRACE_EXPORT_PATH to also append every span to a JSON lines file
+tracer = Tracer(export_path=os.getenv('TRACE_EXPORT_PATH') or None)
+
+# Fetch-to-decision latency per priority band, across all moderation runs
+analysis_latency = LatencyStats()
+
+# Prometheus metrics served by /metrics (Reddit request latency is recorded in reddit_client.py)
+OPENAI_LATENCY = REGISTRY.histogram('openai_request_duration_seconds', 'OpenAI chat completion latency',
+                                    ('model', 'status'))
+OPENAI_TOKENS = REGISTRY.counter('openai_tokens_total', 'OpenAI tokens used', ('model', 'kind'))
+OPENAI_FIRST_TOKEN = REGISTRY.histogram('openai_time_to_first_token_seconds',
+                                        'Time until the first streamed OpenAI token', ('model',))
+MODQUEUE_PAGE_ITEMS = REGISTRY.histogram('modqueue_page_items', 'Items per mod queue page fetched',
+                                         buckets=(0, 1, 5, 10, 25, 50, 75, 100))
+MODERATED_ITEMS = REGISTRY.counter('moderation_items_total', 'Items decided by moderate_subreddit', ('tier',))
+RUN_THROUGHPUT = REGISTRY.histogram('moderation_run_items_per_second', 'Items per second of completed runs',
+                                    buckets=(0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000))
+SOCKET_EMITS = REGISTRY.counter('socketio_emits_total', 'Socket.IO events emitted to dashboards', ('event',))
+
+# Recent AI decisions by SimHash, reused for near-duplicate text (copy-paste spam waves)
+dedup_index = NearDuplicateIndex(
+    capacity=int(os.getenv('DEDUP_CAPACITY', 50000)),
+    max_distance=int(os.getenv('DEDUP_MAX_DISTANCE', 6)),
+    ttl=float(os.getenv('DEDUP_TTL', 86400))
+)
+
+def _cache_counts():
+    """Hits and misses of the decision cache, near-duplicate index and author fast path."""
+    dedup = dedup_index.stats()
+    authors = author_index.stats()
+    return {
+        'decision_cache': (decision_cache.hits, decision_cache.misses),
+        'dedup': (dedup['hits'], dedup['misses']),
+        'author': (authors['fast_path_hits'], authors['lookups'] - authors['fast_path_hits'])
+    }
+
+REGISTRY.counter_callback('cache_hits_total', 'Lookups answered by a cache',
+                          lambda: {(name,): hits for name, (hits, _) in _cache_counts().items()}, ('cache',))
+REGISTRY.counter_callback('cache_misses_total', 'Lookups a cache could not answer',
+                          lambda: {(name,): misses for name, (_, misses) in _cache_counts().items()}, ('cache',))
+REGISTRY.gauge('cache_hit_ratio', 'Share of lookups answered by a cache',
+               lambda: {(name,): hits / (hits + misses) if hits + misses else 0.0
+                        for name, (hits, misses) in _cache_counts().items()}, ('cache',))
+REGISTRY.gauge('moderation_jobs', 'Moderation jobs in the pool across workers',
+               lambda: {(state,): job_manager.status()[state] for state in ('active', 'queued')}, ('state',))
+REGISTRY.gauge('analysis_threads_active', 'AI analysis worker threads alive in this process',
+               lambda: sum(thread.name.startswith('ai-analysis') for thread in threading.enumerate()))
+
+# Tiers whose automatic actions count towards author history: the model's own judgement.
+# Actions decided by the author index or the other local tiers would reinforce themselves.
+AUTHOR_HISTORY_TIERS = ('ai', 'cache')
+
+def decision_tier(decision):
+    """Tier that produced a decision (rules, author, features, dedup, cache or ai)."""
+    return decision.get('tier') or ('cache' if decision.get('cached') else 'ai')
+
+def record_final_action(fullname, action, author=None, by=None, success=None, error=None, subreddit=None,
+                        tier=None):
+    """Record the final action on an item in the decision history and, if it counts, the author index.
+    
+    Moderator actions count, and automatic actions (``by='auto'``) only when ``tier`` is one
+    of AUTHOR_HISTORY_TIERS. Failed actions never count.
+    """
+    decision_store.record_action(fullname, action, by=by, success=success, error=error, subreddit=subreddit)
+    if success is False or (by == 'auto' and tier not in AUTHOR_HISTORY_TIERS):
+        return
+    author_index.record(author, action, fullname)
+
+def openai_completion(client, **kwargs):
+    """Call client.chat.completions.create(**kwargs), recording latency and token usage by model."""
+    model = kwargs.get('model', '')
+    start = time.perf_counter()
+    try:
+        response = client.chat.completions.create(**kwargs)
+    except Exception:
+        OPENAI_LATENCY.observe(time.perf_counter() - start, model=model, status='error')
+        raise
+    OPENAI_LATENCY.observe(time.perf_counter() - start, model=model, status='ok')
+    usage = getattr(response, 'usage', None)
+    if usage:
+        _record_usage(model, usage)
+    return response
+
+def _record_usage(model, usage):
+    if isinstance(usage, dict):
+        prompt_tokens, completion_tokens = usage.get('prompt_tokens'), usage.get('completion_tokens')
+    else:
+        prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+    OPENAI_TOKENS.inc(prompt_tokens or 0, model=model, kind='prompt')
+    OPENAI_TOKENS.inc(completion_tokens or 0, model=model, kind='completion')
+
+def openai_stream(client, on_delta, cancel_event=None, **kwargs):
+    """
+    Stream a chat completion, passing each piece of text to on_delta as it arrives.
+    
+    Latency, time to first token and (when the API reports it) token usage are
+    recorded like openai_completion. If cancel_event is set, the stream is
+    closed so OpenAI stops generating.
+    
+    Returns:
+        (text received so far, whether the stream was cancelled)
+    """
+    model = kwargs.get('model', '')
+    # Usage arrives in a final chunk when asked for (passed through extra_body for older SDKs)
+    kwargs.setdefault('extra_body', {'stream_options': {'include_usage': True}})
+    start = time.perf_counter()
+    parts = []
+    cancelled = False
+    try:
+        stream = client.chat.completions.create(stream=True, **kwargs)
+        try:
+            for chunk in stream:
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                usage = getattr(chunk, 'usage', None)
+                if usage:
+                    _record_usage(model, usage)
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    if not parts:
+                        OPENAI_FIRST_TOKEN.observe(time.perf_counter() - start, model=model)
+                    parts.append(delta)
+                    on_delta(delta)
+        finally:
+            # Stream.close() is newer than the pinned SDK; closing the response works in both
+            stream.response.close()
+    except Exception:
+        OPENAI_LATENCY.observe(time.perf_counter() - start, model=model, status='error')
+        raise
+    OPENAI_LATENCY.observe(time.perf_counter() - start, model=model, status='cancelled' if cancelled else 'ok')
+    return ''.join(parts), cancelled
+
+_openai_clients = {}
+_openai_clients_lock = threading.Lock()
+
+def openai_client_for(api_key):
+    """Return a shared OpenAI client for an API key (its connection pool is reused across runs).
+    
+    The SDK reads OPENAI_BASE_URL, so a local stand-in can replace the OpenAI API.
+    """
+    if not api_key:
+        return None
+    with _openai_clients_lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            client = _openai_clients[api_key] = OpenAI(api_key=api_key)
+        return client
+
+def estimate_tokens(text):
+    """Rough token count for budgeting prompts (about 4 characters per token)."""
+    return len(text) // 4 + 1
 
 class ModerationDashboard:
-    def __init__(self):
+    def __init__(self, room=None):
+        self.room = room  # Socket.IO room (the requesting client's sid) that receives this run's events
+        self.job_id = None
+        self.cancel_event = threading.Event()
         self.reddit = None
         self.openai_client = None
         self.is_running = False
@@ -40,7 +324,18 @@ class ModerationDashboard:
         self.reddit_token = None
         self.subreddit_cache = {}
         self.cache_timestamp = None
+        self.prompt_configs = {}
+        self.local_rules = True
+        self.tier_counts = Counter()
+        self.band_latency = LatencyStats()
+        self._tier_lock = threading.Lock()
         
+    def emit(self, event, data):
+        """Send an event to this dashboard's room only (every client if no room is set)."""
+        SOCKET_EMITS.inc(event=event)
+        with tracer.span('socket.emit', event=event, job_id=self.job_id):
+            socketio.emit(event, data, to=self.room)
+    
     def authenticate(self, credentials=None):
         """Authenticate with Reddit and OpenAI APIs using direct requests"""
         try:
@@ -84,8 +379,9 @@ class ModerationDashboard:
                 'grant_type': 'client_credentials'
             }
             
-            response = requests.post('https://www.reddit.com/api/v1/access_token', 
-                                   headers=headers, data=data, timeout=30)
+            with tracer.span('reddit.token', grant='client_credentials'):
+                response = reddit_client.post(f'{REDDIT_WWW_BASE}/api/v1/access_token', 
+                                           headers=headers, data=data, timeout=30)
             
             if response.status_code != 200:
                 return False, f"Reddit authentication failed: {response.text}"
@@ -102,7 +398,7 @@ class ModerationDashboard:
                 'User-Agent': f'reddit-moderator-bot/2.0 by u/{reddit_username}'
             }
             
-            me_response = requests.get('https://oauth.reddit.com/api/v1/me', headers=reddit_headers)
+            me_response = reddit_client.get(f'{REDDIT_API_BASE}/api/v1/me', headers=reddit_headers)
             if me_response.status_code != 200:
                 return False, f"Reddit API test failed: {me_response.text}"
             
@@ -139,8 +435,8 @@ class ModerationDashboard:
             }
             
             # Get subreddits where user is a moderator with timeout
-            response = requests.get('https://oauth.reddit.com/subreddits/mine/moderator', 
-                                  headers=headers, timeout=30)
+            response = reddit_client.get(f'{REDDIT_API_BASE}/subreddits/mine/moderator', 
+                                       headers=headers, timeout=30)
             
             if response.status_code != 200:
                 print(f"Error fetching moderated subreddits: {response.status_code} - {response.text}")
@@ -170,26 +466,27 @@ class ModerationDashboard:
             print(f"Error fetching moderated subreddits: {e}")
             return []
     
-    def analyze_with_ai(self, title, content, author, score, subreddit_name):
-        """Use OpenAI to analyze content."""
-        try:
-            post_text = f"Title: {title}"
-            if content and content.strip():
-                post_text += f"\nContent: {content}"
-            
-            # Customize prompt based on subreddit
-            subreddit_configs = {
-                'grillsgonewild': {
-                    'context': "r/grillsgonewild, a subreddit about BBQ grills and grilling equipment",
-                    'rules': """- Spam or promotional content (especially affiliate links, discount codes)
+    def get_prompt_config(self, subreddit_name):
+        """Return the (context, rules) prompt blocks for a subreddit, built once per subreddit."""
+        if subreddit_name not in self.prompt_configs:
+            self.prompt_configs[subreddit_name] = self._build_prompt_config(subreddit_name)
+        return self.prompt_configs[subreddit_name]
+    
+    def _build_prompt_config(self, subreddit_name):
+        """Build the (context, rules) prompt blocks for a subreddit."""
+        # Customize prompt based on subreddit
+        subreddit_configs = {
+            'grillsgonewild': {
+                'context': "r/grillsgonewild, a subreddit about BBQ grills and grilling equipment",
+                'rules': """- Spam or promotional content (especially affiliate links, discount codes)
 - Off-topic content (not about grills/grilling/BBQ)
 - Self-promotion without community engagement
 - Low-effort posts
 - Legitimate grilling content should be approved"""
-                },
-                'complainaboutanything': {
-                    'context': "r/complainaboutanything, a subreddit where people can complain about anything",
-                    'rules': """- REMOVE: Hate speech or harassment targeting individuals
+            },
+            'complainaboutanything': {
+                'context': "r/complainaboutanything, a subreddit where people can complain about anything",
+                'rules': """- REMOVE: Hate speech or harassment targeting individuals
 - REMOVE: Personal attacks or doxxing
 - REMOVE: Spam or promotional content
 - REMOVE: Threats or incitement to violence
@@ -197,22 +494,38 @@ class ModerationDashboard:
 - APPROVE: Complaints and venting are generally allowed, even if heated
 - APPROVE: Political complaints and criticism
 - APPROVE: Personal frustrations and rants"""
-                }
             }
-            
-            # Get subreddit-specific config or use default
-            if subreddit_name in subreddit_configs:
-                config = subreddit_configs[subreddit_name]
-                context = config['context']
-                rules = config['rules']
-            else:
-                context = f"r/{subreddit_name}, a Reddit community"
-                rules = """- Hate speech or harassment
+        }
+        
+        # Get subreddit-specific config or use default
+        if subreddit_name in subreddit_configs:
+            config = subreddit_configs[subreddit_name]
+            return config['context'], config['rules']
+        
+        context = f"r/{subreddit_name}, a Reddit community"
+        rules = """- Hate speech or harassment
 - Personal attacks
 - Spam or promotional content
 - Threats or violence
 - Misinformation
 - Rule violations"""
+        return context, rules
+    
+    def analyze_with_ai(self, title, content, author, score, subreddit_name, use_cache=True):
+        """Use OpenAI to analyze content, reusing cached decisions for unchanged items."""
+        try:
+            post_text = f"Title: {title}"
+            if content and content.strip():
+                post_text += f"\nContent: {content}"
+            
+            context, rules = self.get_prompt_config(subreddit_name)
+            
+            cache_key = make_cache_key(subreddit_name, title, content,
+                                       f"{PROMPT_VERSION}\n{context}\n{rules}", AI_MODEL)
+            cached = decision_cache.get(cache_key) if use_cache else None
+            if cached:
+                cached['cached'] = True
+                return cached
             
             prompt = f"""You are a Reddit moderator for {context}. Analyze this post and decide whether to APPROVE or REMOVE it.
 
@@ -230,8 +543,10 @@ Respond with a JSON object containing:
 Example response:
 {{"action": "REMOVE", "reason": "Promotional content with discount code", "confidence": 9}}"""
 
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            ai_limiter.acquire()
+            response = openai_completion(
+                self.openai_client,
+                model=AI_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a helpful Reddit moderation assistant. Always respond with valid JSON."},
                     {"role": "user", "content": prompt}
@@ -241,205 +556,824 @@ Example response:
             )
             
             result = json.loads(response.choices[0].message.content)
+            if not (isinstance(result, dict) and result.get('action') in ('APPROVE', 'REMOVE')
+                    and 'reason' in result and 'confidence' in result):
+                raise ValueError(f"Malformed decision: {response.choices[0].message.content[:200]}")
+            decision_cache.set(cache_key, result)
             return result
             
         except Exception as e:
-            return {"action": "APPROVE", "reason": f"Error in analysis: {e}", "confidence": 1}
+            # Flagged so the error is neither cached, reused for near-duplicates nor acted on
+            return {"action": "APPROVE", "reason": f"Error in analysis: {e}", "confidence": 1, "error": True}
     
-    def moderate_subreddit(self, subreddit_name, limit=5, human_review=False):
-        """Moderate posts in a subreddit."""
-        import time
-        start_time = time.time()
+    def analyze_batch_with_ai(self, entries, subreddit_name, token_budget=None):
+        """Analyze several items with one OpenAI request per batch.
+        
+        ``entries`` is a list of dicts with ``id``, ``title``, ``content``,
+        ``author`` and ``score``. The subreddit rules are sent once per request
+        and the model answers with a JSON array of decisions keyed by ``id``.
+        Items missing from a malformed response, or too large to fit in
+        ``token_budget``, fall back to per-item analyze_with_ai calls.
+        
+        Returns a dict mapping each entry id to its decision.
+        """
+        token_budget = token_budget or AI_BATCH_TOKEN_BUDGET
+        context, rules = self.get_prompt_config(subreddit_name)
+        prompt_version = f"{PROMPT_VERSION}\n{context}\n{rules}"
+        base_tokens = estimate_tokens(context + rules) + 150
+        
+        decisions = {}
+        chunks = []
+        chunk = []
+        chunk_tokens = base_tokens
+        
+        for entry in entries:
+            cache_key = make_cache_key(subreddit_name, entry['title'], entry['content'], prompt_version, AI_MODEL)
+            cached = decision_cache.get(cache_key)
+            if cached:
+                cached['cached'] = True
+                decisions[entry['id']] = cached
+                continue
+            
+            # Pack uncached items into chunks that fit the token budget
+            entry_text = self._format_batch_entry(entry)
+            entry_tokens = estimate_tokens(entry_text) + AI_BATCH_RESPONSE_TOKENS_PER_ITEM
+            if chunk and chunk_tokens + entry_tokens > token_budget:
+                chunks.append(chunk)
+                chunk = []
+                chunk_tokens = base_tokens
+            chunk.append((entry, cache_key, entry_text))
+            chunk_tokens += entry_tokens
+        
+        if chunk:
+            chunks.append(chunk)
+        
+        for chunk in chunks:
+            results = {}
+            chunk_tokens = base_tokens + sum(estimate_tokens(text) + AI_BATCH_RESPONSE_TOKENS_PER_ITEM
+                                             for _, _, text in chunk)
+            if len(chunk) > 1 and chunk_tokens <= token_budget:
+                try:
+                    results = self._request_batch_decisions(context, rules, [text for _, _, text in chunk])
+                except Exception as e:
+                    print(f"[ERROR] Batched analysis failed, falling back to per-item calls: {e}")
+            
+            for entry, cache_key, _ in chunk:
+                result = results.get(str(entry['id']))
+                if result:
+                    decision_cache.set(cache_key, result)
+                    decisions[entry['id']] = result
+                else:
+                    decisions[entry['id']] = self.analyze_with_ai(
+                        entry['title'], entry['content'], entry['author'], entry['score'],
+                        subreddit_name, use_cache=False
+                    )
+        
+        return decisions
+    
+    def _format_batch_entry(self, entry):
+        """Format one item for a batched prompt."""
+        text = f"[id {entry['id']}] Post by u/{entry['author']} (Score: {entry['score']}):\nTitle: {entry['title']}"
+        if entry['content'] and entry['content'].strip():
+            text += f"\nContent: {entry['content']}"
+        return text
+    
+    def _request_batch_decisions(self, context, rules, entry_texts):
+        """Send one batched request and return the valid decisions keyed by item id."""
+        items_text = "\n\n".join(entry_texts)
+        prompt = f"""You are a Reddit moderator for {context}. Analyze each of the following items and decide whether to APPROVE or REMOVE it.
+
+Consider these factors:
+{rules}
+
+Items:
+{items_text}
+
+Respond with a JSON array containing one object per item, each with:
+- "id": The item id
+- "action": "APPROVE" or "REMOVE"
+- "reason": Brief explanation of your decision
+- "confidence": Number from 1-10 (10 = very confident)
+
+Example response:
+[{{"id": "1", "action": "REMOVE", "reason": "Promotional content with discount code", "confidence": 9}}]"""
+
+        ai_limiter.acquire()
+        response = openai_completion(
+            self.openai_client,
+            model=AI_MODEL,
+            messages=[
+                {"role": "system", "content": "You are a helpful Reddit moderation assistant. Always respond with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=AI_BATCH_RESPONSE_TOKENS_PER_ITEM * len(entry_texts) + 50
+        )
+        
+        parsed = json.loads(response.choices[0].message.content)
+        if isinstance(parsed, dict):
+            parsed = parsed.get('decisions', [])
+        if not isinstance(parsed, list):
+            raise ValueError("Batched response is not a JSON array")
+        
+        results = {}
+        for result in parsed:
+            if (isinstance(result, dict) and result.get('action') in ('APPROVE', 'REMOVE')
+                    and 'reason' in result and 'confidence' in result):
+                results[str(result.pop('id', ''))] = result
+        return results
+    
+    def _extract_item(self, item):
+        """Extract display fields and reports from a raw mod queue item."""
+        item_type = "submission" if 'selftext' in item else "comment"
+        author = item.get('author', '[deleted]')
+        
+        if item_type == "submission":
+            title = item.get('title', '')
+            content = item.get('selftext', '')
+            display_content = content if content else title
+        else:
+            title = f"Comment on: {item.get('link_title', 'Unknown')[:50]}..."
+            content = item.get('body', '')
+            display_content = content[:100] + ('...' if len(content) > 100 else '')
+        
+        # Get mod reports and removal reasons
+        reports = []
+        user_reports = item.get('user_reports', [])
+        mod_reports = item.get('mod_reports', [])
+        removal_reason = None
         
         try:
-            print(f"[PERF] Starting moderation for r/{subreddit_name} at {time.time()}")
+            # Process user reports
+            for report in user_reports:
+                reports.append({
+                    'type': 'user_report',
+                    'reason': report[0] if report else 'No reason given',
+                    'count': report[1] if len(report) > 1 else 1
+                })
             
-            # Check if we have OAuth token from session
-            if not hasattr(self, 'reddit_token') or not self.reddit_token:
-                from flask import session
-                self.reddit_token = session.get('reddit_token')
-                if not self.reddit_token:
-                    socketio.emit('error', {'message': 'No Reddit authentication token found. Please login again.'})
-                    return
-            
-            self.current_subreddit = subreddit_name
-            
-            # Emit status update
-            socketio.emit('status_update', {
-                'message': f"Checking mod queue for r/{subreddit_name}...",
-                'type': 'info'
+            # Process mod reports  
+            for report in mod_reports:
+                reports.append({
+                    'type': 'mod_report',
+                    'reason': report[0] if report else 'No reason given',
+                    'moderator': report[1] if len(report) > 1 else 'Unknown'
+                })
+            
+            # Check if item was previously removed
+            if item.get('removed'):
+                removal_reason = item.get('removal_reason') or "Previously removed (no reason given)"
+                    
+        except Exception as e:
+            print(f"[ERROR] Error getting reports: {e}")
+        
+        return {
+            'raw': item,
+            'fullname': item.get('name'),
+            'subreddit': item.get('subreddit', ''),
+            'type': item_type,
+            'title': title,
+            'author': author,
+            'score': item.get('score', 0),
+            'content': content,
+            'display_content': display_content,
+            'permalink': item.get('permalink', ''),
+            'reports': reports,
+            'user_reports': user_reports,
+            'mod_reports': mod_reports,
+            'removal_reason': removal_reason,
+            'created_utc': item.get('created_utc', 0)
+        }
+    
+    def _analyze_items(self, batch, total_items, subreddit_name):
+        """Emit a batch of (item_number, item) pairs, analyze them and emit each decision.
+        
+        Runs on a worker thread. A single-item batch uses analyze_with_ai; larger
+        batches go through analyze_batch_with_ai. Returns (item_number, item, decision) tuples.
+        """
+        if self.cancel_event.is_set():
+            return []
+        
+        for item_number, item in batch:
+            # Emit item being analyzed
+            self.emit('item_analyzing', {
+                'item_number': item_number,
+                'total_items': total_items,
+                'fullname': item['fullname'],
+                'priority': item.get('priority'),
+                'band': item.get('band'),
+                'subreddit': item['subreddit'],
+                'type': item['type'],
+                'title': item['title'],
+                'author': item['author'],
+                'score': item['score'],
+                'content': item['display_content'],
+                'full_content': item['content'],  # Send full content for "Read More"
+                'url': f"https://reddit.com{item['permalink']}",
+                'permalink': item['permalink'],
+                'reports': item['reports'],
+                'user_reports': item['user_reports'],
+                'mod_reports': item['mod_reports'],
+                'removal_reason': item['removal_reason'],
+                'created_utc': item['created_utc']
             })
+        
+        # Local rules and author history tiers first, then near-duplicates of items
+        # already judged by the AI; only undecided items go on to OpenAI
+        decisions = {}
+        latencies = {}
+        escalate = []
+        for item_number, item in batch:
+            with tracer.span('item.local_tiers', job_id=self.job_id, fullname=item['fullname']) as span:
+                local = self.local_decision(item) if self.local_rules else None
+                if not local:
+                    local = self.duplicate_decision(item, subreddit_name)
+            if local:
+                decisions[item_number] = local
+                latencies[item_number] = span.duration
+            else:
+                escalate.append((item_number, item))
+        
+        # Analyze with AI
+        if escalate:
+            with tracer.span('openai.analyze', log=True, job_id=self.job_id, items=len(escalate),
+                             fullname=escalate[0][1]['fullname'] if len(escalate) == 1 else None) as span:
+                if len(escalate) == 1:
+                    item_number, item = escalate[0]
+                    decisions[item_number] = self.analyze_with_ai(
+                        item['title'], item['content'], item['author'], item['score'], subreddit_name
+                    )
+                else:
+                    decisions.update(self.analyze_batch_with_ai([
+                        {
+                            'id': item_number,
+                            'title': item['title'],
+                            'content': item['content'],
+                            'author': item['author'],
+                            'score': item['score']
+                        }
+                        for item_number, item in escalate
+                    ], subreddit_name))
+            for item_number, _ in escalate:
+                latencies[item_number] = span.duration
+        
+        results = []
+        for item_number, item in batch:
+            decision = decisions[item_number]
+            tier = decision_tier(decision)
+            with self._tier_lock:
+                self.tier_counts[tier] += 1
+            MODERATED_ITEMS.inc(tier=tier)
             
-            # Use direct API call with timeout instead of PRAW
-            headers = {
-                'Authorization': f'Bearer {self.reddit_token}',
-                'User-Agent': 'reddit-moderator-bot/2.0'
+            # Emit AI decision
+            self.emit('ai_decision', {
+                'item_number': item_number,
+                'action': decision['action'],
+                'reason': decision['reason'],
+                'confidence': decision['confidence'],
+                'cached': decision.get('cached', False),
+                'tier': tier,
+                'error': decision.get('error', False),
+                'dedup_of': decision.get('dedup_of'),
+                'similarity': decision.get('similarity'),
+                'band': item.get('band')
+            })
+            if item.get('fetched_at'):
+                latency = time.monotonic() - item['fetched_at']
+                self.band_latency.record(item['band'], latency)
+                analysis_latency.record(item['band'], latency)
+            if tier == 'ai':
+                dedup_index.add(self._item_text(item), item['subreddit'] or subreddit_name, decision,
+                                ref=item['fullname'] or item['permalink'])
+            decision_store.record_decision(item, dict(decision, tier=tier),
+                                           model=None if tier in ('rules', 'author', 'features') else AI_MODEL,
+                                           latency=latencies.get(item_number), job_id=self.job_id)
+            results.append((item_number, item, decision))
+        
+        return results
+    
+    def local_decision(self, item):
+        """Decide an item with the local rule engine or its author's history, or return None to escalate it.
+        
+        Reported or previously removed items are never approved locally, and the features tier never
+        approves promotional text. Features-tier approvals are left for a moderator to confirm.
+        """
+        flagged = bool(item['reports'] or item['removal_reason'])
+        text = self._item_text(item)
+        decision = rule_engine.triage(text, is_submission=item['type'] == 'submission')
+        
+        if decision['confidence'] >= LOCAL_RULES_MIN_CONFIDENCE and not (decision['action'] == 'APPROVE' and flagged):
+            decision['tier'] = 'rules'
+            return decision
+        
+        author_decision = author_index.fast_decision(item['author'], allow_approve=not flagged)
+        if author_decision:
+            return author_decision
+        
+        # Upvoted items with no report, link, shouting or promotional signal that pass the rules (see
+        # features.py); a spam wave can be upvoted by its own accounts. A heuristic alone is never
+        # enough to act on, so the confidence stays below AUTO_ACTION_MIN_CONFIDENCE and a moderator
+        # confirms the approval
+        if decision['action'] == 'APPROVE' and item.get('low_risk') and not rule_engine.promo_count(text.lower()):
+            return {
+                'action': 'APPROVE',
+                'reason': f"Upvoted (score {item['score']}) with no reports, links or shouting",
+                'confidence': AUTO_ACTION_MIN_CONFIDENCE - 1,
+                'tier': 'features'
             }
+        return None
+    
+    def duplicate_decision(self, item, subreddit_name):
+        """Reuse the AI decision on a near-duplicate of this item, or return None.
+        
+        As with the local tiers, reported or previously removed items are never approved this way.
+        """
+        decision = dedup_index.find(self._item_text(item), item['subreddit'] or subreddit_name)
+        if not decision:
+            return None
+        if decision['action'] == 'APPROVE' and (item['reports'] or item['removal_reason']):
+            return None
+        
+        decision['tier'] = 'dedup'
+        return decision
+    
+    @staticmethod
+    def _item_text(item):
+        """Text the local tiers judge: the body of a comment, or title and body of a submission."""
+        return item['content'] if item['type'] == 'comment' else f"{item['title']} {item['content']}"
+    
+    def iter_mod_queue_pages(self, subreddit_name, headers, limit=None, page_size=100):
+        """Yield mod queue pages (lists of items), following Reddit's ``after`` cursor.
+        
+        ``limit`` caps the total number of items (None or 0 fetches the whole
+        queue). Raises RedditAPIError if a page request fails.
+        """
+        after = None
+        fetched = 0
+        page = 0
+        
+        while True:
+            params = {'limit': page_size if not limit else min(page_size, limit - fetched)}
+            if after:
+                params['after'] = after
             
-            print(f"[PERF] Making API request to mod queue at {time.time()}")
+            page += 1
+            with tracer.span('reddit.modqueue_page', log=True, job_id=self.job_id, subreddit=subreddit_name,
+                             page=page) as span:
+                response = reddit_client.get(
+                    f'{REDDIT_API_BASE}/r/{subreddit_name}/about/modqueue',
+                    headers=headers,
+                    params=params,
+                    timeout=30  # 30 second timeout
+                )
+                span.set(status=response.status_code)
+                if response.status_code != 200:
+                    raise RedditAPIError(response)
+                
+                data = response.json().get('data', {})
+                children = data.get('children', [])
+                span.set(items=len(children))
+                MODQUEUE_PAGE_ITEMS.observe(len(children))
+            if children:
+                yield children
             
-            # Get items from mod queue with timeout
-            import requests
-            response = requests.get(
-                f'https://oauth.reddit.com/r/{subreddit_name}/about/modqueue',
-                headers=headers,
-                params={'limit': limit},
-                timeout=30  # 30 second timeout
-            )
+            fetched += len(children)
+            after = data.get('after')
+            if not after or not children or (limit and fetched >= limit):
+                return
+    
+    def iter_multi_mod_queue_pages(self, subreddit_names, headers, limit=None):
+        """Fetch several mod queues in parallel and yield their pages as they arrive.
+        
+        A subreddit whose queue can't be fetched is reported and skipped. Fetching
+        stops as soon as the run is cancelled or the generator is closed, and only
+        a few pages are read ahead of the consumer.
+        """
+        workers = min(8, len(subreddit_names)) or 1
+        pages = queue.Queue(maxsize=2 * workers)
+        done = object()
+        stop = threading.Event()
+        
+        def stopped():
+            return stop.is_set() or self.cancel_event.is_set()
+        
+        def put(page):
+            # Wait for room in the buffer, but give up once nobody will read it
+            while not stopped():
+                try:
+                    pages.put(page, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        def fetch(name):
+            try:
+                for page in self.iter_mod_queue_pages(name, headers, limit):
+                    if not put(page):
+                        return
+            except Exception as e:
+                print(f"[ERROR] Error fetching mod queue for r/{name}: {e}")
+                self.emit('status_update', {
+                    'message': f"Skipping r/{name}: {e}",
+                    'type': 'error'
+                })
+            finally:
+                put(done)
+        
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='modqueue-fetch')
+        try:
+            for name in subreddit_names:
+                executor.submit(fetch, name)
             
-            api_time = time.time()
-            print(f"[PERF] API request completed in {api_time - start_time:.2f} seconds")
+            remaining = len(subreddit_names)
+            while remaining and not self.cancel_event.is_set():
+                try:
+                    page = pages.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if page is done:
+                    remaining -= 1
+                else:
+                    yield page
+        finally:
+            # Don't wait for fetches still running: they see the stop flag after their current request
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _send_action(self, fullname, action):
+        """
+        Approve or remove one item by fullname through the pooled Reddit session.
+        
+        Args:
+            fullname: Item fullname (t1_... or t3_...)
+            action: 'approve' or 'remove' (any case); anything else is not sent
             
-            if response.status_code != 200:
-                error_msg = f"Reddit API error: {response.status_code} - {response.text}"
-                print(f"[ERROR] {error_msg}")
-                socketio.emit('error', {'message': error_msg})
-                return
+        Returns:
+            True if the action was sent, False if there was nothing to send.
+            Raises RedditAPIError if Reddit rejects it.
+        """
+        action = action.lower()
+        if action not in ('approve', 'remove'):
+            return False
+        
+        data = {'id': fullname}
+        if action == 'remove':
+            data['spam'] = 'false'
+        with tracer.span('reddit.action', job_id=self.job_id, fullname=fullname, action=action):
+            response = reddit_client.post(f'{REDDIT_API_BASE}/api/{action}',
+                                          headers={'Authorization': f'Bearer {self.reddit_token}',
+                                                   'User-Agent': 'reddit-moderator-bot/2.0'},
+                                          data=data)
+        if response.status_code != 200:
+            raise RedditAPIError(response)
+        return True
+    
+    def process_batch_actions(self, actions, subreddit_name=None, dry_run=False, max_concurrency=None):
+        """
+        Carry out the moderator's reviewed decisions.
+        
+        Items are addressed by the fullnames they had when the queue was
+        fetched, so the mod queue is not fetched again. Up to
+        ``max_concurrency`` (default ``BATCH_ACTION_CONCURRENCY``) requests are
+        in flight at once, each taking a token from this Reddit token's action
+        limiter first, so a large batch runs as fast as the rate budget allows.
+        A ``batch_progress`` event is emitted as each item finishes.
+        
+        Args:
+            actions: Mapping of fullname to action, or a list of dicts with
+                ``fullname`` and ``action`` and optionally ``item_number``,
+                ``author`` and ``subreddit``. Actions are approve, remove or skip.
+            subreddit_name: Subreddit recorded for items that don't name their own
+            dry_run: Report what would be done without sending anything
+            max_concurrency: Requests in flight at once
             
-            data = response.json()
-            mod_queue_items = data.get('data', {}).get('children', [])
+        Returns:
+            Dict with processed_count, failed_count, skipped_count and message
+        """
+        if isinstance(actions, dict):
+            actions = [{'fullname': fullname, 'action': action} for fullname, action in actions.items()]
+        
+        pending = []
+        skipped_count = 0
+        for entry in actions:
+            action = str(entry.get('action') or '').lower()
+            if action in ('approve', 'remove') and entry.get('fullname'):
+                pending.append(dict(entry, action=action))
+            else:
+                skipped_count += 1
+        
+        headers = {'Authorization': f'Bearer {self.reddit_token}'}
+        action_limiter = reddit_client.limiter_for(headers)
+        
+        def run(entry):
+            fullname = entry['fullname']
+            if dry_run:
+                return entry, True, None
+            try:
+                action_limiter.acquire()
+                self._send_action(fullname, entry['action'])
+                return entry, True, None
+            except Exception as e:
+                return entry, False, str(e)
+        
+        processed_count = 0
+        failed_count = 0
+        workers = max(1, min(max_concurrency or BATCH_ACTION_CONCURRENCY, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch-action') as executor:
+            for future in as_completed([executor.submit(run, entry) for entry in pending]):
+                entry, success, error = future.result()
+                if success:
+                    processed_count += 1
+                else:
+                    failed_count += 1
+                if not dry_run:
+                    record_final_action(entry['fullname'], entry['action'], author=entry.get('author'),
+                                        by=self.reddit_username, success=success, error=error,
+                                        subreddit=entry.get('subreddit') or subreddit_name)
+                progress = {
+                    'item_number': entry.get('item_number'),
+                    'fullname': entry['fullname'],
+                    'action': entry['action'],
+                    'success': success,
+                    'dry_run': dry_run
+                }
+                if error:
+                    progress['error'] = error
+                self.emit('batch_progress', progress)
+        
+        verb = 'Would process' if dry_run else 'Processed'
+        message = f"{verb} {processed_count} actions successfully"
+        if failed_count:
+            message += f", {failed_count} failed"
+        return {
+            'message': message,
+            'processed_count': processed_count,
+            'failed_count': failed_count,
+            'skipped_count': skipped_count,
+            'dry_run': dry_run
+        }
+    
+    def _apply_decisions(self, results, human_review, action_limiter):
+        """Take (or, in human review mode, skip) the action for each analyzed item.
+        
+        Failed analyses and decisions below ``AUTO_ACTION_MIN_CONFIDENCE`` are
+        never acted on; they are reported with ``human_review`` set so a
+        moderator decides them.
+        """
+        for i, item, decision in results:
+            # In human review mode, don't take action immediately
+            if human_review or self.cancel_event.is_set():
+                continue
             
-            if not mod_queue_items:
-                socketio.emit('status_update', {
-                    'message': "Mod queue is empty!",
-                    'type': 'info'
+            if decision.get('error') or decision['confidence'] < AUTO_ACTION_MIN_CONFIDENCE:
+                self.emit('action_result', {
+                    'item_number': i,
+                    'action': decision['action'],
+                    'action_taken': False,
+                    'human_review': True,
+                    'reason': ("Analysis failed" if decision.get('error') else
+                               f"Confidence {decision['confidence']}/10 is below {AUTO_ACTION_MIN_CONFIDENCE}"),
+                    'error': None
                 })
-                print(f"[PERF] Total execution time: {time.time() - start_time:.2f} seconds")
-                return
-            
-            socketio.emit('status_update', {
-                'message': f"Found {len(mod_queue_items)} items in mod queue",
-                'type': 'success'
-            })
+                continue
             
-            print(f"[PERF] Processing {len(mod_queue_items)} items")
+            # Take action immediately
+            action_taken = False
+            error_message = None
             
-            for i, item_data in enumerate(mod_queue_items, 1):
-                item_start = time.time()
-                print(f"[PERF] Processing item {i} at {item_start}")
+            try:
+                # Rate limiting: burst while Reddit budget remains
+                action_limiter.acquire()
+                action_taken = self._send_action(item['fullname'], decision['action'])
                 
-                # Extract item data from API response
-                item = item_data.get('data', {})
-                item_type = "submission" if 'selftext' in item else "comment"
-                author = item.get('author', '[deleted]')
+            except Exception as e:
+                error_message = str(e)
+            
+            # An analysis error is not the model's judgement of the author
+            record_final_action(item['fullname'], decision['action'], author=item['author'], by='auto',
+                                success=action_taken, error=error_message, subreddit=item['subreddit'],
+                                tier=None if decision.get('error') else decision_tier(decision))
+            
+            # Emit action result
+            self.emit('action_result', {
+                'item_number': i,
+                'action': decision['action'],
+                'action_taken': action_taken,
+                'human_review': False,
+                'error': error_message
+            })
+    
+    def moderate_subreddit(self, subreddit_name, limit=5, human_review=False, max_concurrency=None,
+                           batch_size=None, local_rules=True):
+        """Moderate posts in a subreddit.
+        
+        ``subreddit_name`` may be ``'mod'`` for the combined queue of every
+        moderated subreddit, or a list of names whose queues are fetched in
+        parallel (``limit`` then applies per subreddit). Items are grouped by
+        their own subreddit so each group is judged against its own rules.
+        
+        The mod queue is streamed in 100-item pages (``limit`` of None or 0
+        drains it). Up to ``max_concurrency`` requests (default
+        ``AI_MAX_CONCURRENCY``, and never more than the ``limit`` allows
+        batches) are analyzed at once, so ``ai_decision`` events
+        may arrive out of order and are matched to their item by
+        ``item_number``. With ``batch_size`` > 1 (default ``AI_BATCH_SIZE``)
+        each request packs that many items.
+        
+        With ``local_rules`` the compiled rule engine, then the author history
+        index, decide clear-cut items first; near-duplicates of recently judged
+        items reuse that decision, and only the rest are sent to OpenAI. The
+        deciding tier (``rules``, ``author``, ``dedup``, ``cache`` or ``ai``)
+        is reported per item and per run.
+        """
+        run_name = '+'.join(subreddit_name) if isinstance(subreddit_name, (list, tuple)) else subreddit_name
+        with tracer.span('moderation.run', log=True, job_id=self.job_id, subreddit=run_name) as run_span:
+            try:
+                # Check if we have OAuth token from session
+                if not hasattr(self, 'reddit_token') or not self.reddit_token:
+                    from flask import session
+                    self.reddit_token = session.get('reddit_token')
+                    if not self.reddit_token:
+                        self.emit('error', {'message': 'No Reddit authentication token found. Please login again.'})
+                        return
                 
-                if item_type == "submission":
-                    title = item.get('title', '')
-                    content = item.get('selftext', '')
-                    display_content = content if content else title
+                # A list of subreddits is fetched in parallel and moderated as one queue
+                if isinstance(subreddit_name, (list, tuple)):
+                    subreddit_names = list(subreddit_name)
+                    subreddit_name = '+'.join(subreddit_names)
                 else:
-                    title = f"Comment on: {item.get('link_title', 'Unknown')[:50]}..."
-                    content = item.get('body', '')
-                    display_content = content[:100] + ('...' if len(content) > 100 else '')
+                    subreddit_names = None
                 
-                # Get mod reports and removal reasons
-                reports = []
-                user_reports = item.get('user_reports', [])
-                mod_reports = item.get('mod_reports', [])
+                self.current_subreddit = subreddit_name
+                if self.reddit_username:
+                    state_store.set(f'subreddit:{self.reddit_username}', subreddit_name, ttl=86400)
+                self.local_rules = local_rules
+                self.tier_counts = Counter()
+                self.band_latency = LatencyStats()
                 
-                try:
-                    # Process user reports
-                    for report in user_reports:
-                        reports.append({
-                            'type': 'user_report',
-                            'reason': report[0] if report else 'No reason given',
-                            'count': report[1] if len(report) > 1 else 1
+                # Emit status update
+                self.emit('status_update', {
+                    'message': f"Checking mod queue for r/{subreddit_name}...",
+                    'type': 'info'
+                })
+                
+                # Use direct API call with timeout instead of PRAW
+                headers = {
+                    'Authorization': f'Bearer {self.reddit_token}',
+                    'User-Agent': 'reddit-moderator-bot/2.0'
+                }
+                action_limiter = reddit_client.limiter_for(headers)
+                batch_size = max(1, int(batch_size or AI_BATCH_SIZE))
+                max_workers = max(1, int(max_concurrency or AI_MAX_CONCURRENCY))
+                if limit:
+                    # No more workers than there can be batches
+                    max_items = limit * len(subreddit_names or [subreddit_name])
+                    max_workers = min(max_workers, -(-max_items // batch_size))
+                total_items = 0
+                
+                # Analysis starts on the first page while later pages are still loading. Workers
+                # always take the highest-priority batch waiting, whichever page it came from,
+                # so decisions arrive in priority (then completion) order
+                with PriorityExecutor(max_workers=max_workers, thread_name_prefix='ai-analysis') as executor:
+                    pending = set()
+                    
+                    def submit(batch, item_subreddit):
+                        priority = max(item['priority'] for _, item in batch)
+                        pending.add(executor.submit(priority, self._analyze_items, batch, None, item_subreddit))
+                    
+                    if subreddit_names:
+                        page_stream = self.iter_multi_mod_queue_pages(subreddit_names, headers, limit)
+                    else:
+                        page_stream = self.iter_mod_queue_pages(subreddit_name, headers, limit)
+                    
+                    try:
+                        for page in page_stream:
+                            if self.cancel_event.is_set():
+                                break
+                            
+                            # Score the whole page at once and number its likeliest violations first
+                            fetched_at = time.monotonic()
+                            items = []
+                            for item_data in page:
+                                data = item_data.get('data', {})
+                                with tracer.span('item.extract', job_id=self.job_id, fullname=data.get('name')):
+                                    items.append(self._extract_item(data))
+                            with tracer.span('page.features', job_id=self.job_id, items=len(items)):
+                                features = extract_features(items)
+                                priorities = priority_scores(features)
+                                low_risk = low_risk_mask(features, FEATURE_SKIP_MIN_SCORE)
+                            
+                            # Items are batched per subreddit so each request has one rules block; partial
+                            # batches are submitted at the end of the page rather than waiting for the next
+                            batches = {}
+                            for index in np.argsort(-priorities, kind='stable'):
+                                item = items[index]
+                                item['priority'] = round(float(priorities[index]), 2)
+                                item['band'] = priority_band(item['priority'])
+                                item['low_risk'] = bool(low_risk[index])
+                                item['fetched_at'] = fetched_at
+                                total_items += 1
+                                item_subreddit = item['subreddit'] or subreddit_name
+                                batch = batches.setdefault(item_subreddit, [])
+                                batch.append((total_items, item))
+                                if len(batch) >= batch_size:
+                                    submit(batches.pop(item_subreddit), item_subreddit)
+                            for item_subreddit, batch in batches.items():
+                                submit(batch, item_subreddit)
+                            
+                            # Act on whatever has finished while the next page loads
+                            done = {future for future in pending if future.done()}
+                            pending -= done
+                            for future in done:
+                                self._apply_decisions(future.result(), human_review, action_limiter)
+                    except RedditAPIError as e:
+                        print(f"[ERROR] {e}")
+                        self.emit('error', {'message': str(e)})
+                        if not total_items:
+                            return
+                    finally:
+                        page_stream.close()
+                    
+                    if self.cancel_event.is_set():
+                        # Drop analysis that hasn't started; in-flight calls finish and are discarded
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        self.emit('moderation_cancelled', {
+                            'message': f"Moderation cancelled for r/{subreddit_name}",
+                            'job_id': self.job_id,
+                            'total_processed': total_items
                         })
+                        return
                     
-                    # Process mod reports  
-                    for report in mod_reports:
-                        reports.append({
-                            'type': 'mod_report',
-                            'reason': report[0] if report else 'No reason given',
-                            'moderator': report[1] if len(report) > 1 else 'Unknown'
+                    if not total_items:
+                        self.emit('status_update', {
+                            'message': "Mod queue is empty!",
+                            'type': 'info'
                         })
+                        return
                     
-                    # Check if item was previously removed
-                    removal_reason = None
-                    if item.get('removed'):
-                        removal_reason = item.get('removal_reason') or "Previously removed (no reason given)"
-                            
-                except Exception as e:
-                    print(f"[ERROR] Error getting reports: {e}")
+                    self.emit('status_update', {
+                        'message': f"Found {total_items} items in mod queue",
+                        'type': 'success'
+                    })
+                    
+                    for future in as_completed(pending):
+                        self._apply_decisions(future.result(), human_review, action_limiter)
+                        if self.cancel_event.is_set():
+                            executor.shutdown(wait=False, cancel_futures=True)
+                            self.emit('moderation_cancelled', {
+                                'message': f"Moderation cancelled for r/{subreddit_name}",
+                                'job_id': self.job_id,
+                                'total_processed': total_items
+                            })
+                            return
                 
-                # Emit item being analyzed
-                socketio.emit('item_analyzing', {
-                    'item_number': i,
-                    'total_items': len(mod_queue_items),
-                    'type': item_type,
-                    'title': title,
-                    'author': author,
-                    'score': item.get('score', 0),
-                    'content': display_content,
-                    'full_content': content,  # Send full content for "Read More"
-                    'url': f"https://reddit.com{item.get('permalink', '')}",
-                    'permalink': item.get('permalink', ''),
-                    'reports': reports,
-                    'user_reports': user_reports,
-                    'mod_reports': mod_reports,
-                    'removal_reason': removal_reason,
-                    'created_utc': item.get('created_utc', 0)
+                tier_summary = ', '.join(f"{count} by {tier}" for tier, count in self.tier_counts.most_common())
+                self.emit('status_update', {
+                    'message': f"Decisions: {tier_summary}",
+                    'type': 'info'
                 })
                 
-                # Analyze with AI
-                ai_start = time.time()
-                decision = self.analyze_with_ai(title, content, author, item.get('score', 0), subreddit_name)
-                ai_time = time.time() - ai_start
-                print(f"[PERF] AI analysis took {ai_time:.2f} seconds")
+                RUN_THROUGHPUT.observe(total_items / run_span.elapsed)
+                band_latency = self.band_latency.stats()
+                self.emit('status_update', {
+                    'message': "Time to decision: " + ', '.join(
+                        f"{band} p95 {stats['p95']:.2f}s ({stats['count']})" for band, stats in band_latency.items()
+                    ),
+                    'type': 'info'
+                })
                 
-                # Emit AI decision
-                socketio.emit('ai_decision', {
-                    'item_number': i,
-                    'action': decision['action'],
-                    'reason': decision['reason'],
-                    'confidence': decision['confidence']
+                self.emit('moderation_complete', {
+                    'message': f"Moderation complete for r/{subreddit_name}!",
+                    'job_id': self.job_id,
+                    'total_processed': total_items,
+                    'tier_counts': dict(self.tier_counts),
+                    'band_latency': band_latency,
+                    'cache_stats': decision_cache.stats()
                 })
                 
-                # In human review mode, don't take action immediately
-                if not human_review:
-                    # Take action immediately
-                    action_taken = False
-                    error_message = None
-                    
-                    try:
-                        if decision['action'] == 'APPROVE':
-                            item.mod.approve()
-                            action_taken = True
-                        elif decision['action'] == 'REMOVE':
-                            item.mod.remove()
-                            action_taken = True
-                        
-                        time.sleep(2)  # Rate limiting
-                        
-                    except Exception as e:
-                        error_message = str(e)
-                    
-                    # Emit action result
-                    socketio.emit('action_result', {
-                        'item_number': i,
-                        'action': decision['action'],
-                        'action_taken': action_taken,
-                        'human_review': False,
-                        'error': error_message
-                    })
-            
-            socketio.emit('moderation_complete', {
-                'message': f"Moderation complete for r/{subreddit_name}!",
-                'total_processed': len(mod_queue_items)
-            })
-            
-        except Exception as e:
-            error_time = time.time()
-            print(f"[ERROR] Error in moderation after {error_time - start_time:.2f} seconds: {e}")
-            socketio.emit('error', {
-                'message': f"Error moderating r/{subreddit_name}: {str(e)}"
-            })
-        finally:
-            total_time = time.time() - start_time
-            print(f"[PERF] Total moderation time: {total_time:.2f} seconds")
+            except Exception as e:
+                run_span.fail(e)
+                print(f"[ERROR] Error in moderation after {run_span.elapsed:.2f} seconds: {e}")
+                self.emit('error', {
+                    'message': f"Error moderating r/{subreddit_name}: {str(e)}"
+                })
+    
+    def _assistant_reply(self, on_delta=None, cancel_event=None, **kwargs):
+        """Return the text of a chat completion, streamed through on_delta if given."""
+        if on_delta is None:
+            response = openai_completion(self.openai_client, **kwargs)
+            return response.choices[0].message.content
+        text, _ = openai_stream(self.openai_client, on_delta, cancel_event, **kwargs)
+        return text
     
-    def chat_with_ai(self, user_message, context):
-        """Chat with AI about a specific moderation decision."""
+    def chat_with_ai(self, user_message, context, on_delta=None, cancel_event=None):
+        """Chat with AI about a specific moderation decision.
+        
+        With ``on_delta``, the reply is streamed: each piece of text is passed
+        to it as OpenAI produces it, and generation stops once
+        ``cancel_event`` is set (the text so far is returned).
+        """
         try:
             print(f"AI Chat - User message: {user_message}")
             print(f"AI Chat - Context: {context}")
@@ -463,7 +1397,8 @@ Please provide a helpful response about your moderation decision, the content, o
             if not self.openai_client:
                 return "Error: OpenAI client not initialized"
 
-            response = self.openai_client.chat.completions.create(
+            ai_response = self._assistant_reply(
+                on_delta, cancel_event,
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are a helpful Reddit moderation assistant having a conversation with a human moderator."},
@@ -472,8 +1407,6 @@ Please provide a helpful response about your moderation decision, the content, o
                 temperature=0.7,
                 max_tokens=300
             )
-            
-            ai_response = response.choices[0].message.content
             print(f"AI Chat - Got response: {ai_response[:100]}...")
             return ai_response
             
@@ -482,8 +1415,8 @@ Please provide a helpful response about your moderation decision, the content, o
             print(error_msg)
             return error_msg
     
-    def generate_removal_reason(self, context):
-        """Generate a removal reason explanation for content."""
+    def generate_removal_reason(self, context, on_delta=None, cancel_event=None):
+        """Generate a removal reason explanation for content (streamed like chat_with_ai)."""
         try:
             author = context.get('author', 'unknown')
             content = context.get('content', '')
@@ -523,7 +1456,8 @@ Write a professional, clear removal reason that:
 
 Keep it concise (2-3 sentences) and professional. This will be posted as the official removal reason."""
 
-            response = self.openai_client.chat.completions.create(
+            return self._assistant_reply(
+                on_delta, cancel_event,
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are writing professional Reddit removal reasons for moderators."},
@@ -533,16 +1467,49 @@ Keep it concise (2-3 sentences) and professional. This will be posted as the off
                 max_tokens=200
             )
             
-            return response.choices[0].message.content
-            
         except Exception as e:
             return f"Content removed for violating subreddit rules. (Error generating detailed reason: {e})"
 
-dashboard = ModerationDashboard()
+def session_dashboard():
+    """
+    Build a dashboard for the current Socket.IO client from its login session.
+
+    Nothing is kept in process globals, so any worker can serve the client.
+    """
+    mod_dashboard = ModerationDashboard(room=request.sid)
+    mod_dashboard.reddit_token = session.get('reddit_access_token')
+    mod_dashboard.reddit_username = session.get('reddit_username')
+    if mod_dashboard.reddit_username:
+        mod_dashboard.current_subreddit = state_store.get(f'subreddit:{mod_dashboard.reddit_username}')
+        mod_dashboard.openai_api_key = state_store.get(f'credentials:{mod_dashboard.reddit_username}:openai')
+        mod_dashboard.openai_client = openai_client_for(mod_dashboard.openai_api_key)
+    return mod_dashboard
+
+def client_int(data, name, minimum=1):
+    """Read an optional integer option sent by a Socket.IO client.
+    
+    Returns:
+        The value, or None if it was not sent
+    
+    Raises:
+        ValueError: The value is not an integer of at least ``minimum``
+    """
+    value = data.get(name)
+    if value is None:
+        return None
+    try:
+        if isinstance(value, bool):
+            raise TypeError(name)
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a whole number")
+    if number < minimum:
+        raise ValueError(f"{name} must be at least {minimum}")
+    return number
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return render_template('index.html', socketio_transports=SOCKETIO_TRANSPORTS)
 
 @app.route('/api/authenticate', methods=['POST'])
 def authenticate():
@@ -550,7 +1517,8 @@ def authenticate():
         # Get credentials from request body
         credentials = request.get_json() if request.is_json else None
         
-        success, message = dashboard.authenticate(credentials)
+        auth_dashboard = ModerationDashboard()
+        success, message = auth_dashboard.authenticate(credentials)
         
         response_data = {
             'success': success, 
@@ -558,8 +1526,18 @@ def authenticate():
         }
         
         # Include username if authentication was successful
-        if success and dashboard.current_username:
-            response_data['username'] = dashboard.current_username
+        if success and auth_dashboard.current_username:
+            response_data['username'] = auth_dashboard.current_username
+            
+            # Keep the login in the session (and the OpenAI key server-side) so every worker sees it.
+            # The key is stored unencrypted, so it expires with the session and is deleted on logout.
+            session.permanent = True
+            session['reddit_access_token'] = auth_dashboard.reddit_token
+            session['reddit_username'] = auth_dashboard.current_username
+            session['authenticated'] = True
+            if auth_dashboard.openai_api_key:
+                state_store.set(f'credentials:{auth_dashboard.current_username}:openai',
+                                auth_dashboard.openai_api_key, ttl=SESSION_LIFETIME)
             
         return jsonify(response_data)
         
@@ -594,7 +1572,7 @@ def reddit_oauth():
         'scope': 'identity mysubreddits modposts read'
     }
     
-    auth_url = 'https://www.reddit.com/api/v1/authorize?' + urllib.parse.urlencode(params)
+    auth_url = f'{REDDIT_WWW_BASE}/api/v1/authorize?' + urllib.parse.urlencode(params)
     return redirect(auth_url)
 
 @app.route('/auth/reddit/callback')
@@ -634,8 +1612,9 @@ def reddit_callback():
             'redirect_uri': redirect_uri
         }
         
-        response = requests.post('https://www.reddit.com/api/v1/access_token', 
-                               headers=headers, data=data, timeout=30)
+        with tracer.span('reddit.token', grant='authorization_code'):
+            response = reddit_client.post(f'{REDDIT_WWW_BASE}/api/v1/access_token', 
+                                          headers=headers, data=data, timeout=30)
         
         if response.status_code != 200:
             return jsonify({'error': f'Token exchange failed: {response.text}'}), 400
@@ -653,8 +1632,8 @@ def reddit_callback():
             'User-Agent': 'web:reddit-moderation-dashboard:v1.0 (by /u/bigmur72)'
         }
         
-        user_response = requests.get('https://oauth.reddit.com/api/v1/me', 
-                                   headers=user_headers, timeout=30)
+        user_response = reddit_client.get(f'{REDDIT_API_BASE}/api/v1/me', 
+                                        headers=user_headers, timeout=30)
         
         if user_response.status_code == 200:
             user_data = user_response.json()
@@ -663,6 +1642,7 @@ def reddit_callback():
             username = 'unknown'
         
         # Store tokens in session
+        session.permanent = True
         session['reddit_access_token'] = access_token
         session['reddit_refresh_token'] = refresh_token
         session['reddit_username'] = username
@@ -679,6 +1659,8 @@ def reddit_callback():
 @app.route('/auth/logout')
 def logout():
     """Clear session and logout"""
+    if session.get('reddit_username'):
+        state_store.delete(f"credentials:{session['reddit_username']}:openai")
     session.clear()
     return redirect('/?auth=logout')
 
@@ -708,8 +1690,8 @@ def get_moderated_subreddits():
             'User-Agent': f'web:reddit-moderation-dashboard:v1.0 (by /u/{username})'
         }
         
-        response = requests.get('https://oauth.reddit.com/subreddits/mine/moderator', 
-                              headers=headers, timeout=30)
+        response = reddit_client.get(f'{REDDIT_API_BASE}/subreddits/mine/moderator', 
+                                     headers=headers, timeout=30)
         
         if response.status_code != 200:
             return jsonify({'error': f'Failed to fetch subreddits: {response.text}'}), 400
@@ -733,71 +1715,215 @@ def get_moderated_subreddits():
     except Exception as e:
         return jsonify({'error': f'Error fetching subreddits: {str(e)}'}), 500
 
+@app.route('/api/scheduler-status', methods=['GET'])
+def scheduler_status():
+    """Current rate and queue depth of the action and AI schedulers"""
+    return jsonify({
+        'reddit': reddit_client.scheduler_status(),
+        'openai': ai_limiter.stats(),
+        'analysis_latency': analysis_latency.stats(),
+        'stages': tracer.stats()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics of this worker process"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/decision-history', methods=['GET'])
+def decision_history():
+    """Recorded decisions, filtered by subreddit, author, fullname and time range"""
+    if not session.get('authenticated'):
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    args = request.args
+    rows = decision_store.history(
+        subreddit=args.get('subreddit'),
+        author=args.get('author'),
+        fullname=args.get('fullname'),
+        since=args.get('since', type=float),
+        until=args.get('until', type=float),
+        limit=min(args.get('limit', 100, type=int), 1000)
+    )
+    return jsonify({'decisions': rows, 'store': decision_store.stats()})
+
 @socketio.on('start_moderation')
 def handle_start_moderation(data):
     """Start moderation process."""
-    subreddit_name = data.get('subreddit', '')
-    limit = data.get('limit', 5)
+    # 'subreddits' (a list) moderates several queues at once; subreddit 'mod' is the combined queue
+    subreddit_name = data.get('subreddits') or data.get('subreddit', '')
     human_review = data.get('human_review', False)
+    local_rules = data.get('local_rules', True)
     
     # Check if user is authenticated via session
     if not session.get('authenticated'):
         emit('error', {'message': 'Please authenticate first'})
         return
     
+    try:
+        # Limit 0 (or null) drains the queue
+        limit = client_int(data, 'limit', minimum=0) if 'limit' in data else 5
+        max_concurrency = client_int(data, 'concurrency')
+        batch_size = client_int(data, 'batch_size')
+    except ValueError as e:
+        emit('error', {'message': f'Invalid moderation options: {e}'})
+        return
+    # Every analysis worker is a thread, so clients can't ask for more than the server allows
+    if max_concurrency:
+        max_concurrency = min(max_concurrency, AI_MAX_CONCURRENCY)
+    
     # Create dashboard instance with session token
-    mod_dashboard = ModerationDashboard()
-    mod_dashboard.reddit_token = session.get('reddit_access_token')
-    mod_dashboard.reddit_username = session.get('reddit_username')
+    mod_dashboard = session_dashboard()
     
     if not mod_dashboard.reddit_token:
         emit('error', {'message': 'No Reddit access token found. Please login again.'})
         return
     
-    # Run moderation in background thread
-    thread = threading.Thread(
-        target=mod_dashboard.moderate_subreddit,
-        args=(subreddit_name, limit, human_review)
-    )
-    thread.daemon = True
-    thread.start()
+    def run(job):
+        mod_dashboard.job_id = job.job_id
+        mod_dashboard.cancel_event = job.cancel_event
+        mod_dashboard.moderate_subreddit(subreddit_name, limit, human_review, max_concurrency,
+                                         batch_size, local_rules)
+    
+    # Run moderation on the bounded job pool; a second click for the same subreddit reuses the active job
+    if isinstance(subreddit_name, (list, tuple)):
+        job_key = '+'.join(sorted(name.lower() for name in subreddit_name))
+    else:
+        job_key = subreddit_name
+    
+    try:
+        job, created = job_manager.submit(mod_dashboard.reddit_username, job_key, run, room=request.sid)
+    except JobQueueFull as e:
+        emit('error', {'message': f'Server busy: {e}. Please try again shortly.'})
+        return
+    
+    if not created:
+        emit('status_update', {
+            'message': f"Moderation for r/{job_key} is already {job.status} (job {job.job_id})",
+            'type': 'info'
+        })
+    counts = job_manager.status()
+    emit('job_status', dict(job.as_dict(), queued=counts['queued'], active=counts['active']))
+
+@socketio.on('cancel_moderation')
+def handle_cancel_moderation(data):
+    """Cancel one of the current user's moderation jobs."""
+    job_id = (data or {}).get('job_id')
+    if not session.get('authenticated') or not job_id:
+        emit('error', {'message': 'No moderation job to cancel'})
+        return
+    
+    if job_manager.cancel(job_id, user=session.get('reddit_username')):
+        emit('status_update', {'message': 'Cancelling moderation...', 'type': 'info'})
+    else:
+        emit('status_update', {'message': 'Moderation job is not running', 'type': 'info'})
+    
+    job = job_manager.get(job_id)
+    if job:
+        emit('job_status', job.as_dict())
+
+@socketio.on('job_status')
+def handle_job_status(data):
+    """Report the current user's jobs and the pool's queued/active counts."""
+    if not session.get('authenticated'):
+        emit('error', {'message': 'Please authenticate first'})
+        return
+    
+    job_id = (data or {}).get('job_id')
+    status = job_manager.status(user=session.get('reddit_username'))
+    if job_id:
+        status['jobs'] = [job for job in status['jobs'] if job['job_id'] == job_id]
+    emit('job_status', status)
 
 @socketio.on('process_batch_actions')
 def handle_process_batch_actions(data):
-    """Process all batch actions."""
+    """Carry out the reviewed actions, streaming batch_progress per item, then batch_complete."""
     try:
         actions = data.get('actions', {})
-        subreddit_name = data.get('subreddit', '')
-        dry_run = data.get('dry_run', True)
+        dry_run = bool(data.get('dry_run', False))
         
         # Check authentication via session
         if not session.get('authenticated'):
-            socketio.emit('batch_process_error', {'error': 'Not authenticated'})
+            emit('batch_process_error', {'error': 'Not authenticated'})
             return
         
         # Create dashboard with session token
-        mod_dashboard = ModerationDashboard()
-        mod_dashboard.reddit_token = session.get('reddit_access_token')
-        mod_dashboard.reddit_username = session.get('reddit_username')
+        mod_dashboard = session_dashboard()
+        subreddit_name = data.get('subreddit') or mod_dashboard.current_subreddit
         
         if not mod_dashboard.reddit_token:
-            socketio.emit('batch_process_error', {'error': 'No access token'})
+            emit('batch_process_error', {'error': 'No access token'})
             return
         
-        results = mod_dashboard.process_batch_actions(actions, subreddit_name, dry_run)
-        socketio.emit('batch_process_complete', results)
+        with tracer.span('batch_actions', log=True, subreddit=subreddit_name, actions=len(actions)):
+            results = mod_dashboard.process_batch_actions(actions, subreddit_name, dry_run)
+        emit('batch_complete', results)
         
     except Exception as e:
-        error_time = time.time()
-        print(f"[ERROR] Error in moderation after {error_time - start_time:.2f} seconds: {e}")
-        socketio.emit('error', {'message': f'Moderation failed: {str(e)}'})
-    finally:
-        total_time = time.time() - start_time
-        print(f"[PERF] Total moderation time: {total_time:.2f} seconds")
+        print(f"[ERROR] Error in batch actions: {e}")
+        emit('batch_process_error', {'error': f'Batch actions failed: {str(e)}'})
+
+@socketio.on('human_decision')
+def handle_human_decision(data):
+    """Record a moderator's override of the AI decision (carried out later by batch processing)."""
+    if not session.get('authenticated') or not data.get('fullname') or not data.get('action'):
+        return
+    record_final_action(data['fullname'], data['action'], author=data.get('author'),
+                        by=session.get('reddit_username'), subreddit=data.get('subreddit'))
+
+# Cancel flags of in-flight streamed replies, by (sid, kind, item_number). A
+# Socket.IO connection is served by one worker, so these stay process-local.
+_ai_streams = {}
+_ai_streams_lock = threading.Lock()
+
+def _start_ai_stream(kind, item_number):
+    """Register a streamed reply for the current client, cancelling its previous one for the item."""
+    cancel_event = threading.Event()
+    key = (request.sid, kind, str(item_number))
+    with _ai_streams_lock:
+        previous = _ai_streams.get(key)
+        _ai_streams[key] = cancel_event
+    if previous is not None:
+        previous.set()
+    return cancel_event
+
+def _end_ai_stream(kind, item_number, cancel_event):
+    key = (request.sid, kind, str(item_number))
+    with _ai_streams_lock:
+        if _ai_streams.get(key) is cancel_event:
+            del _ai_streams[key]
+
+def _chunk_emitter(event, item_number):
+    """
+    Return (on_delta, flush) forwarding streamed text as ``event`` chunks.
+    
+    The first chunk is sent at once (time to first token is what moderators
+    notice); later text is batched into at most one event per
+    AI_STREAM_EMIT_INTERVAL seconds.
+    """
+    pending = []
+    last_sent = [None]
+    
+    def flush():
+        if pending:
+            emit(event, {'item_number': item_number, 'delta': ''.join(pending)})
+            pending.clear()
+            last_sent[0] = time.monotonic()
+    
+    def on_delta(delta):
+        pending.append(delta)
+        if last_sent[0] is None or time.monotonic() - last_sent[0] >= AI_STREAM_EMIT_INTERVAL:
+            flush()
+    
+    return on_delta, flush
 
 @socketio.on('ai_chat')
 def handle_ai_chat(data):
-    """Handle AI chat conversation within review blocks."""
+    """Handle AI chat conversation within review blocks.
+    
+    Unless ``stream`` is false, the reply is streamed as ``ai_chat_chunk``
+    events followed by ``ai_chat_response`` with the whole text.
+    """
     try:
         print(f"AI Chat handler - Received data: {data}")
         item_number = data.get('item_number')
@@ -808,113 +1934,103 @@ def handle_ai_chat(data):
         
         # Check authentication via session
         if not session.get('authenticated'):
-            socketio.emit('ai_chat_response', {
+            emit('ai_chat_response', {
                 'item_number': item_number,
                 'response': 'Error: Not authenticated'
             })
             return
         
         # Create dashboard with session token
-        mod_dashboard = ModerationDashboard()
-        mod_dashboard.reddit_token = session.get('reddit_access_token')
-        mod_dashboard.reddit_username = session.get('reddit_username')
+        mod_dashboard = session_dashboard()
         
-        response = mod_dashboard.chat_with_ai(user_message, context)
+        if not data.get('stream', True):
+            response = mod_dashboard.chat_with_ai(user_message, context)
+            print(f"AI Chat handler - Got response, emitting to client...")
+            emit('ai_chat_response', {
+                'item_number': item_number,
+                'response': response
+            })
+            return
         
-        print(f"AI Chat handler - Got response, emitting to client...")
-        socketio.emit('ai_chat_response', {
+        cancel_event = _start_ai_stream('chat', item_number)
+        on_delta, flush = _chunk_emitter('ai_chat_chunk', item_number)
+        try:
+            with tracer.span('openai.chat_stream', item_number=item_number) as span:
+                response = mod_dashboard.chat_with_ai(user_message, context, on_delta, cancel_event)
+                span.set(cancelled=cancel_event.is_set())
+            flush()
+        finally:
+            _end_ai_stream('chat', item_number, cancel_event)
+        
+        emit('ai_chat_response', {
             'item_number': item_number,
-            'response': response
+            'response': response,
+            'cancelled': cancel_event.is_set()
         })
         
     except Exception as e:
         error_msg = f"Error in AI chat handler: {e}"
         print(error_msg)
-        socketio.emit('ai_chat_error', {
+        emit('ai_chat_error', {
             'item_number': data.get('item_number'),
             'error': str(e)
         })
 
 @socketio.on('generate_removal_reason')
 def handle_generate_removal_reason(data):
-    """Generate AI removal reason for content."""
+    """Generate AI removal reason for content (streamed as ``removal_reason_chunk`` events unless ``stream`` is false)."""
     try:
         context = data.get('context', {})
         item_number = data.get('item_number')
         
         print(f"Generating removal reason for item {item_number} with context: {context}")
         
-        # Use the global dashboard instance instead of creating a new one
-        removal_reason = dashboard.generate_removal_reason(context)
+        if not data.get('stream', True):
+            removal_reason = session_dashboard().generate_removal_reason(context)
+            cancelled = False
+        else:
+            cancel_event = _start_ai_stream('removal_reason', item_number)
+            on_delta, flush = _chunk_emitter('removal_reason_chunk', item_number)
+            try:
+                with tracer.span('openai.removal_reason_stream', item_number=item_number) as span:
+                    removal_reason = session_dashboard().generate_removal_reason(context, on_delta, cancel_event)
+                    span.set(cancelled=cancel_event.is_set())
+                flush()
+            finally:
+                _end_ai_stream('removal_reason', item_number, cancel_event)
+            cancelled = cancel_event.is_set()
         
         print(f"Generated removal reason: {removal_reason}")
         
-        socketio.emit('removal_reason_generated', {
+        emit('removal_reason_generated', {
             'item_number': item_number,
-            'reason': removal_reason
+            'reason': removal_reason,
+            'cancelled': cancelled
         })
         
     except Exception as e:
         print(f"Error generating removal reason: {e}")
-        socketio.emit('removal_reason_error', {
+        emit('removal_reason_error', {
             'item_number': data.get('item_number'),
             'error': str(e)
         })
 
-@socketio.on('process_batch_actions')
-def handle_batch_processing(data):
-    actions = data.get('actions', {})
-    subreddit_name = dashboard.current_subreddit
-    
-    if not dashboard.reddit or not subreddit_name:
-        emit('error', {'message': 'No active moderation session'})
-        return
-    
-    try:
-        subreddit = dashboard.reddit.subreddit(subreddit_name)
-        mod_queue_items = list(subreddit.mod.modqueue(limit=20))
-        
-        processed_count = 0
-        for item_number, action in actions.items():
-            if action == 'skip':
-                continue
-                
-            # Find the corresponding Reddit item
-            item_index = int(item_number) - 1
-            if item_index < len(mod_queue_items):
-                item = mod_queue_items[item_index]
-                
-                try:
-                    if action == 'approve':
-                        item.mod.approve()
-                    elif action == 'remove':
-                        item.mod.remove()
-                    
-                    processed_count += 1
-                    time.sleep(1)  # Rate limiting
-                    
-                    # Emit progress
-                    socketio.emit('batch_progress', {
-                        'item_number': item_number,
-                        'action': action,
-                        'success': True
-                    })
-                    
-                except Exception as e:
-                    socketio.emit('batch_progress', {
-                        'item_number': item_number,
-                        'action': action,
-                        'success': False,
-                        'error': str(e)
-                    })
-        
-        socketio.emit('batch_complete', {
-            'message': f'Processed {processed_count} actions successfully',
-            'processed_count': processed_count
-        })
-        
-    except Exception as e:
-        emit('error', {'message': f'Batch processing error: {str(e)}'})
+@socketio.on('cancel_ai_stream')
+def handle_cancel_ai_stream(data):
+    """Stop a streamed reply, e.g. when the moderator closes the chat panel (``kind`` is chat or removal_reason)."""
+    key = (request.sid, data.get('kind', 'chat'), str(data.get('item_number')))
+    with _ai_streams_lock:
+        cancel_event = _ai_streams.get(key)
+    if cancel_event is not None:
+        cancel_event.set()
+
+@socketio.on('disconnect')
+def handle_disconnect(reason=None):
+    """Stop the streamed replies of a client that went away."""
+    with _ai_streams_lock:
+        cancel_events = [event for (sid, _, _), event in _ai_streams.items() if sid == request.sid]
+    for cancel_event in cancel_events:
+        cancel_event.set()
 
 if __name__ == '__main__':
     import os
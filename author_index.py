@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Author history index.
+
+Keeps per-author moderation outcomes in memory (approval and removal counts,
+last action and the removal ratio over the author's most recent items) so a
+moderation run can look an author up in O(1) and decide items from repeat
+offenders, or consistently approved authors, without calling OpenAI.
+
+Outcomes are the final actions on items (moderator decisions, and actions
+the bot carried out on the model's own judgement), not AI suggestions. The
+caller must not feed back actions decided by this index or other local
+tiers, so the index can't reinforce its own fast-path decisions. Changing
+the action on an item already counted replaces its earlier outcome.
+
+Changes are written to SQLite by a background thread (on a real OS thread
+under gevent, see decision_store.run_blocking) as increments (counts
+added, new recent flags appended), so several workers sharing one file
+don't overwrite each other's totals; history is loaded again on start-up.
+A replaced outcome that was already written is corrected in the counts, but
+its flag stays in the stored recent window until it scrolls out.
+"""
+
+import atexit
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Optional, Dict, Any
+
+from decision_store import connect, run_blocking
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS author_history (
+    author TEXT PRIMARY KEY,
+    approvals INTEGER NOT NULL,
+    removals INTEGER NOT NULL,
+    last_action TEXT,
+    last_seen REAL,
+    recent TEXT NOT NULL
+)
+"""
+
+# Adds one worker's changes to whatever other workers have already written
+_UPSERT = (
+    "INSERT INTO author_history (author, approvals, removals, last_action, last_seen, recent) "
+    "VALUES (?, ?, ?, ?, ?, substr(?, -?)) ON CONFLICT(author) DO UPDATE SET "
+    "approvals = max(0, author_history.approvals + excluded.approvals), "
+    "removals = max(0, author_history.removals + excluded.removals), "
+    "last_action = CASE WHEN excluded.last_seen >= coalesce(author_history.last_seen, 0) "
+    "THEN excluded.last_action ELSE author_history.last_action END, "
+    "last_seen = max(coalesce(author_history.last_seen, 0), coalesce(excluded.last_seen, 0)), "
+    "recent = substr(author_history.recent || excluded.recent, -?)"
+)
+
+IGNORED_AUTHORS = ('', '[deleted]', 'AutoModerator')
+
+
+class AuthorStats:
+    """Moderation outcomes for one author."""
+
+    __slots__ = ('approvals', 'removals', 'last_action', 'last_seen', 'recent')
+
+    def __init__(self, window: int):
+        self.approvals = 0
+        self.removals = 0
+        self.last_action = None
+        self.last_seen = None
+        self.recent = deque(maxlen=window)  # (fullname, removed) for the latest items
+
+    @property
+    def recent_removal_ratio(self) -> float:
+        """Share of the author's recent items that were removed."""
+        return sum(removed for _, removed in self.recent) / len(self.recent) if self.recent else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'approvals': self.approvals,
+            'removals': self.removals,
+            'total': self.approvals + self.removals,
+            'last_action': self.last_action,
+            'last_seen': self.last_seen,
+            'recent_items': len(self.recent),
+            'recent_removal_ratio': self.recent_removal_ratio
+        }
+
+
+class PendingChange:
+    """Changes to one author not yet written to SQLite."""
+
+    __slots__ = ('approvals', 'removals', 'last_action', 'last_seen', 'recent')
+
+    def __init__(self):
+        self.approvals = 0
+        self.removals = 0
+        self.last_action = None
+        self.last_seen = None
+        self.recent = []  # (fullname, removed) appended since the last write
+
+    def merge(self, newer: 'PendingChange'):
+        """Fold in changes made after this one (used when a write failed)."""
+        self.approvals += newer.approvals
+        self.removals += newer.removals
+        if newer.last_seen is not None:
+            self.last_action = newer.last_action
+            self.last_seen = newer.last_seen
+        self.recent.extend(newer.recent)
+
+
+class AuthorIndex:
+    """Thread-safe, incrementally persisted index of per-author outcomes."""
+
+    def __init__(self, db_path: Optional[str] = None, window: int = 20, min_items: int = 5,
+                 remove_ratio: float = 0.9, approve_ratio: float = 0.0,
+                 max_tracked_items: int = 50000, flush_interval: float = 5.0):
+        """
+        Initialize the index and load persisted history.
+
+        Args:
+            db_path: SQLite file for persistence (memory only if None)
+            window: Recent items per author used for the rolling removal ratio
+            min_items: Recent items needed before an author gets a fast-path decision
+            remove_ratio: Rolling removal ratio at or above which items are removed
+            approve_ratio: Rolling removal ratio at or below which items are approved
+            max_tracked_items: Items remembered so a changed action replaces its outcome
+            flush_interval: Seconds between background writes of changed authors
+        """
+        self.db_path = db_path
+        self.window = window
+        self.min_items = min_items
+        self.remove_ratio = remove_ratio
+        self.approve_ratio = approve_ratio
+        self.max_tracked_items = max_tracked_items
+        self.flush_interval = flush_interval
+        self.lookups = 0
+        self.fast_path_hits = 0
+        self._authors = {}
+        self._items = OrderedDict()  # fullname -> (author, removed)
+        self._pending = {}  # author -> PendingChange
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        if db_path:
+            self._load()
+            threading.Thread(target=self._flush_loop, name='author-index-writer', daemon=True).start()
+            atexit.register(self.close)
+
+    def _load(self):
+        """Load persisted author stats."""
+        conn = connect(self.db_path)
+        conn.execute(SCHEMA)
+        rows = conn.execute(
+            "SELECT author, approvals, removals, last_action, last_seen, recent FROM author_history"
+        ).fetchall()
+        conn.close()
+
+        for author, approvals, removals, last_action, last_seen, recent in rows:
+            stats = AuthorStats(self.window)
+            # A new row may start from a negative increment (an outcome replaced before its first write)
+            stats.approvals = max(0, approvals)
+            stats.removals = max(0, removals)
+            stats.last_action = last_action
+            stats.last_seen = last_seen
+            stats.recent.extend((None, flag == '1') for flag in recent)
+            self._authors[author] = stats
+
+    def record(self, author: Optional[str], action: str, fullname: Optional[str] = None):
+        """
+        Record the final action on an item.
+
+        Args:
+            author: Item author
+            action: APPROVE or REMOVE (anything else is ignored)
+            fullname: Item fullname; a repeated fullname replaces its earlier outcome
+        """
+        action = (action or '').upper()
+        if author in IGNORED_AUTHORS or author is None or action not in ('APPROVE', 'REMOVE'):
+            return
+        removed = action == 'REMOVE'
+
+        with self._lock:
+            previous = self._items.pop(fullname, None) if fullname else None
+            if previous:
+                self._forget(previous[0], fullname, previous[1])
+
+            stats = self._authors.get(author)
+            if stats is None:
+                stats = self._authors[author] = AuthorStats(self.window)
+            if removed:
+                stats.removals += 1
+            else:
+                stats.approvals += 1
+            stats.last_action = action
+            stats.last_seen = time.time()
+            stats.recent.append((fullname, removed))
+
+            change = self._change(author)
+            if removed:
+                change.removals += 1
+            else:
+                change.approvals += 1
+            change.last_action = stats.last_action
+            change.last_seen = stats.last_seen
+            change.recent.append((fullname, removed))
+
+            if fullname:
+                self._items[fullname] = (author, removed)
+                while len(self._items) > self.max_tracked_items:
+                    self._items.popitem(last=False)
+
+    def _change(self, author: str) -> PendingChange:
+        """Pending change record for an author. Caller holds the lock."""
+        change = self._pending.get(author)
+        if change is None:
+            change = self._pending[author] = PendingChange()
+        return change
+
+    def _forget(self, author: str, fullname: str, removed: bool):
+        """Undo an item's earlier outcome. Caller holds the lock."""
+        stats = self._authors.get(author)
+        if stats is None:
+            return
+        if removed:
+            stats.removals = max(0, stats.removals - 1)
+        else:
+            stats.approvals = max(0, stats.approvals - 1)
+        for entry in reversed(stats.recent):
+            if entry[0] == fullname:
+                stats.recent.remove(entry)
+                break
+
+        change = self._change(author)
+        if removed:
+            change.removals -= 1
+        else:
+            change.approvals -= 1
+        for entry in reversed(change.recent):
+            if entry[0] == fullname:
+                change.recent.remove(entry)
+                break
+
+    def lookup(self, author: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return an author's stats, or None if the author has no history."""
+        with self._lock:
+            self.lookups += 1
+            stats = self._authors.get(author)
+            return stats.as_dict() if stats else None
+
+    def fast_decision(self, author: Optional[str], allow_approve: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Decide an item from its author's history alone, if the history is clear-cut.
+
+        Args:
+            author: Item author
+            allow_approve: Whether a consistently approved author may be approved
+                (callers pass False for reported items)
+
+        Returns:
+            Decision dict (action, reason, confidence, tier 'author') or None
+        """
+        with self._lock:
+            self.lookups += 1
+            stats = self._authors.get(author)
+            if stats is None or len(stats.recent) < self.min_items:
+                return None
+            ratio = stats.recent_removal_ratio
+            removed = sum(flag for _, flag in stats.recent)
+            count = len(stats.recent)
+
+            if ratio >= self.remove_ratio:
+                decision = {'action': 'REMOVE', 'confidence': 8,
+                            'reason': f'Repeat offender: {removed} of u/{author}\'s last {count} items were removed'}
+            elif allow_approve and ratio <= self.approve_ratio:
+                decision = {'action': 'APPROVE', 'confidence': 8,
+                            'reason': f'Trusted author: {count - removed} of u/{author}\'s last {count} items were approved'}
+            else:
+                return None
+            self.fast_path_hits += 1
+
+        decision['tier'] = 'author'
+        return decision
+
+    def _flush_loop(self):
+        """Write changed authors every flush_interval seconds."""
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Add the changes made since the last flush to the stored history."""
+        if not self.db_path:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        rows = []
+        for author, change in pending.items():
+            recent = ''.join('1' if removed else '0' for _, removed in change.recent)
+            rows.append((author, change.approvals, change.removals, change.last_action, change.last_seen,
+                         recent, self.window, self.window))
+
+        try:
+            run_blocking(self._write, rows)
+        except Exception as e:
+            print(f"[ERROR] Author index write of {len(rows)} author(s) failed: {e}")
+            with self._lock:
+                for author, change in pending.items():
+                    newer = self._pending.get(author)
+                    if newer is not None:
+                        change.merge(newer)
+                    self._pending[author] = change
+
+    def _write(self, rows):
+        """Upsert author rows in one transaction."""
+        conn = connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany(_UPSERT, rows)
+        finally:
+            conn.close()
+
+    def close(self):
+        """Stop the background writer and write pending changes."""
+        self._stop.set()
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return index size and fast-path counters."""
+        with self._lock:
+            return {
+                'authors': len(self._authors),
+                'tracked_items': len(self._items),
+                'pending_writes': len(self._pending),
+                'lookups': self.lookups,
+                'fast_path_hits': self.fast_path_hits,
+                'persistent': self.db_path is not None
+            }
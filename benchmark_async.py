@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark blocking-I/O concurrency of the server modes.
+
+Starts the fake Reddit and OpenAI servers from benchmark_e2e.py with a fixed
+delay per request (a stand-in for real Reddit and OpenAI round trips), then
+simulates N moderators in a child process that imports the app. Each
+moderator runs ModerationDashboard.moderate_subreddit on a queue of --calls
+items with its own Reddit token, so every request goes through the app's
+pooled RedditClient (rate limit tracking, retries) and every item through
+its PriorityExecutor and shared OpenAI client, one analysis in flight per
+moderator. Local rules are off and the decision cache and near-duplicate
+index expire immediately, so each item costs one OpenAI call. The modes are:
+
+  sync       one moderator at a time (a gunicorn sync worker)
+  threading  one OS thread per moderator (Flask-SocketIO threading mode)
+  gevent     one green thread per moderator (SOCKETIO_ASYNC_MODE=gevent, so
+             the app monkey-patches the standard library when imported)
+
+and reports wall time, upstream calls/sec, achieved in-flight calls, peak
+RSS and failed analyses (a moderator that raised fails all of its items).
+A mode that made no upstream calls at all is reported as an error.
+
+Usage: python benchmark_async.py [--clients 10,100,1000] [--calls 5] [--latency 0.2]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+MODES = ('sync', 'threading', 'gevent')
+
+
+def run_worker(mode, clients, calls):
+    """Child process: run the simulated moderators and print a JSON result line."""
+    os.environ['SOCKETIO_ASYNC_MODE'] = 'gevent' if mode == 'gevent' else 'threading'
+    import resource
+
+    import app
+    from benchmark_e2e import SUBREDDIT
+
+    in_flight = 0
+    peak = 0
+    total = 0
+    failures = 0
+    exceptions = []
+    lock = threading.Lock()
+
+    def counted(call):
+        """Wrap an upstream call so in-flight requests are counted."""
+        def wrapper(*args, **kwargs):
+            nonlocal in_flight, peak, total
+            with lock:
+                in_flight += 1
+                total += 1
+                peak = max(peak, in_flight)
+            try:
+                return call(*args, **kwargs)
+            finally:
+                with lock:
+                    in_flight -= 1
+        return wrapper
+
+    app.reddit_client.request = counted(app.reddit_client.request)
+    app.openai_completion = counted(app.openai_completion)
+
+    def moderator(number):
+        nonlocal failures
+        errors = []
+        try:
+            dashboard = app.ModerationDashboard()
+            dashboard.reddit_token = f"mod{number}"
+            dashboard.reddit_username = f"mod{number}"
+            dashboard.openai_client = app.openai_client_for('benchmark')
+            dashboard.emit = lambda event, data: errors.append(event) if (
+                event == 'error' or (event == 'ai_decision' and data.get('error'))) else None
+            dashboard.moderate_subreddit(SUBREDDIT, limit=calls, human_review=True, max_concurrency=1,
+                                         local_rules=False)
+        except Exception as e:
+            # A moderator that died counts every item it didn't get to as failed
+            errors.extend(['exception'] * max(1, calls - len(errors)))
+            with lock:
+                exceptions.append(f"{type(e).__name__}: {e}")
+        with lock:
+            failures += len(errors)
+
+    start = time.perf_counter()
+    if mode == 'sync':
+        for number in range(clients):
+            moderator(number)
+    else:
+        workers = [threading.Thread(target=moderator, args=(number,)) for number in range(clients)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'elapsed': elapsed,
+        'calls': total,
+        'peak_in_flight': peak,
+        'failures': failures,
+        'exceptions': sorted(set(exceptions)),
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }))
+
+
+def arg(name, default):
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+
+def main():
+    if '--worker' in sys.argv:
+        run_worker(arg('--worker', 'threading'), int(arg('--clients', 10)), int(arg('--calls', 5)))
+        return
+
+    from benchmark_e2e import FakeOpenAIHandler, FakeRedditHandler, load_queue, make_queue, start_server
+
+    clients_list = [int(n) for n in arg('--clients', '10,100,1000').split(',')]
+    calls = int(arg('--calls', 5))
+    latency = float(arg('--latency', 0.2))
+
+    reddit = start_server(FakeRedditHandler, latency=latency, budget=1e9, window=600.0, window_reset=0.0,
+                          used=0, actions={'approve': 0, 'remove': 0})
+    openai = start_server(FakeOpenAIHandler, latency=latency, calls=0)
+    reddit.keep_acted = True  # Every moderator moderates the same queue
+    load_queue(reddit, make_queue(calls, 0))
+
+    env = dict(os.environ)
+    env.update({
+        'REDDIT_API_BASE': f"http://127.0.0.1:{reddit.server_address[1]}",
+        'OPENAI_BASE_URL': f"http://127.0.0.1:{openai.server_address[1]}/v1",
+        'OPENAI_REQUESTS_PER_MINUTE': '100000000',
+        'OPENAI_BURST': '100000',
+        'DECISION_STORE_PATH': '',
+        'AUTHOR_INDEX_PATH': '',
+        'DECISION_CACHE_PATH': '',
+        'DECISION_CACHE_TTL': '0',
+        'DEDUP_TTL': '0'
+    })
+
+    print(f"Upstream latency {latency * 1000:.0f} ms, {calls} items (1 mod queue page and {calls} "
+          f"sequential OpenAI calls) per moderator")
+    print(f"{'mode':<10} {'moderators':>10} {'wall':>9} {'calls/s':>9} {'in-flight':>10} {'rss MB':>8} {'failed':>7}")
+    print("=" * 69)
+
+    for clients in clients_list:
+        for mode in MODES:
+            # The sync worker serializes everything; skip sizes that would take minutes
+            if mode == 'sync' and clients * (calls + 1) * latency > 60:
+                print(f"{mode:<10} {clients:>10} {'(skipped: > 60s)':>28}")
+                continue
+
+            result = subprocess.run(
+                [sys.executable, __file__, '--worker', mode, '--clients', str(clients), '--calls', str(calls)],
+                capture_output=True, text=True, env=env
+            )
+            if result.returncode != 0:
+                reason = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'
+                print(f"{mode:<10} {clients:>10}  error: {reason}")
+                continue
+
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            if not stats['calls']:
+                # Nothing reached the upstream servers, so there's no throughput to report
+                reason = '; '.join(stats['exceptions']) or f"no upstream calls ({stats['failures']} failed)"
+                print(f"{mode:<10} {clients:>10}  error: {reason}")
+                continue
+            print(f"{mode:<10} {clients:>10} {stats['elapsed']:>8.2f}s {stats['calls'] / stats['elapsed']:>9.1f} "
+                  f"{stats['peak_in_flight']:>10} {stats['rss_mb']:>8.1f} {stats['failures']:>7}")
+            for exception in stats['exceptions']:
+                print(f"{'':<10} {'':>10}  exception: {exception}")
+
+    reddit.shutdown()
+    openai.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark the near-duplicate index on a synthetic comment stream.
+
+Indexes a mix of distinct comments and spam waves (one template reposted with
+small edits), then queries fresh edits of the spam templates and fresh
+distinct comments. Reports insert and query latency, how many spam copies
+were caught, how many distinct comments were wrongly matched, and the memory
+used by the index arrays.
+
+Usage: python benchmark_dedup.py [num_items] [--seed N]
+"""
+
+import random
+import sys
+import time
+
+from near_duplicate import NearDuplicateIndex
+
+WORDS = ("the grill was great but the burgers took forever honestly i would go back again "
+         "this weekend with friends and family to watch the game and complain about traffic "
+         "parking downtown is terrible and nobody ever fixes the potholes on main street").split()
+TEMPLATES = [
+    "Get {n} free followers today! Visit cheapfollowers{n}.com and use code SAVE{n} for an extra bonus",
+    "I made ${n} last week working from home, message me to learn how, spots are limited",
+    "Crypto giveaway: send 0.{n} BTC and receive double back instantly, verified by the official team",
+    "Hot singles in your area want to meet you tonight, click the link in my profile #{n}",
+]
+
+
+def distinct_comment(rng):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(12, 60)))
+
+
+def spam_copy(rng, template):
+    """A template with a new number and a couple of small word-level edits."""
+    words = template.format(n=rng.randint(10, 9999)).split()
+    for _ in range(2):
+        i = rng.randrange(len(words))
+        edit = rng.random()
+        if edit < 0.4:
+            words[i] = words[i].upper()
+        elif edit < 0.7:
+            words.insert(i, rng.choice(['really', 'now', 'guys', '!!', 'omg']))
+        else:
+            words[i] = words[i] + rng.choice(['.', '!', ','])
+    return ' '.join(words)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 100000
+    seed = int(sys.argv[sys.argv.index('--seed') + 1]) if '--seed' in sys.argv else 0
+    rng = random.Random(seed)
+
+    index = NearDuplicateIndex(capacity=size)
+    decision = {'action': 'REMOVE', 'reason': 'Spam', 'confidence': 9}
+
+    print(f"Indexing {size:,} items (10% spam copies)...")
+    insert_times = []
+    for n in range(size):
+        is_spam = n % 10 == 0
+        text = spam_copy(rng, rng.choice(TEMPLATES)) if is_spam else distinct_comment(rng)
+        start = time.perf_counter()
+        index.add(text, 'testsub', decision if is_spam else dict(decision, action='APPROVE'), ref=f't1_{n}')
+        insert_times.append(time.perf_counter() - start)
+
+    queries = 2000
+    query_times = []
+    caught = false_matches = 0
+    for n in range(queries):
+        is_spam = n % 2 == 0
+        text = spam_copy(rng, rng.choice(TEMPLATES)) if is_spam else distinct_comment(rng)
+        start = time.perf_counter()
+        match = index.find(text, 'testsub')
+        query_times.append(time.perf_counter() - start)
+        if is_spam and match and match['action'] == 'REMOVE':
+            caught += 1
+        elif not is_spam and match and match['action'] == 'REMOVE':
+            false_matches += 1
+
+    stats = index.stats()
+    print("=" * 60)
+    print(f"insert  p50 {percentile(insert_times, 50) * 1e6:8.1f} us   p99 {percentile(insert_times, 99) * 1e6:8.1f} us")
+    print(f"query   p50 {percentile(query_times, 50) * 1e6:8.1f} us   p99 {percentile(query_times, 99) * 1e6:8.1f} us")
+    print(f"spam copies caught:         {caught}/{queries // 2}")
+    print(f"distinct comments matched to spam: {false_matches}/{queries // 2}")
+    print(f"index arrays: {stats['array_bytes'] / 1e6:.1f} MB for {stats['size']:,} items")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the moderation pipeline against local stand-ins.
+
+Starts two local HTTP servers and points the dashboard at them, so no Reddit
+or OpenAI credentials are needed:
+
+  fake Reddit   /r/<sub>/about/modqueue (paged by ``after``), /api/approve,
+                /api/remove, /subreddits/mine/moderator and the login
+                endpoints (/api/v1/access_token, /api/v1/me), with a fixed
+                latency and X-Ratelimit-* headers from a per-window budget
+  fake OpenAI   /v1/chat/completions, answering single and batched
+                moderation prompts after a fixed latency, and streaming
+                a canned chat reply word by word when asked to stream
+
+For each queue size, a child process imports app.py and runs
+ModerationDashboard.moderate_subreddit twice on a synthetic queue (a mix of
+clean comments, link spam, reported items, a copy-paste spam wave and
+borderline posts):
+
+  auto    human_review=False; decisions are acted on as they arrive
+  batch   human_review=True, then the collected decisions are sent through
+          ModerationDashboard.process_batch_actions
+
+and reports wall time, items/sec, p50/p95/p99 decision latency (item shown
+to decision shown), p50/p95/p99 latency of approve/remove requests, the
+actions the fake Reddit server received and the child's peak RSS.
+
+Usage: python benchmark_e2e.py [--sizes 10,100,1000,10000] [--reddit-latency 0.02]
+                               [--openai-latency 0.05] [--concurrency 10] [--batch-size 1]
+                               [--reddit-budget 100000] [--openai-rpm 60000] [--seed 0]
+"""
+
+import base64
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUBREDDIT = 'benchsub'
+CLEAN = ("the grill was great but the burgers took forever honestly i would go back again "
+         "this weekend with friends and family to watch the game and complain about traffic").split()
+SPAM_WAVE = "Get free followers today! Visit cheapfollowers{n}.com and use code SAVE{n} for an extra bonus right now"
+
+
+def make_queue(size, seed):
+    """Build a synthetic mod queue of Reddit listing children, newest first."""
+    rng = random.Random(seed)
+    now = time.time()
+    children = []
+    for n in range(size):
+        kind = rng.random()
+        reports = []
+        score = rng.randint(-3, 40)
+        if kind < 0.55:
+            body = ' '.join(rng.choice(CLEAN) for _ in range(rng.randint(8, 40)))
+        elif kind < 0.7:
+            body = f"BUY NOW limited offer click here http://deals{n}.example.com"
+        elif kind < 0.8:
+            body = SPAM_WAVE.format(n=rng.randint(10, 9999))
+        elif kind < 0.92:
+            body = ' '.join(rng.choice(CLEAN) for _ in range(rng.randint(8, 40)))
+            reports = [['harassment', rng.randint(1, 3)]]
+        else:
+            body = "honestly this place is a joke and so are the people running it " * rng.randint(1, 3)
+        is_submission = rng.random() < 0.3
+        data = {
+            'name': f"{'t3' if is_submission else 't1'}_{n:x}",
+            'subreddit': SUBREDDIT,
+            'author': f"user{rng.randint(0, size // 4 + 1)}",
+            'score': score,
+            'permalink': f"/r/{SUBREDDIT}/comments/{n:x}/",
+            'created_utc': now - rng.randint(0, 86400),
+            'user_reports': reports,
+            'mod_reports': []
+        }
+        if is_submission:
+            data.update(title=body[:60], selftext=body)
+        else:
+            data.update(body=body)
+        children.append({'kind': 't3' if is_submission else 't1', 'data': data})
+    return children
+
+
+def load_queue(server, children):
+    """Replace a fake Reddit server's mod queue (see make_queue) and forget earlier actions."""
+    with server.lock:
+        server.queue = children
+        server.positions = {child['data']['name']: i for i, child in enumerate(children)}
+        server.acted = set()
+
+
+class FakeRedditHandler(BaseHTTPRequestHandler):
+    """Serves the mod queue and records moderation actions.
+
+    As on Reddit, approved or removed items leave the queue, and a listing
+    whose ``after`` cursor has left it is empty. Set ``keep_acted`` on the
+    server to keep them (the load tests do, so every moderator sees the same
+    queue).
+    """
+
+    def _reply(self, payload, status=200):
+        server = self.server
+        with server.lock:
+            now = time.monotonic()
+            if now >= server.window_reset:
+                server.window_reset = now + server.window
+                server.used = 0
+            server.used += 1
+            remaining = max(0, server.budget - server.used)
+            reset_in = server.window_reset - now
+
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Ratelimit-Remaining', f"{remaining:.1f}")
+        self.send_header('X-Ratelimit-Used', str(server.used))
+        self.send_header('X-Ratelimit-Reset', str(int(reset_in)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        url = urllib.parse.urlparse(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+
+        if url.path.endswith('/about/modqueue'):
+            queue = self.server.queue
+            with self.server.lock:
+                acted = set(self.server.acted)
+            start = 0
+            if params.get('after'):
+                cursor = params['after']
+                start = len(queue) if cursor in acted else self.server.positions.get(cursor, len(queue) - 1) + 1
+            page = []
+            end = start
+            while end < len(queue) and len(page) < int(params.get('limit', 25)):
+                if queue[end]['data']['name'] not in acted:
+                    page.append(queue[end])
+                end += 1
+            after = page[-1]['data']['name'] if page and end < len(queue) else None
+            self._reply({'kind': 'Listing', 'data': {'children': page, 'after': after}})
+        elif url.path == '/subreddits/mine/moderator':
+            self._reply({'data': {'children': [
+                {'data': {'display_name': SUBREDDIT, 'title': 'Benchmark', 'subscribers': 1000}}
+            ]}})
+        elif url.path == '/api/v1/me':
+            # Each client id logs in as its own user (see do_POST)
+            token = self.headers.get('Authorization', '').rsplit(' ', 1)[-1]
+            self._reply({'name': token[len('token-'):] if token.startswith('token-') else 'benchmod'})
+        else:
+            self._reply({'error': 404}, status=404)
+
+    def do_POST(self):
+        time.sleep(self.server.latency)
+        form = dict(urllib.parse.parse_qsl(self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode()))
+        action = self.path.rstrip('/').rsplit('/', 1)[-1]
+        if self.path == '/api/v1/access_token':
+            credentials = self.headers.get('Authorization', '').rsplit(' ', 1)[-1]
+            client_id = base64.b64decode(credentials).decode('utf-8').split(':', 1)[0] if credentials else 'bench'
+            self._reply({'access_token': f"token-{client_id}", 'token_type': 'bearer', 'expires_in': 3600})
+        elif action in ('approve', 'remove'):
+            with self.server.lock:
+                self.server.actions[action] += 1
+                if form.get('id') and not getattr(self.server, 'keep_acted', False):
+                    self.server.acted.add(form['id'])
+            self._reply({})
+        else:
+            self._reply({'error': 404}, status=404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Answers chat completions with moderation decisions."""
+
+    CHAT_REPLY = ("I flagged this because the wording matches patterns we usually remove, "
+                  "but the context matters and a human read is worth more than my guess. ") * 4
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        request = json.loads(self.rfile.read(length) or b'{}')
+        time.sleep(self.server.latency)
+
+        if request.get('stream'):
+            self._stream(request)
+            return
+
+        prompt = request.get('messages', [{}])[-1].get('content', '')
+        ids = re.findall(r'\[id ([^\]]+)\]', prompt)
+        if ids:
+            # One decision per packed item; the item text runs until the next marker
+            parts = re.split(r'\[id [^\]]+\]', prompt)[1:]
+            content = json.dumps([self._decide(text, item_id) for item_id, text in zip(ids, parts)])
+        else:
+            content = json.dumps(self._decide(prompt))
+
+        with self.server.lock:
+            self.server.calls += 1
+        prompt_tokens = len(prompt) // 4 + 1
+        completion_tokens = len(content) // 4 + 1
+        body = json.dumps({
+            'id': 'chatcmpl-bench',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'gpt-3.5-turbo'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens}
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, request):
+        """Send CHAT_REPLY as server-sent chunks, one word every server.chunk_delay seconds."""
+        with self.server.lock:
+            self.server.calls += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        base = {'id': 'chatcmpl-bench', 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                'model': request.get('model', 'gpt-3.5-turbo')}
+        words = self.CHAT_REPLY.split(' ')
+        try:
+            for i, word in enumerate(words):
+                delta = {'content': word if i == 0 else ' ' + word}
+                chunk = dict(base, choices=[{'index': 0, 'delta': delta, 'finish_reason': None}])
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                time.sleep(self.server.chunk_delay)
+            usage = {'prompt_tokens': 100, 'completion_tokens': len(words), 'total_tokens': 100 + len(words)}
+            chunk = dict(base, choices=[{'index': 0, 'delta': {}, 'finish_reason': 'stop'}])
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.write(f"data: {json.dumps(dict(base, choices=[], usage=usage))}\n\n".encode('utf-8'))
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the stream (a cancelled reply)
+            with self.server.lock:
+                self.server.streams_cancelled = getattr(self.server, 'streams_cancelled', 0) + 1
+
+    @staticmethod
+    def _decide(text, item_id=None):
+        text = text.lower()
+        if 'followers' in text or 'joke' in text:
+            decision = {'action': 'REMOVE', 'reason': 'Spam or incivility', 'confidence': 8}
+        else:
+            decision = {'action': 'APPROVE', 'reason': 'Within the rules', 'confidence': 7}
+        if item_id is not None:
+            decision['id'] = item_id
+        return decision
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 2048
+    chunk_delay = 0.01
+
+
+def start_server(handler, **attrs):
+    server = FakeServer(('127.0.0.1', 0), handler)
+    server.lock = threading.Lock()
+    for name, value in attrs.items():
+        setattr(server, name, value)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentiles(values):
+    if not values:
+        return [0.0, 0.0, 0.0]
+    values = sorted(values)
+    return [values[min(len(values) - 1, int(len(values) * pct / 100))] for pct in (50, 95, 99)]
+
+
+def run_worker(phase, concurrency, batch_size, openai_url):
+    """Child process: run one moderation phase and print a JSON result line."""
+    import resource
+
+    import app
+    from openai import OpenAI
+
+    dashboard = app.ModerationDashboard()
+    dashboard.reddit_token = 'benchmark-token'
+    dashboard.reddit_username = 'benchmod'
+    dashboard.openai_client = OpenAI(api_key='benchmark', base_url=openai_url, max_retries=0)
+
+    shown = {}
+    decision_latency = []
+    decisions = {}
+    errors = []
+    emit = dashboard.emit
+
+    def recording_emit(event, data):
+        now = time.perf_counter()
+        if event == 'item_analyzing':
+            shown[data['item_number']] = (now, data['fullname'])
+        elif event == 'ai_decision' and data['item_number'] in shown:
+            started, fullname = shown[data['item_number']]
+            decision_latency.append(now - started)
+            decisions[fullname] = data['action'].lower()
+        elif event in ('error', 'batch_process_error') or (event in ('action_result', 'batch_progress') and data.get('error')):
+            errors.append(data.get('message') or data.get('error'))
+        emit(event, data)
+
+    dashboard.emit = recording_emit
+
+    # Time approve/remove requests as the app sees them, including rate-limit waits
+    action_latency = []
+    request = app.reddit_client.request
+
+    def timed_request(method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            return request(method, url, **kwargs)
+        finally:
+            if url.endswith(('/api/approve', '/api/remove')):
+                action_latency.append(time.perf_counter() - start)
+
+    app.reddit_client.request = timed_request
+
+    start = time.perf_counter()
+    dashboard.moderate_subreddit(SUBREDDIT, limit=0, human_review=phase == 'batch',
+                                 max_concurrency=concurrency, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    batch_elapsed = None
+    if phase == 'batch':
+        start = time.perf_counter()
+        dashboard.process_batch_actions(decisions, SUBREDDIT, dry_run=False)
+        batch_elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'elapsed': elapsed,
+        'batch_elapsed': batch_elapsed,
+        'items': len(shown),
+        'decided': len(decision_latency),
+        'decision_latency': percentiles(decision_latency),
+        'action_latency': percentiles(action_latency),
+        'actions_sent': len(action_latency),
+        'errors': errors[:3],
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }))
+
+
+def arg(name, default):
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+
+def main():
+    if '--worker' in sys.argv:
+        run_worker(arg('--worker', 'auto'), int(arg('--concurrency', 10)),
+                   int(arg('--batch-size', 1)), arg('--openai-url', ''))
+        return
+
+    sizes = [int(n) for n in arg('--sizes', '10,100,1000,10000').split(',')]
+    concurrency = int(arg('--concurrency', 10))
+    batch_size = int(arg('--batch-size', 1))
+    seed = int(arg('--seed', 0))
+
+    reddit = start_server(FakeRedditHandler, latency=float(arg('--reddit-latency', 0.02)),
+                          budget=float(arg('--reddit-budget', 100000)), window=600.0,
+                          window_reset=0.0, used=0, actions={})
+    openai = start_server(FakeOpenAIHandler, latency=float(arg('--openai-latency', 0.05)), calls=0)
+    reddit_url = f"http://127.0.0.1:{reddit.server_address[1]}"
+    openai_url = f"http://127.0.0.1:{openai.server_address[1]}/v1"
+
+    env = dict(os.environ)
+    env.update({
+        'REDDIT_API_BASE': reddit_url,
+        'OPENAI_REQUESTS_PER_MINUTE': arg('--openai-rpm', '60000'),
+        'DECISION_STORE_PATH': '',
+        'AUTHOR_INDEX_PATH': '',
+        'DECISION_CACHE_PATH': ''
+    })
+
+    print(f"Reddit latency {reddit.latency * 1000:.0f} ms, OpenAI latency {openai.latency * 1000:.0f} ms, "
+          f"concurrency {concurrency}, batch size {batch_size}")
+    print(f"{'items':>6} {'phase':<6} {'wall':>8} {'items/s':>8} {'decision p50/p95/p99 ms':>24} "
+          f"{'action p50/p95/p99 ms':>22} {'approved':>8} {'removed':>8} {'AI calls':>8} {'RSS MB':>7}")
+    print("=" * 118)
+
+    for size in sizes:
+        for phase in ('auto', 'batch'):
+            load_queue(reddit, make_queue(size, seed))
+            reddit.actions = {'approve': 0, 'remove': 0}
+            openai.calls = 0
+
+            result = subprocess.run(
+                [sys.executable, __file__, '--worker', phase, '--concurrency', str(concurrency),
+                 '--batch-size', str(batch_size), '--openai-url', openai_url],
+                capture_output=True, text=True, env=env
+            )
+            if result.returncode != 0:
+                reason = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'
+                print(f"{size:>6} {phase:<6}  error: {reason}")
+                continue
+
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            wall = stats['elapsed'] + (stats['batch_elapsed'] or 0)
+            decision = '/'.join(f"{value * 1000:.1f}" for value in stats['decision_latency'])
+            action = '/'.join(f"{value * 1000:.1f}" for value in stats['action_latency'])
+            print(f"{size:>6} {phase:<6} {wall:>7.2f}s {stats['items'] / wall if wall else 0:>8.1f} "
+                  f"{decision:>24} {action:>22} {reddit.actions['approve']:>8} {reddit.actions['remove']:>8} "
+                  f"{openai.calls:>8} {stats['rss_mb']:>7.1f}")
+            if stats['errors']:
+                print(f"{'':>6} {'':<6} errors: {'; '.join(str(error) for error in stats['errors'])}")
+
+    reddit.shutdown()
+    openai.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark the local moderation rules on a synthetic comment corpus.
+
+Compares the original per-item implementation of
+RedditModerator._apply_moderation_rules (recompiling patterns and scanning
+the text once per rule) with the compiled RuleEngine, checks both make the
+same decisions, and reports items/sec.
+
+Usage: python benchmark_rules.py [num_comments] [--seed N]
+"""
+
+import random
+import re
+import sys
+import time
+
+from rule_engine import RuleEngine
+
+
+def legacy_apply_moderation_rules(content, item):
+    """The rules as originally written in reddit_moderator.py, kept as the baseline."""
+    spam_patterns = [
+        r'buy now',
+        r'click here',
+        r'limited time offer',
+        r'make money fast',
+        r'www\.[a-zA-Z0-9-]+\.[a-zA-Z]{2,}',  # URLs
+        r'http[s]?://',
+    ]
+
+    for pattern in spam_patterns:
+        if re.search(pattern, content):
+            return {
+                'action': 'remove',
+                'reason': f'Spam detected: matches pattern "{pattern}"'
+            }
+
+    hate_words = [
+        'hate', 'kill yourself', 'kys', 'die',
+    ]
+
+    hate_count = sum(1 for word in hate_words if word in content)
+    if hate_count >= 2:
+        return {
+            'action': 'remove',
+            'reason': f'Excessive hate speech detected ({hate_count} instances)'
+        }
+
+    if hasattr(item, 'selftext') and len(content.strip()) < 10:
+        return {
+            'action': 'remove',
+            'reason': 'Post too short, likely low effort'
+        }
+
+    if len(content) > 10:
+        caps_ratio = sum(1 for c in content if c.isupper()) / len(content)
+        if caps_ratio > 0.5:
+            return {
+                'action': 'remove',
+                'reason': 'Excessive caps lock usage'
+            }
+
+    return {
+        'action': 'approve',
+        'reason': 'Content passed all moderation checks'
+    }
+
+
+class Comment:
+    """Minimal stand-in for a PRAW comment."""
+
+    def __init__(self, body):
+        self.body = body
+
+
+class Submission:
+    """Minimal stand-in for a PRAW submission."""
+
+    def __init__(self, title, selftext):
+        self.title = title
+        self.selftext = selftext
+
+
+WORDS = ("the grill was great but the burgers took forever honestly i would go back again "
+         "this weekend with friends and family to watch the game and complain about traffic").split()
+SPAM = ["buy now", "click here", "limited time offer", "make money fast",
+        "www.cheapgrills.com", "https://bit.ly/deal"]
+HATE = ["hate", "kill yourself", "kys", "die"]
+
+
+def make_corpus(size, seed=0):
+    """
+    Build a synthetic mix of benign, spam, hateful, shouty and short items.
+
+    Returns:
+        List of (content, item) pairs as RedditModerator.analyze_content would pass them
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(5, 80))]
+        kind = rng.random()
+        if kind < 0.1:
+            words.insert(rng.randrange(len(words)), rng.choice(SPAM))
+        elif kind < 0.15:
+            words += rng.sample(HATE, 2)
+        elif kind < 0.2:
+            words = [word.upper() for word in words]
+
+        text = ' '.join(words)
+        if rng.random() < 0.2:
+            title = ' '.join(words[:3]) if rng.random() < 0.1 else ' '.join(words[:8])
+            item = Submission(title, text)
+            content = f"{item.title} {item.selftext}"
+        else:
+            item = Comment(text)
+            content = item.body
+
+        # analyze_content lowercases most of the time; keep some raw text to exercise the caps rule
+        corpus.append((content.lower() if rng.random() < 0.9 else content, item))
+    return corpus
+
+
+def run(name, apply_rules, corpus):
+    """Time apply_rules over the corpus and return its decisions."""
+    start = time.perf_counter()
+    decisions = [apply_rules(content, item) for content, item in corpus]
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} {len(corpus) / elapsed:>12,.0f} items/sec  ({elapsed:.3f}s)")
+    return decisions
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 100000
+    seed = int(sys.argv[sys.argv.index('--seed') + 1]) if '--seed' in sys.argv else 0
+
+    print(f"Building synthetic corpus of {size:,} items...")
+    corpus = make_corpus(size, seed)
+
+    engine = RuleEngine()
+
+    def compiled(content, item):
+        return engine.evaluate(content, is_submission=hasattr(item, 'selftext'))
+
+    print("=" * 50)
+    before = run("before", legacy_apply_moderation_rules, corpus)
+    after = run("after", compiled, corpus)
+
+    mismatches = sum(1 for a, b in zip(before, after) if a != b)
+    removed = sum(1 for decision in after if decision['action'] == 'remove')
+    print("=" * 50)
+    print(f"Removed {removed:,} of {size:,} items; {mismatches} decision mismatches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Shared pytest fixtures.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    """
+    The dashboard module, imported without writing SQLite files into the repo.
+
+    The stores read their paths when app.py is first imported, so the
+    environment is set (and restored after the test) before importing it.
+    """
+    for name in ('DECISION_STORE_PATH', 'AUTHOR_INDEX_PATH', 'DECISION_CACHE_PATH'):
+        monkeypatch.setenv(name, '')
+    return pytest.importorskip('app')
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Decision cache for AI moderation results.
+
+Caches analysis decisions keyed by a hash of the content and the prompt that
+judged it, so items that stay in the mod queue across runs are not sent to
+OpenAI again. Entries are bounded in number (LRU eviction) and expire after a
+TTL. An optional SQLite file keeps the cache across process restarts.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+
+def make_cache_key(subreddit: str, title: str, content: str, prompt_version: str, model: str) -> str:
+    """
+    Build a stable cache key for an analysis request.
+
+    Args:
+        subreddit: Subreddit the item belongs to
+        title: Item title
+        content: Item body text
+        prompt_version: Identifier of the prompt/rules used for the analysis
+        model: OpenAI model name
+
+    Returns:
+        Hex SHA-256 digest of the inputs
+    """
+    payload = json.dumps([subreddit.lower(), title, content or '', prompt_version, model])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class DecisionCache:
+    """Thread-safe LRU cache with TTL and an optional SQLite backend."""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 86400, db_path: Optional[str] = None,
+                 min_confidence: int = 2):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries kept (in memory and on disk)
+            ttl: Seconds an entry stays valid
+            db_path: Optional SQLite file used to persist entries
+            min_confidence: Decisions below this confidence, or flagged as errors, are not cached
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.min_confidence = min_confidence
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._writes_since_prune = 0
+
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS decisions ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_decisions_created ON decisions (created_at)")
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached decision.
+
+        Args:
+            key: Cache key from make_cache_key()
+
+        Returns:
+            A copy of the cached decision, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[0])
+            if entry:
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM decisions WHERE key = ?", (key,)
+                ).fetchone()
+                if row and now - row[1] < self.ttl:
+                    value = json.loads(row[0])
+                    self._store(key, value, row[1])
+                    self.hits += 1
+                    return dict(value)
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> bool:
+        """
+        Store a decision.
+
+        Args:
+            key: Cache key from make_cache_key()
+            value: Decision dict (must be JSON serializable)
+
+        Returns:
+            True if the decision was stored (analysis errors and near-zero confidence are not)
+        """
+        if value.get('error') or value.get('confidence', 0) < self.min_confidence:
+            return False
+        now = time.time()
+        with self._lock:
+            self._store(key, dict(value), now)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO decisions (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), now)
+                )
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= 100:
+                    self._prune_db(now)
+                self._db.commit()
+        return True
+
+    def _store(self, key: str, value: Dict[str, Any], created_at: float):
+        """Insert into the in-memory LRU and evict the oldest entries. Caller holds the lock."""
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _prune_db(self, now: float):
+        """Drop expired rows and keep the on-disk table within max_size. Caller holds the lock."""
+        self._db.execute("DELETE FROM decisions WHERE created_at < ?", (now - self.ttl,))
+        self._db.execute(
+            "DELETE FROM decisions WHERE key NOT IN "
+            "(SELECT key FROM decisions ORDER BY created_at DESC LIMIT ?)",
+            (self.max_size,)
+        )
+        self._writes_since_prune = 0
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM decisions")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'persistent': self._db is not None
+            }
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Persistent moderation decision store.
+
+Records every decision (rules, cache or AI tier) together with the final
+action a moderator or the bot took on the item and whether it succeeded, in
+a SQLite database indexed by subreddit, author, item fullname and time.
+
+Recording never blocks the moderation run: callers put rows on a bounded
+queue and a background writer thread inserts them in batches, one
+transaction per batch, with the database in WAL mode so history queries can
+read while it writes. If the queue is full the row is dropped and counted
+rather than slowing moderation down.
+
+Under gevent the writer is a green thread, so its SQLite work is handed to
+the hub's pool of real OS threads (run_blocking) instead of stalling every
+other green thread while a batch commits.
+"""
+
+import atexit
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from typing import Optional, Dict, Any, List
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS moderation_decisions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fullname TEXT,
+    subreddit TEXT,
+    author TEXT,
+    item_type TEXT,
+    title TEXT,
+    content TEXT,
+    permalink TEXT,
+    tier TEXT,
+    ai_action TEXT,
+    ai_reason TEXT,
+    ai_confidence INTEGER,
+    model TEXT,
+    latency REAL,
+    job_id TEXT,
+    final_action TEXT,
+    final_by TEXT,
+    action_success INTEGER,
+    action_error TEXT,
+    created_at REAL NOT NULL,
+    acted_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_moderation_decisions_subreddit ON moderation_decisions (subreddit, created_at);
+CREATE INDEX IF NOT EXISTS idx_moderation_decisions_author ON moderation_decisions (author, created_at);
+CREATE INDEX IF NOT EXISTS idx_moderation_decisions_fullname ON moderation_decisions (fullname);
+CREATE INDEX IF NOT EXISTS idx_moderation_decisions_created ON moderation_decisions (created_at);
+"""
+
+DECISION_COLUMNS = ('fullname', 'subreddit', 'author', 'item_type', 'title', 'content', 'permalink',
+                    'tier', 'ai_action', 'ai_reason', 'ai_confidence', 'model', 'latency', 'job_id',
+                    'final_action', 'final_by', 'action_success', 'action_error', 'created_at', 'acted_at')
+
+_INSERT_DECISION = (
+    f"INSERT INTO moderation_decisions ({', '.join(DECISION_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in DECISION_COLUMNS)})"
+)
+
+# Updates the latest decision for an item; if there is none a row is inserted instead
+_UPDATE_ACTION = (
+    "UPDATE moderation_decisions SET final_action = ?, final_by = ?, action_success = ?, "
+    "action_error = ?, acted_at = ? WHERE id = "
+    "(SELECT id FROM moderation_decisions WHERE fullname = ? ORDER BY created_at DESC, id DESC LIMIT 1)"
+)
+
+_STOP = object()
+
+
+def connect(db_path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Open a connection in WAL mode with a busy timeout for concurrent writers."""
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def run_blocking(func, *args):
+    """
+    Run blocking SQLite work from a store's background writer.
+
+    With gevent's monkey-patching the writer threads are green threads, so
+    the call runs on the hub's thread pool (a real OS thread) while the
+    writer waits cooperatively. Otherwise it is called directly.
+
+    Returns:
+        Whatever func returns (its exceptions are raised here)
+    """
+    monkey = sys.modules.get('gevent.monkey')
+    if monkey is not None and monkey.is_module_patched('threading'):
+        import gevent
+        return gevent.get_hub().threadpool.apply(func, args)
+    return func(*args)
+
+
+class DecisionStore:
+    """SQLite decision history written by a background thread."""
+
+    def __init__(self, db_path: Optional[str] = None, batch_size: int = 200,
+                 flush_interval: float = 1.0, max_pending: int = 10000):
+        """
+        Open the store and start the writer.
+
+        Args:
+            db_path: SQLite file; recording is disabled if None
+            batch_size: Rows inserted per transaction at most
+            flush_interval: Seconds the writer waits to fill a batch
+            max_pending: Queued rows beyond which new rows are dropped
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._local = threading.local()
+        self._writer = None
+
+        if db_path:
+            conn = connect(db_path)
+            conn.executescript(SCHEMA)
+            conn.close()
+            self._writer = threading.Thread(target=self._write_loop, name='decision-store-writer', daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether decisions are being recorded."""
+        return self._writer is not None
+
+    def _put(self, op):
+        """Queue a write without blocking the caller."""
+        if not self.enabled:
+            return
+        try:
+            self._queue.put_nowait(op)
+            self.recorded += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def record_decision(self, item: Dict[str, Any], decision: Dict[str, Any], model: Optional[str] = None,
+                        latency: Optional[float] = None, job_id: Optional[str] = None):
+        """
+        Record a moderation decision for an item.
+
+        Args:
+            item: Item dict as built by ModerationDashboard._extract_item
+            decision: Decision dict with action, reason, confidence and tier
+            model: Model that made the decision (None for the rules tier)
+            latency: Seconds spent deciding the item
+            job_id: Moderation job the decision belongs to
+        """
+        row = {
+            'fullname': item.get('fullname'),
+            'subreddit': (item.get('subreddit') or '').lower(),
+            'author': item.get('author'),
+            'item_type': item.get('type'),
+            'title': item.get('title'),
+            'content': item.get('content'),
+            'permalink': item.get('permalink'),
+            'tier': decision.get('tier'),
+            'ai_action': decision.get('action'),
+            'ai_reason': decision.get('reason'),
+            'ai_confidence': decision.get('confidence'),
+            'model': model,
+            'latency': latency,
+            'job_id': job_id,
+            'created_at': time.time()
+        }
+        self._put(('decision', tuple(row.get(column) for column in DECISION_COLUMNS)))
+
+    def record_action(self, fullname: str, action: str, by: Optional[str] = None,
+                      success: Optional[bool] = None, error: Optional[str] = None,
+                      subreddit: Optional[str] = None):
+        """
+        Record the final action for an item (a human override or an executed action).
+
+        Args:
+            fullname: Reddit fullname of the item (e.g. t3_abc123)
+            action: APPROVE, REMOVE or SKIP
+            by: Moderator username, or 'auto' for actions taken by the bot
+            success: Whether the action was carried out on Reddit (None if not attempted yet)
+            error: Error message if the action failed
+            subreddit: Subreddit of the item, used if no decision was recorded for it
+        """
+        success = None if success is None else int(bool(success))
+        self._put(('action', (action.upper(), by, success, error, time.time(), fullname,
+                              (subreddit or '').lower() or None)))
+
+    def _write_loop(self):
+        """Drain the queue in batches until close() is called."""
+        # Batches may be written from a pool thread (see run_blocking), one at a time
+        conn = connect(self.db_path, check_same_thread=False)
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            if _STOP in batch:
+                stopping = True
+            ops = [op for op in batch if op is not _STOP]
+            try:
+                run_blocking(self._write_batch, conn, ops)
+            except sqlite3.Error as e:
+                self.errors += 1
+                print(f"[ERROR] Decision store write of {len(ops)} row(s) failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, ops):
+        """Apply a batch of queued writes in one transaction, keeping their order."""
+        with conn:
+            rows = []
+            for kind, params in ops:
+                if kind == 'decision':
+                    rows.append(params)
+                    continue
+                if rows:
+                    conn.executemany(_INSERT_DECISION, rows)
+                    rows = []
+                *update, fullname, subreddit = params
+                if conn.execute(_UPDATE_ACTION, (*update, fullname)).rowcount == 0:
+                    action, by, success, error, acted_at = update
+                    values = dict(fullname=fullname, subreddit=subreddit, final_action=action, final_by=by,
+                                  action_success=success, action_error=error, created_at=acted_at,
+                                  acted_at=acted_at)
+                    conn.execute(_INSERT_DECISION, tuple(values.get(column) for column in DECISION_COLUMNS))
+            if rows:
+                conn.executemany(_INSERT_DECISION, rows)
+        self.written += len(ops)
+        self.batches += 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until every queued row has been written.
+
+        Returns:
+            True if the queue drained within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def close(self, timeout: float = 5.0):
+        """Write what is queued and stop the writer."""
+        if not self.enabled:
+            return
+        self._queue.put(_STOP, timeout=timeout)
+        self._writer.join(timeout)
+        self._writer = None
+
+    def _reader(self) -> sqlite3.Connection:
+        """Per-thread read connection (WAL lets reads run alongside the writer)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def history(self, subreddit: Optional[str] = None, author: Optional[str] = None,
+                fullname: Optional[str] = None, since: Optional[float] = None,
+                until: Optional[float] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Query recorded decisions, newest first.
+
+        Args:
+            subreddit: Only this subreddit
+            author: Only this author
+            fullname: Only this item
+            since: Only decisions at or after this Unix time
+            until: Only decisions before this Unix time
+            limit: Maximum rows returned
+
+        Returns:
+            List of decision rows as dicts
+        """
+        if not self.db_path:
+            return []
+
+        clauses, params = [], []
+        for column, value in (('subreddit', subreddit.lower() if subreddit else None),
+                              ('author', author), ('fullname', fullname)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT * FROM moderation_decisions {where}ORDER BY created_at DESC LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return writer counters."""
+        return {
+            'enabled': self.enabled,
+            'recorded': self.recorded,
+            'written': self.written,
+            'pending': self._queue.qsize(),
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'errors': self.errors
+        }
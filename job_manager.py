@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Moderation job manager.
+
+Runs moderation jobs on a bounded worker pool instead of one unbounded
+thread per request. Each job gets an id and a cancel event, concurrent jobs
+for the same (user, subreddit) are de-duplicated, and the number of queued
+and active jobs is tracked so a web worker can't be overloaded.
+
+Job records and cancellation flags live in a shared store (see
+shared_state.py), so with several workers a job started on one process can
+be listed, de-duplicated and cancelled from any other.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, Tuple
+
+from shared_state import MemoryStore
+
+# Finished job records are kept in the shared store for this long
+JOB_RECORD_TTL = 24 * 3600
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue has no room for another job."""
+
+
+class SharedCancelEvent:
+    """
+    Cancellation flag that can be set from any worker.
+
+    Behaves like threading.Event for is_set()/set(); a set() on another
+    process is seen through the shared store, which is polled at most once
+    per poll_interval so checking the flag per item stays cheap.
+    """
+
+    def __init__(self, store, key: str, poll_interval: float = 0.5):
+        self._store = store
+        self._key = key
+        self._poll_interval = poll_interval
+        self._local = threading.Event()
+        self._next_poll = 0.0
+
+    def set(self):
+        """Signal cancellation to every worker."""
+        self._local.set()
+        self._store.set(self._key, True, ttl=JOB_RECORD_TTL)
+
+    def is_set(self) -> bool:
+        """Whether cancellation was requested here or on another worker."""
+        if self._local.is_set():
+            return True
+        now = time.monotonic()
+        if now >= self._next_poll:
+            self._next_poll = now + self._poll_interval
+            if self._store.get(self._key):
+                self._local.set()
+        return self._local.is_set()
+
+
+class ModerationJob:
+    """A single moderation run."""
+
+    def __init__(self, user: str, key: str, room: Optional[str] = None, job_id: Optional[str] = None):
+        self.job_id = job_id or uuid.uuid4().hex[:12]
+        self.user = user
+        self.key = key
+        self.room = room
+        self.status = 'queued'
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the job is queued or running."""
+        return self.status in ('queued', 'running')
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the job as a JSON-friendly dict."""
+        return {
+            'job_id': self.job_id,
+            'subreddit': self.key,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+    def to_record(self) -> Dict[str, Any]:
+        """Return the job as stored in the shared store."""
+        return dict(self.as_dict(), user=self.user, room=self.room)
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> 'ModerationJob':
+        """Rebuild a (possibly remote) job from its shared store record."""
+        job = cls(record['user'], record['subreddit'], record.get('room'), job_id=record['job_id'])
+        for field in ('status', 'error', 'created_at', 'started_at', 'finished_at'):
+            setattr(job, field, record.get(field))
+        return job
+
+
+class JobManager:
+    """Bounded pool of moderation jobs with de-duplication and cancellation."""
+
+    def __init__(self, max_workers: int = 4, max_queued: int = 20, history_size: int = 100, store=None):
+        """
+        Initialize the manager.
+
+        Args:
+            max_workers: Jobs that may run at the same time in this worker
+            max_queued: Jobs that may wait for a free worker thread in this worker
+            history_size: Finished jobs kept for job_status lookups
+            store: Shared store for job records and cancel flags (in-process if None)
+        """
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.history_size = history_size
+        self.store = store if store is not None else MemoryStore()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='moderation-job')
+        self._jobs = OrderedDict()  # Jobs owned by this worker
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _claim_key(user: str, key: str) -> str:
+        return f'jobs:active:{user}:{key}'
+
+    def _save(self, job: ModerationJob):
+        """Write a job's record to the shared store."""
+        self.store.set(f'jobs:{job.job_id}', job.to_record(), ttl=JOB_RECORD_TTL)
+
+    def _load(self, job_id: Optional[str]) -> Optional[ModerationJob]:
+        """Read a job from the shared store."""
+        record = self.store.get(f'jobs:{job_id}') if job_id else None
+        return ModerationJob.from_record(record) if record else None
+
+    def submit(self, user: str, key: str, target: Callable[[ModerationJob], Any],
+               room: Optional[str] = None) -> Tuple[ModerationJob, bool]:
+        """
+        Queue a job unless the same user already has one active for this key.
+
+        Args:
+            user: Username that owns the job
+            key: Subreddit (or combined subreddit key) being moderated
+            target: Called with the job on a worker thread
+            room: Socket.IO room of the requesting client
+
+        Returns:
+            (job, created) where created is False if an active duplicate was returned
+
+        Raises:
+            JobQueueFull: If max_queued jobs are already waiting in this worker
+        """
+        key = key.lower()
+        claim = self._claim_key(user, key)
+        job = ModerationJob(user, key, room)
+        job.cancel_event = SharedCancelEvent(self.store, f'jobs:cancel:{job.job_id}')
+
+        with self._lock:
+            # The claim de-duplicates across workers; a claim whose job has finished is stale
+            while not self.store.set(claim, job.job_id, ttl=JOB_RECORD_TTL, nx=True):
+                existing_id = self.store.get(claim)
+                existing = self._jobs.get(existing_id) or self._load(existing_id)
+                if existing and existing.is_active:
+                    return existing, False
+                self.store.delete(claim)
+
+            counts = self._counts(self._jobs.values())
+            if counts['queued'] >= self.max_queued:
+                self.store.delete(claim)
+                raise JobQueueFull(f"{counts['queued']} moderation jobs are already queued")
+
+            self._jobs[job.job_id] = job
+            self.store.sadd('jobs', job.job_id)
+            self._save(job)
+            self._prune()
+
+        self._executor.submit(self._run, job, target)
+        return job, True
+
+    def _run(self, job: ModerationJob, target: Callable[[ModerationJob], Any]):
+        """Run a job on a worker thread, recording its outcome."""
+        try:
+            with self._lock:
+                if job.cancel_event.is_set():
+                    job.status = 'cancelled'
+                    job.finished_at = time.time()
+                    self._save(job)
+                    return
+                job.status = 'running'
+                job.started_at = time.time()
+                self._save(job)
+
+            try:
+                target(job)
+                status = 'cancelled' if job.cancel_event.is_set() else 'completed'
+            except Exception as e:
+                job.error = str(e)
+                status = 'failed'
+
+            with self._lock:
+                job.status = status
+                job.finished_at = time.time()
+                self._save(job)
+        finally:
+            claim = self._claim_key(job.user, job.key)
+            if self.store.get(claim) == job.job_id:
+                self.store.delete(claim)
+
+    def cancel(self, job_id: str, user: Optional[str] = None) -> bool:
+        """
+        Request cancellation of a job running on any worker.
+
+        Args:
+            job_id: Job to cancel
+            user: If given, only that user's job can be cancelled
+
+        Returns:
+            True if an active job was signalled
+        """
+        with self._lock:
+            job = self._jobs.get(job_id) or self._load(job_id)
+            if not job or not job.is_active or (user is not None and job.user != user):
+                return False
+
+            if job_id in self._jobs:
+                job.cancel_event.set()
+                if job.status == 'queued':
+                    job.status = 'cancelled'
+                    job.finished_at = time.time()
+                    self._save(job)
+            else:
+                # Owned by another worker, which sees the flag on its next check
+                SharedCancelEvent(self.store, f'jobs:cancel:{job_id}').set()
+            return True
+
+    def get(self, job_id: str) -> Optional[ModerationJob]:
+        """Return a job by id, whichever worker owns it."""
+        with self._lock:
+            return self._jobs.get(job_id) or self._load(job_id)
+
+    @staticmethod
+    def _counts(jobs) -> Dict[str, int]:
+        """Count queued and running jobs."""
+        jobs = list(jobs)
+        queued = sum(1 for job in jobs if job.status == 'queued')
+        active = sum(1 for job in jobs if job.status == 'running')
+        return {'queued': queued, 'active': active}
+
+    def _prune(self):
+        """Drop this worker's finished jobs beyond history_size. Caller holds the lock."""
+        finished = [job_id for job_id, job in self._jobs.items() if not job.is_active]
+        for job_id in finished[:max(0, len(finished) - self.history_size)]:
+            del self._jobs[job_id]
+
+    def _all_jobs(self):
+        """Load every job record in the shared store, trimming expired and old finished ones."""
+        jobs = []
+        for job_id in self.store.smembers('jobs'):
+            job = self._load(job_id)
+            if job is None:
+                self.store.srem('jobs', job_id)
+            else:
+                jobs.append(job)
+        jobs.sort(key=lambda job: job.created_at or 0)
+
+        finished = [job for job in jobs if not job.is_active]
+        for job in finished[:max(0, len(finished) - self.history_size)]:
+            self.store.srem('jobs', job.job_id)
+            self.store.delete(f'jobs:{job.job_id}')
+            jobs.remove(job)
+        return jobs
+
+    def status(self, user: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return pool counts across all workers and the jobs visible to a user.
+
+        Args:
+            user: Only list this user's jobs (all jobs if None)
+
+        Returns:
+            Dict with queued/active counts, per-worker pool limits and job list
+        """
+        with self._lock:
+            jobs = self._all_jobs()
+        counts = self._counts(jobs)
+        return {
+            'queued': counts['queued'],
+            'active': counts['active'],
+            'max_workers': self.max_workers,
+            'max_queued': self.max_queued,
+            'jobs': [job.as_dict() for job in jobs if user is None or job.user == user]
+        }
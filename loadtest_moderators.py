@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Load test of the dashboard with many concurrent moderators.
+
+Starts the fake Reddit and OpenAI servers from benchmark_e2e.py, launches the
+dashboard in a child process pointed at them (REDDIT_API_BASE,
+REDDIT_WWW_BASE, OPENAI_BASE_URL), then connects N real Socket.IO clients.
+Each simulated moderator logs in through /api/authenticate as its own user
+and then:
+
+  1. sends start_moderation in review mode and waits for moderation_complete
+  2. after a think time, asks ai_chat about a few of the decided items
+     (replies are streamed, so time to the first chunk is reported too)
+  3. after another think time, sends process_batch_actions for every decision
+
+Moderators start spread over a ramp-up period, and think times are drawn from
+an exponential distribution. For each client count it reports the time to
+the first item, the full moderation time, the time to the first ai_chat
+chunk, the whole ai_chat and batch-action round trips (p50/p95/p99), events
+received and dropped (item or decision events missing from a completed run,
+or requests never answered), error events, and the server process's CPU and
+peak RSS sampled from /proc.
+
+Needs the Socket.IO client with websocket support
+(``pip install "python-socketio[client]" websocket-client``). Without
+websocket-client the client falls back to long polling, which aborts with
+"Unexpected packet from server" once a run streams events in bursts.
+
+Usage: python loadtest_moderators.py [--clients 1,10,50] [--queue 100] [--chats 2] [--think 1.0]
+                                     [--ramp 5] [--timeout 180] [--mode threading|gevent]
+                                     [--reddit-latency 0.02] [--openai-latency 0.05]
+"""
+
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+import socketio
+
+from benchmark_e2e import (SUBREDDIT, FakeOpenAIHandler, FakeRedditHandler, load_queue, make_queue,
+                           percentiles, start_server)
+
+# Threading mode serves the app with Werkzeug (Flask-SocketIO refuses to unless told it's a test)
+THREADING_SERVER = (
+    "import os, app; app.socketio.run(app.app, host='127.0.0.1', port=int(os.environ['PORT']), "
+    "allow_unsafe_werkzeug=True)"
+)
+
+
+class ServerMonitor(threading.Thread):
+    """Samples a process's CPU use and resident memory from /proc."""
+
+    def __init__(self, pid, interval=0.5):
+        super().__init__(name='server-monitor', daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.cpu_samples = []
+        self.peak_rss_mb = 0.0
+        self.available = os.path.exists(f'/proc/{pid}/stat')
+        self._done = threading.Event()
+
+    def _cpu_seconds(self):
+        with open(f'/proc/{self.pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')  # utime + stime
+
+    def _rss_mb(self):
+        with open(f'/proc/{self.pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+        return 0.0
+
+    def run(self):
+        if not self.available:
+            return
+        try:
+            last_cpu, last_time = self._cpu_seconds(), time.monotonic()
+            while not self._done.wait(self.interval):
+                cpu, now = self._cpu_seconds(), time.monotonic()
+                self.cpu_samples.append((cpu - last_cpu) / (now - last_time) * 100)
+                self.peak_rss_mb = max(self.peak_rss_mb, self._rss_mb())
+                last_cpu, last_time = cpu, now
+        except (OSError, IndexError, ValueError):
+            pass  # Process exited
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+class Moderator:
+    """One simulated moderator with its own login and Socket.IO connection."""
+
+    def __init__(self, number, url, options, rng):
+        self.number = number
+        self.url = url
+        self.options = options
+        self.rng = rng
+        self.events = []
+        self.errors = []
+        self.dropped = 0
+        self.first_item = None
+        self.moderation_time = None
+        self.chat_first_token = []
+        self.chat_latency = []
+        self.batch_latency = None
+        self._cond = threading.Condition()
+
+    def _on_event(self, event, data=None):
+        with self._cond:
+            self.events.append((time.perf_counter(), event, data if isinstance(data, dict) else {}))
+            if event in ('error', 'batch_process_error'):
+                self.errors.append(str((data or {}).get('message') or (data or {}).get('error')))
+            self._cond.notify_all()
+
+    def _wait_for(self, predicate, timeout):
+        """Wait until predicate(events) returns a value other than None, or time out."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                result = predicate(self.events)
+                remaining = deadline - time.monotonic()
+                if result is not None or remaining <= 0:
+                    return result
+                self._cond.wait(remaining)
+
+    def _think(self):
+        time.sleep(self.rng.expovariate(1 / self.options['think']) if self.options['think'] > 0 else 0)
+
+    def run(self):
+        try:
+            self._run()
+        except Exception as e:
+            self.errors.append(f"{type(e).__name__}: {e}")
+
+    def _run(self):
+        timeout = self.options['timeout']
+        http = requests.Session()
+        login = http.post(f"{self.url}/api/authenticate", json={
+            'reddit_client_id': f"mod{self.number}",
+            'reddit_client_secret': 'secret',
+            'reddit_username': f"mod{self.number}",
+            'reddit_password': 'password',
+            'openai_api_key': 'loadtest'
+        }, timeout=30).json()
+        if not login.get('success'):
+            self.errors.append(f"login failed: {login.get('message')}")
+            return
+
+        client = socketio.Client(reconnection=False)
+        client.on('*', self._on_event)
+        cookie = '; '.join(f"{name}={value}" for name, value in http.cookies.items())
+        client.connect(self.url, headers={'Cookie': cookie}, transports=['websocket'], wait_timeout=30)
+        try:
+            self._moderate(client, timeout)
+            self._think()
+            self._chat(client, timeout)
+            self._think()
+            self._batch(client, timeout)
+        finally:
+            client.disconnect()
+
+    def _moderate(self, client, timeout):
+        start = time.perf_counter()
+        client.emit('start_moderation', {'subreddit': SUBREDDIT, 'limit': self.options['queue'],
+                                         'human_review': True})
+
+        def finished(events):
+            for _, event, data in events:
+                if event == 'moderation_complete' or event == 'error':
+                    return data
+                if event == 'status_update' and 'already' in data.get('message', ''):
+                    return data
+            return None
+
+        result = self._wait_for(finished, timeout)
+        with self._cond:
+            arrivals = [at for at, event, _ in self.events if event == 'item_analyzing']
+            analyzed = len(arrivals)
+            decided = sum(1 for _, event, _ in self.events if event == 'ai_decision')
+        if arrivals:
+            self.first_item = arrivals[0] - start
+        if result is None:
+            self.errors.append('moderation timed out')
+            self.dropped += max(0, self.options['queue'] * 2 - analyzed - decided)
+            return
+        if 'total_processed' in result:
+            self.moderation_time = time.perf_counter() - start
+            self.dropped += max(0, result['total_processed'] * 2 - analyzed - decided)
+
+    def _decisions(self):
+        """(item_number, fullname, action) for every decided item, from the received events."""
+        with self._cond:
+            fullnames = {data['item_number']: data.get('fullname') for _, event, data in self.events
+                         if event == 'item_analyzing'}
+            return [(data['item_number'], fullnames.get(data['item_number']), data['action'].lower())
+                    for _, event, data in self.events if event == 'ai_decision']
+
+    def _chat(self, client, timeout):
+        decisions = self._decisions()
+        for item_number, _, action in self.rng.sample(decisions, min(self.options['chats'], len(decisions))):
+            start = time.perf_counter()
+            client.emit('ai_chat', {'item_number': item_number, 'message': 'Why did you decide that?',
+                                    'context': {'action': action.upper(), 'reason': 'load test'}})
+
+            def answered(events, item_number=item_number):
+                for at, event, data in events:
+                    if event in ('ai_chat_response', 'ai_chat_error') and data.get('item_number') == item_number \
+                            and at >= start:
+                        return at
+                return None
+
+            answered_at = self._wait_for(answered, timeout)
+            if answered_at is None:
+                self.dropped += 1
+            else:
+                self.chat_latency.append(answered_at - start)
+                with self._cond:
+                    first_chunk = next((at for at, event, data in self.events if event == 'ai_chat_chunk'
+                                        and data.get('item_number') == item_number and at >= start), None)
+                if first_chunk is not None:
+                    self.chat_first_token.append(first_chunk - start)
+            self._think()
+
+    def _batch(self, client, timeout):
+        actions = {fullname: action for _, fullname, action in self._decisions() if fullname}
+        if not actions:
+            return
+        start = time.perf_counter()
+        client.emit('process_batch_actions', {'subreddit': SUBREDDIT, 'actions': actions})
+
+        def completed(events):
+            for at, event, _ in events:
+                if at >= start and event in ('batch_complete', 'error', 'batch_process_error'):
+                    return at
+            return None
+
+        completed_at = self._wait_for(completed, timeout)
+        if completed_at is None:
+            self.dropped += 1
+        else:
+            self.batch_latency = completed_at - start
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_app(mode, env):
+    """Launch the dashboard and wait until it accepts connections."""
+    port = free_port()
+    env = dict(env, PORT=str(port), SOCKETIO_ASYNC_MODE=mode)
+    if mode == 'gevent':
+        command = ['gunicorn', '--worker-class', 'geventwebsocket.gunicorn.workers.GeventWebSocketWorker',
+                   '--bind', f'127.0.0.1:{port}', '--timeout', '120', 'app:app']
+    else:
+        command = [sys.executable, '-c', THREADING_SERVER]
+    process = subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited: {process.stderr.read().strip().splitlines()[-1:]}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("server did not start within 60 seconds")
+
+
+def fmt(values):
+    values = [value for value in values if value is not None]
+    if not values:
+        return '-'
+    return '/'.join(f"{value:.2f}" for value in percentiles(values))
+
+
+def arg(name, default):
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+
+def main():
+    client_counts = [int(n) for n in arg('--clients', '1,10,50').split(',')]
+    options = {
+        'queue': int(arg('--queue', 100)),
+        'chats': int(arg('--chats', 2)),
+        'think': float(arg('--think', 1.0)),
+        'timeout': float(arg('--timeout', 180))
+    }
+    ramp = float(arg('--ramp', 5))
+    mode = arg('--mode', 'threading')
+    rng = random.Random(int(arg('--seed', 0)))
+
+    reddit = start_server(FakeRedditHandler, latency=float(arg('--reddit-latency', 0.02)), budget=1e9,
+                          window=600.0, window_reset=0.0, used=0, actions={})
+    openai = start_server(FakeOpenAIHandler, latency=float(arg('--openai-latency', 0.05)), calls=0)
+    reddit.keep_acted = True  # Every moderator works through the same queue
+    load_queue(reddit, make_queue(options['queue'], 0))
+
+    env = dict(os.environ)
+    env.update({
+        'REDDIT_API_BASE': f"http://127.0.0.1:{reddit.server_address[1]}",
+        'REDDIT_WWW_BASE': f"http://127.0.0.1:{reddit.server_address[1]}",
+        'OPENAI_BASE_URL': f"http://127.0.0.1:{openai.server_address[1]}/v1",
+        'DECISION_STORE_PATH': '',
+        'AUTHOR_INDEX_PATH': '',
+        'DECISION_CACHE_PATH': ''
+    })
+
+    print(f"{mode} server, queue of {options['queue']} items, {options['chats']} chats per moderator, "
+          f"mean think time {options['think']}s, ramp-up {ramp}s")
+    print(f"{'mods':>5} {'done':>5} {'first item s':>15} {'moderation s':>15} {'chat 1st tok s':>15} {'ai_chat s':>15} "
+          f"{'batch s':>15} {'events':>7} {'dropped':>7} {'errors':>6} {'CPU % avg/max':>14} {'RSS MB':>7}")
+    print("=" * 141)
+
+    for count in client_counts:
+        reddit.actions = {'approve': 0, 'remove': 0}
+        try:
+            process, url = start_app(mode, env)
+        except Exception as e:
+            print(f"{count:>5}  error: {e}")
+            continue
+        monitor = ServerMonitor(process.pid)
+        monitor.start()
+
+        moderators = [Moderator(n, url, options, random.Random(rng.random())) for n in range(count)]
+        threads = []
+        for n, moderator in enumerate(moderators):
+            thread = threading.Thread(target=moderator.run, name=f'moderator-{n}', daemon=True)
+            threads.append(thread)
+            thread.start()
+            time.sleep(ramp / count)
+        for thread in threads:
+            thread.join()
+
+        monitor.stop()
+        process.terminate()
+        process.wait(timeout=10)
+
+        completed = sum(moderator.moderation_time is not None for moderator in moderators)
+        events = sum(len(moderator.events) for moderator in moderators)
+        dropped = sum(moderator.dropped for moderator in moderators)
+        errors = [error for moderator in moderators for error in moderator.errors]
+        cpu = (f"{sum(monitor.cpu_samples) / len(monitor.cpu_samples):.0f}/{max(monitor.cpu_samples):.0f}"
+               if monitor.cpu_samples else 'n/a')
+        print(f"{count:>5} {completed:>5} {fmt(m.first_item for m in moderators):>15} "
+              f"{fmt(m.moderation_time for m in moderators):>15} "
+              f"{fmt(latency for m in moderators for latency in m.chat_first_token):>15} "
+              f"{fmt(latency for m in moderators for latency in m.chat_latency):>15} "
+              f"{fmt(m.batch_latency for m in moderators):>15} {events:>7} {dropped:>7} {len(errors):>6} "
+              f"{cpu:>14} {monitor.peak_rss_mb:>7.1f}")
+        for error in sorted(set(errors))[:3]:
+            print(f"{'':>5} {errors.count(error):>4}x {error[:110]}")
+
+    print("=" * 141)
+    print("Latency columns are p50/p95/p99 seconds")
+    reddit.shutdown()
+    openai.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Load test for Socket.IO event fan-out.
+
+Starts the fake Reddit and OpenAI servers from benchmark_e2e.py, points the
+app at them (REDDIT_API_BASE, REDDIT_WWW_BASE, OPENAI_BASE_URL) and connects
+a growing number of in-process test clients to the dashboard. Each client
+logs in through /api/authenticate as its own moderator, so its Socket.IO
+connection carries a session, and then:
+
+  1. runs start_moderation on a small queue in review mode, whose progress,
+     item and decision events are sent from the job pool by the session's
+     ModerationDashboard
+  2. asks for an AI chat reply and a removal reason (not streamed, so each is
+     one event)
+
+It then counts the events every client received. With events scoped to the
+requesting client's room, events per client stay flat as the number of
+connected moderators grows; with global broadcasts every client would also
+receive every other client's run and replies, growing linearly. Events that
+belong to another client (a second run's decisions or completion, or a reply
+for another client's item) are reported as misdelivered.
+
+Usage: python loadtest_rooms.py [max_clients]
+"""
+
+import os
+import sys
+import time
+
+from benchmark_e2e import SUBREDDIT, FakeOpenAIHandler, FakeRedditHandler, load_queue, make_queue, start_server
+
+QUEUE_SIZE = 10
+RUN_TIMEOUT = 120
+
+# Chat and removal reason requests use item numbers that can't clash with the run's
+CHAT_ITEM_BASE = 100000
+
+
+def login(app, number):
+    """Log in as moderator number through the HTTP API and return the Flask test client holding the session."""
+    http = app.test_client()
+    response = http.post('/api/authenticate', json={
+        'reddit_client_id': f"mod{number}",
+        'reddit_client_secret': 'secret',
+        'reddit_username': f"mod{number}",
+        'reddit_password': 'password',
+        'openai_api_key': 'loadtest'
+    }).get_json()
+    if not response.get('success'):
+        raise RuntimeError(f"login failed: {response.get('message')}")
+    return http
+
+
+def run(app, socketio, num_clients):
+    """
+    Log in and connect num_clients clients, run moderation and requests from each and count deliveries.
+
+    Returns:
+        (events per client, events delivered to the wrong client, runs not finished, seconds)
+    """
+    clients = [socketio.test_client(app, flask_test_client=login(app, n)) for n in range(num_clients)]
+    for client in clients:
+        client.get_received()  # Drop connect events
+
+    start = time.perf_counter()
+    for n, client in enumerate(clients):
+        client.emit('start_moderation', {'subreddit': SUBREDDIT, 'limit': QUEUE_SIZE, 'human_review': True})
+        client.emit('ai_chat', {'item_number': CHAT_ITEM_BASE + n, 'message': 'Why?', 'context': {},
+                                'stream': False})
+        client.emit('generate_removal_reason', {'item_number': CHAT_ITEM_BASE + n, 'context': {},
+                                                'stream': False})
+
+    # Runs finish on the job pool, so collect events until every client has seen its moderation_complete
+    received = [[] for _ in clients]
+    deadline = time.monotonic() + RUN_TIMEOUT
+    while time.monotonic() < deadline:
+        for events, client in zip(received, clients):
+            events.extend(client.get_received())
+        if all(any(event['name'] == 'moderation_complete' for event in events) for events in received):
+            break
+        time.sleep(0.05)
+    time.sleep(0.2)  # Anything misdelivered late still arrives
+    for events, client in zip(received, clients):
+        events.extend(client.get_received())
+    elapsed = time.perf_counter() - start
+
+    foreign = unfinished = 0
+    for n, events in enumerate(received):
+        names = [event['name'] for event in events]
+        completes = names.count('moderation_complete')
+        unfinished += completes == 0
+        foreign += max(0, completes - 1) + max(0, names.count('ai_decision') - QUEUE_SIZE)
+        foreign += sum(
+            1 for event in events
+            if event['name'] in ('ai_chat_response', 'removal_reason_generated')
+            and event['args'] and event['args'][0].get('item_number') != CHAT_ITEM_BASE + n
+        )
+    per_client = sum(len(events) for events in received) / num_clients
+
+    for client in clients:
+        client.disconnect()
+    return per_client, foreign, unfinished, elapsed
+
+
+def main():
+    max_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    sizes = [n for n in (1, 2, 5, 10, 25, 50, 100, 250, 500) if n <= max_clients]
+
+    reddit = start_server(FakeRedditHandler, latency=0.005, budget=1e9, window=600.0, window_reset=0.0,
+                          used=0, actions={'approve': 0, 'remove': 0})
+    openai = start_server(FakeOpenAIHandler, latency=0.01, calls=0)
+    reddit.keep_acted = True  # Every client moderates the same queue
+    load_queue(reddit, make_queue(QUEUE_SIZE, 0))
+
+    # The app reads these when it is imported; every client's run must fit in the job queue
+    os.environ.update({
+        'REDDIT_API_BASE': f"http://127.0.0.1:{reddit.server_address[1]}",
+        'REDDIT_WWW_BASE': f"http://127.0.0.1:{reddit.server_address[1]}",
+        'OPENAI_BASE_URL': f"http://127.0.0.1:{openai.server_address[1]}/v1",
+        'DECISION_STORE_PATH': '',
+        'AUTHOR_INDEX_PATH': '',
+        'DECISION_CACHE_PATH': '',
+        'MODERATION_MAX_QUEUED': str(max(sizes))
+    })
+    from app import app, socketio
+
+    print(f"{'clients':>8} {'events/client':>14} {'misdelivered':>13} {'unfinished':>11} {'time':>8}")
+    print("=" * 59)
+    for num_clients in sizes:
+        per_client, foreign, unfinished, elapsed = run(app, socketio, num_clients)
+        print(f"{num_clients:>8} {per_client:>14.1f} {foreign:>13} {unfinished:>11} {elapsed:>7.3f}s")
+
+    print("=" * 59)
+    print("Expected: the same events per client, 0 misdelivered and 0 unfinished at every size")
+
+    reddit.shutdown()
+    openai.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Prometheus-style counters, histograms and gauges.
+
+Updates on the hot path take no lock: inc() and observe() append the sample
+to a per-metric deque (an atomic operation in CPython, and safe across
+threads and green threads alike). Samples are folded into the totals when
+the metrics are scraped, or by whichever caller finds the deque long and
+can take the fold lock without waiting, so memory stays bounded between
+scrapes.
+
+Gauges are read from callbacks at scrape time, so state that already
+lives elsewhere (cache counters, job pool sizes) isn't tracked twice.
+Registry.render() produces the Prometheus text exposition format (0.0.4).
+"""
+
+import bisect
+import math
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Seconds; covers fast local calls up to slow OpenAI requests
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Samples buffered per metric before a writer folds them in itself
+FOLD_THRESHOLD = 4096
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Iterable[str], values: Iterable, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base for metrics fed through a lock-free sample buffer."""
+
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._pending = deque()
+        self._fold_lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _record(self, key: Tuple[str, ...], value: float):
+        self._pending.append((key, value))
+        if len(self._pending) >= FOLD_THRESHOLD and self._fold_lock.acquire(blocking=False):
+            try:
+                self._fold_pending()
+            finally:
+                self._fold_lock.release()
+
+    def _fold_pending(self):
+        """Move buffered samples into the totals. Caller holds the fold lock."""
+        pending = self._pending
+        while True:
+            try:
+                key, value = pending.popleft()
+            except IndexError:
+                return
+            self._fold(key, value)
+
+    def _fold(self, key: Tuple[str, ...], value: float):
+        raise NotImplementedError
+
+    def collect(self) -> Iterable[str]:
+        """Fold buffered samples and return the exposition lines of this metric."""
+        with self._fold_lock:
+            self._fold_pending()
+            lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+            lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        """Add amount to the series identified by labels."""
+        self._record(self._key(labels), amount)
+
+    def _fold(self, key, value):
+        self._values[key] = self._values.get(key, 0) + value
+
+    def value(self, **labels) -> float:
+        """Current total of one series."""
+        with self._fold_lock:
+            self._fold_pending()
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        """Record one observation in the series identified by labels."""
+        self._record(self._key(labels), value)
+
+    def _fold(self, key, value):
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def _samples(self):
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(series[-2])}"
+            yield f"{self.name}_count{labels} {series[-1]}"
+
+
+class CallbackMetric:
+    """Gauge or counter whose value is read from a callback when scraped."""
+
+    def __init__(self, name: str, documentation: str, callback: Callable, labelnames: Tuple[str, ...] = (),
+                 type_name: str = 'gauge'):
+        """
+        Args:
+            name: Metric name
+            documentation: Help text
+            callback: Returns a number, or a dict mapping label value tuples to numbers
+            labelnames: Label names matching the tuples the callback returns
+            type_name: 'gauge' or 'counter'
+        """
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+        self.type_name = type_name
+
+    def collect(self) -> Iterable[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        try:
+            values = self.callback()
+        except Exception as e:
+            print(f"[ERROR] Reading metric {self.name} failed: {e}")
+            return lines
+        if not isinstance(values, dict):
+            values = {(): values}
+        for key, value in sorted(values.items()):
+            if value is not None:
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        """Create and register a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Create and register a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, callback: Callable,
+              labelnames: Tuple[str, ...] = ()) -> CallbackMetric:
+        """Register a gauge read from callback() at scrape time."""
+        return self._register(CallbackMetric(name, documentation, callback, labelnames))
+
+    def counter_callback(self, name: str, documentation: str, callback: Callable,
+                         labelnames: Tuple[str, ...] = ()) -> CallbackMetric:
+        """Register a counter whose total is kept elsewhere and read from callback() at scrape time."""
+        return self._register(CallbackMetric(name, documentation, callback, labelnames, type_name='counter'))
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry served by /metrics
+REGISTRY = Registry()
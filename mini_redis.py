@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Minimal Redis-compatible server for offline testing.
+
+Speaks enough of the Redis protocol (RESP2, or RESP3 after HELLO 3 as sent by
+redis-py 6+) for the dashboard's shared state
+(GET/SET with NX and EX/PX, DEL, EXISTS, SADD/SREM/SMEMBERS) and for the
+Flask-SocketIO message queue (PUBLISH/SUBSCRIBE), so several dashboard
+workers can be run and load tested on one machine without installing Redis.
+It keeps everything in memory and is not meant for production.
+
+Usage: python mini_redis.py [--host 127.0.0.1] [--port 6379]
+
+Then start each worker with
+    SOCKETIO_MESSAGE_QUEUE=redis://127.0.0.1:6379/0
+"""
+
+import socketserver
+import sys
+import threading
+import time
+
+
+class RedisState:
+    """Keyspace and pub/sub subscriptions shared by all connections."""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.channels = {}
+        self.lock = threading.Lock()
+
+    def alive(self, key):
+        """Expire key if its TTL has passed and report whether it still exists. Caller holds the lock."""
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+
+class WrongType(Exception):
+    pass
+
+
+class RedisHandler(socketserver.StreamRequestHandler):
+    """One client connection."""
+
+    def setup(self):
+        super().setup()
+        self.write_lock = threading.Lock()
+        self.subscriptions = set()
+        self.protocol = 2
+
+    def finish(self):
+        state = self.server.state
+        with state.lock:
+            for channel in self.subscriptions:
+                state.channels.get(channel, set()).discard(self)
+        super().finish()
+
+    # RESP encoding
+
+    def send(self, payload):
+        with self.write_lock:
+            self.wfile.write(payload)
+            self.wfile.flush()
+
+    def bulk(self, value):
+        if value is None:
+            return b'_\r\n' if self.protocol == 3 else b'$-1\r\n'
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+
+    @staticmethod
+    def integer(value):
+        return b':%d\r\n' % value
+
+    def array(self, items):
+        parts = [b'*%d\r\n' % len(items)]
+        for item in items:
+            parts.append(self.integer(item) if isinstance(item, int) else self.bulk(item))
+        return b''.join(parts)
+
+    def push(self, items):
+        """Encode a pub/sub message: an array in RESP2, a push in RESP3."""
+        payload = self.array(items)
+        return b'>' + payload[1:] if self.protocol == 3 else payload
+
+    def hello(self):
+        """Encode the HELLO reply: a map in RESP3, a flat array in RESP2."""
+        fields = [(b'server', self.bulk(b'redis')), (b'version', self.bulk(b'7.0.0')),
+                  (b'proto', self.integer(self.protocol)), (b'id', self.integer(id(self) % 100000)),
+                  (b'mode', self.bulk(b'standalone')), (b'role', self.bulk(b'master')),
+                  (b'modules', b'*0\r\n')]
+        header = b'%%%d\r\n' % len(fields) if self.protocol == 3 else b'*%d\r\n' % (2 * len(fields))
+        return header + b''.join(self.bulk(name) + value for name, value in fields)
+
+    def read_command(self):
+        """Read one command as a list of bytes arguments, or None at EOF."""
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.split()  # Inline command, e.g. from telnet
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        while True:
+            try:
+                args = self.read_command()
+            except (ConnectionError, ValueError):
+                return
+            if args is None:
+                return
+            if not args:
+                continue
+            command = args[0].upper().decode()
+            try:
+                reply = self.dispatch(command, args[1:])
+            except WrongType:
+                reply = b'-WRONGTYPE Operation against a key holding the wrong kind of value\r\n'
+            except (IndexError, ValueError):
+                reply = b"-ERR wrong number of arguments or syntax error for '%s' command\r\n" % command.lower().encode()
+            if reply is not None:
+                self.send(reply)
+            if command == 'QUIT':
+                return
+
+    # Commands
+
+    def dispatch(self, command, args):
+        state = self.server.state
+
+        if command == 'PING':
+            if self.subscriptions:
+                return self.push([b'pong', args[0] if args else b''])
+            return self.bulk(args[0]) if args else b'+PONG\r\n'
+        if command == 'ECHO':
+            return self.bulk(args[0])
+        if command == 'HELLO':
+            protocol = int(args[0]) if args else self.protocol
+            if protocol not in (2, 3):
+                return b'-NOPROTO unsupported protocol version\r\n'
+            self.protocol = protocol
+            return self.hello()
+        if command in ('SELECT', 'CLIENT', 'AUTH', 'QUIT', 'READONLY'):
+            return b'+OK\r\n'
+        if command in ('FLUSHALL', 'FLUSHDB'):
+            with state.lock:
+                state.data.clear()
+                state.expires.clear()
+            return b'+OK\r\n'
+        if command == 'INFO':
+            return self.bulk(b'# Server\r\nredis_version:7.0.0\r\nredis_mode:standalone\r\n')
+
+        if command == 'GET':
+            with state.lock:
+                value = state.data.get(args[0]) if state.alive(args[0]) else None
+            if isinstance(value, set):
+                raise WrongType()
+            return self.bulk(value)
+
+        if command == 'SET':
+            key, value, options = args[0], args[1], [arg.upper() for arg in args[2:]]
+            ttl = None
+            if b'EX' in options:
+                ttl = float(options[options.index(b'EX') + 1])
+            elif b'PX' in options:
+                ttl = float(options[options.index(b'PX') + 1]) / 1000
+            with state.lock:
+                exists = state.alive(key)
+                if (b'NX' in options and exists) or (b'XX' in options and not exists):
+                    return self.bulk(None)
+                state.data[key] = value
+                if ttl is not None:
+                    state.expires[key] = time.time() + ttl
+                else:
+                    state.expires.pop(key, None)
+            return b'+OK\r\n'
+
+        if command in ('DEL', 'UNLINK', 'EXISTS'):
+            count = 0
+            with state.lock:
+                for key in args:
+                    if state.alive(key):
+                        count += 1
+                        if command != 'EXISTS':
+                            del state.data[key]
+                            state.expires.pop(key, None)
+            return self.integer(count)
+
+        if command in ('SADD', 'SREM'):
+            with state.lock:
+                members = state.data.get(args[0]) if state.alive(args[0]) else None
+                if members is not None and not isinstance(members, set):
+                    raise WrongType()
+                members = members if members is not None else set()
+                before = len(members)
+                if command == 'SADD':
+                    members.update(args[1:])
+                else:
+                    members.difference_update(args[1:])
+                if members:
+                    state.data[args[0]] = members
+                else:
+                    state.data.pop(args[0], None)
+                return self.integer(abs(len(members) - before))
+
+        if command == 'SMEMBERS':
+            with state.lock:
+                members = state.data.get(args[0], set()) if state.alive(args[0]) else set()
+                if not isinstance(members, set):
+                    raise WrongType()
+                return self.array(sorted(members))
+
+        if command == 'PUBLISH':
+            channel, message = args
+            with state.lock:
+                subscribers = list(state.channels.get(channel, ()))
+            delivered = 0
+            for subscriber in subscribers:
+                try:
+                    subscriber.send(subscriber.push([b'message', channel, message]))
+                    delivered += 1
+                except OSError:
+                    pass
+            return self.integer(delivered)
+
+        if command == 'SUBSCRIBE':
+            for channel in args:
+                with state.lock:
+                    state.channels.setdefault(channel, set()).add(self)
+                    self.subscriptions.add(channel)
+                    count = len(self.subscriptions)
+                self.send(self.push([b'subscribe', channel, count]))
+            return None
+
+        if command == 'UNSUBSCRIBE':
+            channels = args or sorted(self.subscriptions)
+            if not channels:
+                return self.push([b'unsubscribe', None, 0])
+            for channel in channels:
+                with state.lock:
+                    state.channels.get(channel, set()).discard(self)
+                    self.subscriptions.discard(channel)
+                    count = len(self.subscriptions)
+                self.send(self.push([b'unsubscribe', channel, count]))
+            return None
+
+        return b"-ERR unknown command '%s'\r\n" % command.lower().encode()
+
+
+class MiniRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+    def __init__(self, address):
+        super().__init__(address, RedisHandler)
+        self.state = RedisState()
+
+
+def serve(host='127.0.0.1', port=6379):
+    """Run the server until interrupted."""
+    server = MiniRedisServer((host, port))
+    print(f"mini_redis listening on redis://{host}:{server.server_address[1]}/0")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    host = sys.argv[sys.argv.index('--host') + 1] if '--host' in sys.argv else '127.0.0.1'
+    port = int(sys.argv[sys.argv.index('--port') + 1]) if '--port' in sys.argv else 6379
+    serve(host, port)
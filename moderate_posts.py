@@ -79,7 +79,8 @@ def moderate_subreddit(subreddit_name, limit=5, dry_run=False):
     Moderate posts in a subreddit using AI analysis.
     
     Args:
-        subreddit_name: Name of subreddit to moderate
+        subreddit_name: Name of subreddit to moderate, "mod" for the combined
+            queue of every moderated subreddit, or a comma-separated list
         limit: Number of posts to process
         dry_run: If True, only show what would be done without taking action
     """
@@ -93,7 +94,9 @@ def moderate_subreddit(subreddit_name, limit=5, dry_run=False):
             user_agent=os.getenv('REDDIT_USER_AGENT')
         )
         
-        subreddit = reddit.subreddit(subreddit_name)
+        # PRAW fetches a combined queue for "a+b+c" (and for "mod")
+        subreddit_names = [name.strip() for name in subreddit_name.split(',') if name.strip()]
+        subreddit = reddit.subreddit('+'.join(subreddit_names))
         
         print(f"{'[DRY RUN] ' if dry_run else ''}Moderating r/{subreddit_name}")
         print("=" * 60)
@@ -107,8 +110,14 @@ def moderate_subreddit(subreddit_name, limit=5, dry_run=False):
         
         print(f"Found {len(mod_queue_items)} items in mod queue")
         
-        for i, item in enumerate(mod_queue_items, 1):
-            print(f"\n--- ITEM {i} ---")
+        # Group items by their own subreddit so each is judged against its rules
+        groups = {}
+        for item in mod_queue_items:
+            groups.setdefault(item.subreddit.display_name, []).append(item)
+        grouped_items = [(name, item) for name, items in groups.items() for item in items]
+        
+        for i, (item_subreddit, item) in enumerate(grouped_items, 1):
+            print(f"\n--- ITEM {i} (r/{item_subreddit}) ---")
             
             # Get item details
             item_type = "submission" if hasattr(item, 'selftext') else "comment"
@@ -127,7 +136,7 @@ def moderate_subreddit(subreddit_name, limit=5, dry_run=False):
             
             # Analyze with AI
             print("🤖 AI Analysis:", end=" ")
-            decision = analyze_with_ai(title, content, author, item.score, subreddit_name)
+            decision = analyze_with_ai(title, content, author, item.score, item_subreddit)
             
             action_emoji = "✅" if decision['action'] == 'APPROVE' else "❌"
             print(f"{action_emoji} {decision['action']}")
@@ -172,6 +181,8 @@ def main():
     if len(sys.argv) < 2:
         print("Usage: python moderate_posts.py <subreddit> [limit] [--dry-run]")
         print("Example: python moderate_posts.py grillsgonewild 5 --dry-run")
+        print("         python moderate_posts.py grillsgonewild,bbq 10   (several subreddits)")
+        print("         python moderate_posts.py mod 25                 (all moderated subreddits)")
         return
     
     subreddit_name = sys.argv[1]
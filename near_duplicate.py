@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate index for recently judged items.
+
+Spam waves repost the same text with small edits (a changed link, a swapped
+word), so the exact-match decision cache misses them. Each judged item's text
+is reduced to a 64-bit SimHash of its character shingles; an incoming item
+whose SimHash is within a few bits of an indexed item from the same
+subreddit reuses that item's decision.
+
+Fingerprints, subreddits and timestamps live in fixed-size NumPy arrays used
+as a ring buffer, so memory is bounded by ``capacity`` and a query is one
+vectorized XOR/popcount scan over the buffer (see benchmark_dedup.py).
+"""
+
+import re
+import threading
+import time
+from typing import Optional, Dict, Any
+
+import numpy as np
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+_BIT_SHIFTS = np.arange(64, dtype=np.uint64)
+_BIT_WEIGHTS = np.uint64(1) << _BIT_SHIFTS
+_POPCOUNT_8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse everything but letters and digits to single spaces."""
+    return _NON_ALNUM.sub(' ', (text or '').lower()).strip()
+
+
+def simhash(text: str, shingle_size: int = 4) -> int:
+    """
+    Compute a 64-bit SimHash over the character shingles of normalized text.
+
+    Args:
+        text: Item text
+        shingle_size: Characters per shingle
+
+    Returns:
+        Fingerprint as a Python int
+    """
+    data = np.frombuffer(normalize(text).encode('utf-8'), dtype=np.uint8).astype(np.uint64)
+    if data.size < shingle_size:
+        data = np.pad(data, (0, shingle_size - data.size))
+
+    # Polynomial hash of every shingle at once, then a multiplicative mix to spread the bits
+    windows = np.lib.stride_tricks.sliding_window_view(data, shingle_size)
+    powers = np.uint64(257) ** np.arange(shingle_size - 1, -1, -1, dtype=np.uint64)
+    hashes = np.unique((windows * powers).sum(axis=1, dtype=np.uint64) * _HASH_MULTIPLIER)
+    hashes ^= hashes >> np.uint64(29)
+
+    # Each bit of the fingerprint is set if it is set in most shingle hashes
+    bits = (hashes[:, None] >> _BIT_SHIFTS) & np.uint64(1)
+    majority = bits.sum(axis=0) * 2 > hashes.size
+    return int(_BIT_WEIGHTS[majority].sum(dtype=np.uint64))
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """Count set bits of each uint64 value."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    return _POPCOUNT_8[values.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+class NearDuplicateIndex:
+    """Bounded, thread-safe SimHash index of recent decisions."""
+
+    def __init__(self, capacity: int = 50000, max_distance: int = 6, ttl: float = 86400,
+                 min_length: int = 40, min_confidence: int = 2):
+        """
+        Initialize the index.
+
+        Args:
+            capacity: Decisions kept; the oldest is overwritten once full
+            max_distance: Largest Hamming distance (out of 64 bits) treated as a duplicate
+            ttl: Seconds a decision can be reused
+            min_length: Shorter normalized texts are neither indexed nor matched
+            min_confidence: Decisions below this confidence, or flagged as errors, are not
+                indexed, so an analysis failure is never replayed onto a spam wave
+        """
+        self.capacity = capacity
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.min_length = min_length
+        self.min_confidence = min_confidence
+        self.hits = 0
+        self.misses = 0
+        self._fingerprints = np.zeros(capacity, dtype=np.uint64)
+        self._subreddits = np.full(capacity, -1, dtype=np.int32)
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._entries = [None] * capacity
+        self._subreddit_ids = {}
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _subreddit_id(self, subreddit: str) -> int:
+        """Small integer id for a subreddit. Caller holds the lock."""
+        return self._subreddit_ids.setdefault((subreddit or '').lower(), len(self._subreddit_ids))
+
+    def fingerprint(self, text: str) -> Optional[int]:
+        """Return the text's SimHash, or None if it is too short to match reliably."""
+        if len(normalize(text)) < self.min_length:
+            return None
+        return simhash(text)
+
+    def add(self, text: str, subreddit: str, decision: Dict[str, Any], ref: Optional[str] = None) -> bool:
+        """
+        Index a decided item.
+
+        Args:
+            text: Item text the decision was made on
+            subreddit: Subreddit the item belongs to
+            decision: Decision with action, reason and confidence
+            ref: Reference to the item (fullname or permalink) reported as dedup_of
+
+        Returns:
+            True if the decision was indexed
+        """
+        if decision.get('error') or decision.get('confidence', 0) < self.min_confidence:
+            return False
+        fingerprint = self.fingerprint(text)
+        if fingerprint is None:
+            return False
+        entry = {
+            'action': decision['action'],
+            'reason': decision['reason'],
+            'confidence': decision['confidence'],
+            'ref': ref
+        }
+        with self._lock:
+            slot = self._next
+            self._fingerprints[slot] = fingerprint
+            self._subreddits[slot] = self._subreddit_id(subreddit)
+            self._timestamps[slot] = time.time()
+            self._entries[slot] = entry
+            self._next = (slot + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+        return True
+
+    def find(self, text: str, subreddit: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a recent decision on a near-duplicate of text in the same subreddit.
+
+        Returns:
+            Copy of the closest decision with 'dedup_of' and 'similarity' added, or None
+        """
+        fingerprint = self.fingerprint(text)
+        if fingerprint is None:
+            return None
+
+        with self._lock:
+            subreddit_id = self._subreddit_ids.get((subreddit or '').lower())
+            if subreddit_id is None or not self._size:
+                self.misses += 1
+                return None
+
+            size = self._size
+            distances = popcount(self._fingerprints[:size] ^ np.uint64(fingerprint))
+            candidates = ((distances <= self.max_distance)
+                          & (self._subreddits[:size] == subreddit_id)
+                          & (self._timestamps[:size] >= time.time() - self.ttl))
+            if not candidates.any():
+                self.misses += 1
+                return None
+
+            slot = int(np.argmin(np.where(candidates, distances, 65)))
+            entry = self._entries[slot]
+            distance = int(distances[slot])
+            self.hits += 1
+
+        return {
+            'action': entry['action'],
+            'reason': entry['reason'],
+            'confidence': entry['confidence'],
+            'dedup_of': entry['ref'],
+            'similarity': round(1 - distance / 64, 3)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size, memory and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': self._size,
+                'capacity': self.capacity,
+                'array_bytes': self._fingerprints.nbytes + self._subreddits.nbytes + self._timestamps.nbytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Incremental mod queue polling state.
+
+SeenSet remembers which version of each mod queue item was already processed
+(fullname -> hash of its text), so a poll only analyzes items that are new
+or were edited since. It is bounded: the least recently seen items are
+forgotten once it is full.
+
+AdaptiveInterval picks the time to the next poll from the rate at which new
+items have been arriving, polling often while the queue is busy and backing
+off to the maximum interval while it is quiet.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+
+def content_hash(item) -> str:
+    """
+    Hash the moderated text of a PRAW submission or comment.
+
+    Args:
+        item: Reddit submission or comment object
+
+    Returns:
+        Hex digest that changes whenever the title or text is edited
+    """
+    if hasattr(item, 'selftext'):
+        text = f"{item.title}\n{item.selftext}"
+    else:
+        text = item.body
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+class SeenSet:
+    """Bounded LRU map of item fullname to the content hash last processed."""
+
+    NEW = 'new'
+    EDITED = 'edited'
+    SEEN = 'seen'
+
+    def __init__(self, max_size: int = 10000):
+        """
+        Args:
+            max_size: Items remembered; the least recently seen is dropped first
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()  # fullname -> (content hash, decision whose action is still pending)
+
+    def status(self, fullname: str, digest: str) -> str:
+        """
+        Classify an item against what was already processed.
+
+        Args:
+            fullname: Item fullname
+            digest: content_hash() of the item as fetched now
+
+        Returns:
+            SeenSet.NEW, SeenSet.EDITED or SeenSet.SEEN
+        """
+        entry = self._entries.get(fullname)
+        if entry is None:
+            return self.NEW
+        self._entries.move_to_end(fullname)
+        return self.SEEN if entry[0] == digest else self.EDITED
+
+    def add(self, fullname: str, digest: str, pending_decision: Optional[Dict[str, Any]] = None):
+        """
+        Record that a version of an item was analyzed.
+
+        Args:
+            fullname: Item fullname
+            digest: content_hash() of the analyzed version
+            pending_decision: Decision whose moderation action failed and should be retried
+        """
+        self._entries[fullname] = (digest, pending_decision)
+        self._entries.move_to_end(fullname)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pending_decision(self, fullname: str) -> Optional[Dict[str, Any]]:
+        """Return the decision still waiting to be acted on for an item, if any."""
+        entry = self._entries.get(fullname)
+        return entry[1] if entry else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class AdaptiveInterval:
+    """Poll interval that follows the arrival rate of new queue items."""
+
+    def __init__(self, min_interval: float = 30, max_interval: float = 300, target_items: float = 10,
+                 smoothing: float = 0.3):
+        """
+        Args:
+            min_interval: Shortest wait between polls (seconds)
+            max_interval: Longest wait between polls (seconds)
+            target_items: New items a poll should find on average
+            smoothing: Weight of the latest poll in the moving average of the arrival rate
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_items = target_items
+        self.smoothing = smoothing
+        self.rate = None  # New items per second
+        self.interval = max_interval
+
+    def update(self, new_items: int, elapsed: float, backlog: bool = False) -> float:
+        """
+        Fold in the result of a poll and return the seconds to wait before the next one.
+
+        Args:
+            new_items: New or edited items the poll found
+            elapsed: Seconds since the previous poll started
+            backlog: Whether the queue had more new items than one page
+        """
+        rate = new_items / elapsed if elapsed > 0 else 0.0
+        self.rate = rate if self.rate is None else self.smoothing * rate + (1 - self.smoothing) * self.rate
+
+        if backlog:
+            self.interval = self.min_interval
+        elif self.rate <= 0:
+            self.interval = self.max_interval
+        else:
+            self.interval = min(self.max_interval, max(self.min_interval, self.target_items / self.rate))
+        return self.interval
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Token-bucket scheduler for rate-limited API calls.
+
+A bucket refills at ``rate`` tokens per second up to ``capacity`` tokens.
+Callers take a token before each moderation action or AI call, so requests
+go out in bursts while budget remains and are paced only once it runs out.
+The rate and burst size can be retuned at any time from live rate limit
+headers (remaining requests and seconds until the window resets).
+"""
+
+import threading
+import time
+from typing import Optional, Dict, Any
+
+
+class TokenBucket:
+    """Thread-safe blocking token bucket."""
+
+    def __init__(self, rate: float, capacity: float, name: str = '', max_burst: Optional[float] = None,
+                 min_rate: float = 0.01):
+        """
+        Initialize the bucket (starts full).
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens that can accumulate (burst size)
+            name: Label used in status output
+            max_burst: Upper bound for capacity when retuned from rate limit headers
+            min_rate: Lower bound for the rate when retuned, so waiters always make progress
+        """
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.max_burst = max_burst or capacity
+        self.min_rate = min_rate
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._waiting = 0
+        self._acquired = 0
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        """Add tokens for the time elapsed since the last refill. Caller holds the lock."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Take tokens, blocking until they are available.
+
+        Args:
+            tokens: Number of tokens to take
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the tokens were taken, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    self._refill()
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        self._acquired += 1
+                        return True
+
+                    wait = (tokens - self._tokens) / self.rate
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                        wait = min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiting -= 1
+
+    def tune(self, remaining: float, reset_in: float):
+        """
+        Retune the bucket from a live rate limit budget.
+
+        The rate becomes the remaining budget spread over the rest of the
+        window (at least one token by the reset), and the burst size is
+        capped by what is actually left.
+
+        Args:
+            remaining: Requests left in the current window
+            reset_in: Seconds until the window resets
+        """
+        if reset_in <= 0:
+            return
+        with self._cond:
+            self._refill()
+            self.rate = max(self.min_rate, max(remaining, 1) / reset_in)
+            self.capacity = max(1, min(self.max_burst, remaining))
+            self._tokens = min(self._tokens, max(0, remaining))
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return current rate, burst size, available tokens and queue depth."""
+        with self._cond:
+            self._refill()
+            return {
+                'name': self.name,
+                'rate': round(self.rate, 3),
+                'capacity': self.capacity,
+                'available': round(self._tokens, 2),
+                'queue_depth': self._waiting,
+                'acquired': self._acquired
+            }
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Pooled, rate-limit-aware HTTP client for the Reddit API.
+
+All Reddit calls share one requests.Session so connections to
+oauth.reddit.com are kept alive and reused. Responses are inspected for
+Reddit's X-Ratelimit-* headers; requests go out immediately while budget
+remains and are only delayed when the remaining budget runs low. The same
+headers tune a per-token TokenBucket that gates moderation actions.
+"""
+
+import hashlib
+import re
+import threading
+import time
+import urllib.parse
+from typing import Optional, Dict, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import REGISTRY
+from rate_limiter import TokenBucket
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    'reddit_request_duration_seconds', 'Reddit API request latency (including retries)',
+    ('method', 'endpoint', 'status')
+)
+
+# Path segments that name a subreddit, user or item are collapsed so endpoints have few label values
+_ENDPOINT_PATTERNS = (
+    (re.compile(r'/r/[^/]+'), '/r/{subreddit}'),
+    (re.compile(r'/(?:user|u)/[^/]+'), '/user/{name}'),
+    (re.compile(r'/comments/[^/]+(?:/[^/]+)?'), '/comments/{id}'),
+)
+
+
+def endpoint_label(url: str) -> str:
+    """Return the path of a Reddit API URL with names and ids replaced by placeholders."""
+    path = urllib.parse.urlparse(url).path.rstrip('/') or '/'
+    for pattern, replacement in _ENDPOINT_PATTERNS:
+        path = pattern.sub(replacement, path)
+    return path
+
+
+class RedditAPIError(Exception):
+    """Raised when Reddit returns a non-200 response."""
+
+    def __init__(self, response: requests.Response):
+        self.status_code = response.status_code
+        self.text = response.text
+        super().__init__(f"Reddit API error: {response.status_code} - {response.text}")
+
+
+class RateLimitState:
+    """Rate limit budget reported by Reddit for one OAuth token."""
+
+    def __init__(self):
+        self.remaining = None
+        self.used = None
+        self.reset_at = None
+        self.updated_at = None
+
+    def update(self, headers):
+        """
+        Update from response headers.
+
+        Args:
+            headers: Response headers (case-insensitive mapping)
+        """
+        remaining = headers.get('X-Ratelimit-Remaining')
+        reset = headers.get('X-Ratelimit-Reset')
+        used = headers.get('X-Ratelimit-Used')
+        if remaining is None or reset is None:
+            return
+
+        now = time.monotonic()
+        try:
+            self.remaining = float(remaining)
+            self.reset_at = now + float(reset)
+            self.used = int(float(used)) if used is not None else None
+            self.updated_at = now
+        except ValueError:
+            pass
+
+    def seconds_until_reset(self) -> float:
+        """Seconds left in the current rate limit window (0 if unknown)."""
+        if self.reset_at is None:
+            return 0.0
+        return max(0.0, self.reset_at - time.monotonic())
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the state as a JSON-friendly dict."""
+        return {
+            'remaining': self.remaining,
+            'used': self.used,
+            'reset_in': round(self.seconds_until_reset(), 2)
+        }
+
+
+class RedditClient:
+    """Shared requests.Session wrapper with connection pooling, retries and rate limit tracking."""
+
+    def __init__(self, pool_size: int = 10, max_retries: int = 3, backoff_factor: float = 0.5,
+                 low_budget: float = 10, timeout: float = 30, action_rate: float = 1.0,
+                 action_burst: float = 60):
+        """
+        Initialize the client.
+
+        Args:
+            pool_size: Maximum keep-alive connections per host
+            max_retries: Retries for connection errors and 429/5xx responses
+            backoff_factor: Exponential backoff factor between retries
+            low_budget: Remaining requests below which calls are spread out until the reset
+            timeout: Default request timeout in seconds
+            action_rate: Initial moderation actions per second before any headers are seen
+            action_burst: Maximum burst of moderation actions per token
+        """
+        self.low_budget = low_budget
+        self.timeout = timeout
+        self.action_rate = action_rate
+        self.action_burst = action_burst
+        self._limits = {}
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'POST']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _limit_key(self, headers: Optional[Dict[str, str]]) -> str:
+        """Rate limits are tracked per OAuth token; hash the Authorization header."""
+        auth = (headers or {}).get('Authorization', '')
+        return hashlib.sha1(auth.encode('utf-8')).hexdigest()
+
+    def _state(self, key: str) -> RateLimitState:
+        with self._lock:
+            state = self._limits.get(key)
+            if state is None:
+                state = self._limits[key] = RateLimitState()
+            return state
+
+    def limiter_for(self, headers: Optional[Dict[str, str]] = None) -> TokenBucket:
+        """
+        Return the action scheduler for the token in ``headers``.
+
+        Take a token from it before each approve/remove so actions burst while
+        budget remains and are paced from the live rate limit headers.
+        """
+        key = self._limit_key(headers)
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = self._limiters[key] = TokenBucket(
+                    rate=self.action_rate, capacity=self.action_burst,
+                    name=f"reddit-{key[:8]}", max_burst=self.action_burst
+                )
+            return limiter
+
+    def _throttle_delay(self, state: RateLimitState) -> float:
+        """Seconds to wait before the next request given the remaining budget."""
+        if state.remaining is None:
+            return 0.0
+        reset_in = state.seconds_until_reset()
+        if reset_in <= 0:
+            return 0.0
+        if state.remaining < 1:
+            return reset_in
+        if state.remaining < self.low_budget:
+            # Spread the last few requests evenly over what is left of the window
+            return reset_in / state.remaining
+        return 0.0
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session.
+
+        Args:
+            method: HTTP method
+            url: Full request URL
+            headers: Request headers (Authorization selects the rate limit bucket)
+            **kwargs: Passed through to requests.Session.request
+
+        Returns:
+            The requests.Response
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        key = self._limit_key(headers)
+        state = self._state(key)
+
+        delay = self._throttle_delay(state)
+        if delay > 0:
+            print(f"[RATE] Reddit budget low ({state.remaining:.0f} left), waiting {delay:.2f}s")
+            time.sleep(delay)
+
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, headers=headers, **kwargs)
+        except Exception:
+            REQUEST_LATENCY.observe(time.perf_counter() - start, method=method, endpoint=endpoint_label(url),
+                                    status='error')
+            raise
+        REQUEST_LATENCY.observe(time.perf_counter() - start, method=method, endpoint=endpoint_label(url),
+                                status=response.status_code)
+        state.update(response.headers)
+
+        if state.remaining is not None:
+            with self._lock:
+                limiter = self._limiters.get(key)
+            if limiter is not None:
+                limiter.tune(state.remaining, state.seconds_until_reset())
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request."""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request."""
+        return self.request('POST', url, **kwargs)
+
+    def rate_limit_status(self, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Return the last known rate limit budget.
+
+        Args:
+            headers: Request headers identifying the token (None for the unauthenticated bucket)
+
+        Returns:
+            Dict with remaining, used and reset_in
+        """
+        return self._state(self._limit_key(headers)).as_dict()
+
+    def scheduler_status(self) -> Dict[str, Any]:
+        """Return rate, burst and queue depth of every action scheduler."""
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return {limiter.name: limiter.stats() for limiter in limiters}
@@ -8,11 +8,15 @@ decides whether to approve or remove content based on analysis.
 
 import os
 import time
+from itertools import islice
 import logging
 import praw
 from dotenv import load_dotenv
 from typing import Optional, Dict, Any
-import re
+
+from rate_limiter import TokenBucket
+from rule_engine import RuleEngine
+from queue_tracker import SeenSet, AdaptiveInterval, content_hash
 
 # Load environment variables
 load_dotenv()
@@ -38,6 +42,15 @@ class RedditModerator:
         self.subreddit_name = os.getenv('SUBREDDIT_NAME', 'complainaboutanything')
         self.subreddit = self.reddit.subreddit(self.subreddit_name)
         
+        # Paces moderation actions from PRAW's view of the Reddit rate limit
+        self.action_limiter = TokenBucket(rate=1.0, capacity=30, name='reddit-actions')
+        
+        # Moderation rules are compiled once and reused for every item
+        self.rule_engine = RuleEngine()
+        
+        # Versions of mod queue items already processed, so polls only analyze new or edited items
+        self.seen = SeenSet(max_size=int(os.getenv('SEEN_SET_SIZE', 10000)))
+        
         # Verify bot has moderator permissions
         self._verify_permissions()
         
@@ -96,6 +109,8 @@ class RedditModerator:
         """
         Apply moderation rules to determine action.
         
+        Rules live in rule_engine.py and are compiled once in __init__.
+        
         Args:
             content: Lowercase content text
             item: Reddit item object
@@ -103,68 +118,23 @@ class RedditModerator:
         Returns:
             Dict with 'action' ('approve' or 'remove') and 'reason'
         """
-        # Rule 1: Remove obvious spam patterns
-        spam_patterns = [
-            r'buy now',
-            r'click here',
-            r'limited time offer',
-            r'make money fast',
-            r'www\.[a-zA-Z0-9-]+\.[a-zA-Z]{2,}',  # URLs
-            r'http[s]?://',
-        ]
-        
-        for pattern in spam_patterns:
-            if re.search(pattern, content):
-                return {
-                    'action': 'remove',
-                    'reason': f'Spam detected: matches pattern "{pattern}"'
-                }
-        
-        # Rule 2: Remove excessive profanity or hate speech
-        hate_words = [
-            'hate', 'kill yourself', 'kys', 'die',
-            # Add more as needed, but be careful with false positives
-        ]
-        
-        hate_count = sum(1 for word in hate_words if word in content)
-        if hate_count >= 2:
-            return {
-                'action': 'remove',
-                'reason': f'Excessive hate speech detected ({hate_count} instances)'
-            }
-        
-        # Rule 3: Remove very short posts that are likely low effort
-        if hasattr(item, 'selftext') and len(content.strip()) < 10:
-            return {
-                'action': 'remove',
-                'reason': 'Post too short, likely low effort'
-            }
-        
-        # Rule 4: Remove posts with excessive caps (>50% uppercase)
-        if len(content) > 10:
-            caps_ratio = sum(1 for c in content if c.isupper()) / len(content)
-            if caps_ratio > 0.5:
-                return {
-                    'action': 'remove',
-                    'reason': 'Excessive caps lock usage'
-                }
-        
-        # Rule 5: Approve everything else
-        return {
-            'action': 'approve',
-            'reason': 'Content passed all moderation checks'
-        }
+        return self.rule_engine.evaluate(content, is_submission=hasattr(item, 'selftext'))
     
-    def moderate_item(self, item):
+    def moderate_item(self, item, decision: Optional[Dict[str, Any]] = None) -> bool:
         """
         Moderate a single item from the mod queue.
         
         Args:
             item: Reddit submission or comment object
+            decision: Decision already made for this item (analyzed if None)
+            
+        Returns:
+            True if the moderation action was taken
         """
         try:
             # Analyze the content
-            decision = self.analyze_content(item)
+            if decision is None:
+                decision = self.analyze_content(item)
             
             # Log the decision
             item_type = "submission" if hasattr(item, 'selftext') else "comment"
@@ -184,38 +154,113 @@ class RedditModerator:
                     except Exception as e:
                         logger.warning(f"Could not send removal message: {e}")
                 logger.info(f"❌ Removed {item_type} by u/{item.author}")
+            return True
             
         except Exception as e:
             logger.error(f"Error moderating item: {e}")
+            return False
+    
+    def _tune_action_limiter(self):
+        """Retune the action scheduler from the rate limit headers PRAW last saw."""
+        limits = self.reddit.auth.limits
+        remaining = limits.get('remaining')
+        reset_timestamp = limits.get('reset_timestamp')
+        if remaining is not None and reset_timestamp is not None:
+            self.action_limiter.tune(remaining, reset_timestamp - time.time())
     
-    def monitor_mod_queue(self, check_interval: int = 300):
+    def poll_mod_queue(self, page_size: int = 100) -> Dict[str, int]:
         """
-        Continuously monitor the mod queue and process items.
+        Process the mod queue items that are new or were edited since they were last processed.
+        
+        Only the first page is fetched unless it is full and has new items, in which case the
+        rest of the queue is paged through as well. The whole backlog is fetched before acting,
+        since approving or removing an item takes it out of the queue and would invalidate the
+        listing's ``after`` cursor.
+        
+        Args:
+            page_size: Items in the first page
+            
+        Returns:
+            Counts of items fetched, new, edited, acted on and failed, and whether there was a backlog
+        """
+        counts = {'fetched': 0, 'new': 0, 'edited': 0, 'acted': 0, 'failed': 0, 'backlog': 0}
+        
+        # PRAW fetches 100 items per request as the listing is iterated
+        listing = self.subreddit.mod.modqueue(limit=None)
+        first_page = list(islice(listing, page_size))
+        
+        items = first_page
+        if len(first_page) == page_size and any(
+                self.seen.status(item.fullname, content_hash(item)) != SeenSet.SEEN for item in first_page):
+            counts['backlog'] = 1
+            logger.info("Backlog in mod queue, paging through the rest of it")
+            items = first_page + list(listing)
+        
+        for item in items:
+            counts['fetched'] += 1
+            digest = content_hash(item)
+            status = self.seen.status(item.fullname, digest)
+            decision = None
+            if status == SeenSet.SEEN:
+                # Unchanged; only retry an action that failed last time
+                decision = self.seen.pending_decision(item.fullname)
+                if decision is None:
+                    continue
+            else:
+                counts[status] += 1
+                decision = self.analyze_content(item)
+            
+            self.action_limiter.acquire()
+            if self.moderate_item(item, decision):
+                counts['acted'] += 1
+                self.seen.add(item.fullname, digest)
+            else:
+                counts['failed'] += 1
+                self.seen.add(item.fullname, digest, pending_decision=decision)
+            self._tune_action_limiter()
+        return counts
+    
+    def monitor_mod_queue(self, check_interval: int = 300, min_interval: int = 30, page_size: int = 100):
+        """
+        Continuously poll the mod queue and process new or edited items.
+        
+        The wait between polls adapts to how fast new items arrive, from min_interval while
+        the queue is busy up to check_interval while it is quiet.
         
         Args:
-            check_interval: Seconds between checks (default 5 minutes)
+            check_interval: Longest wait between polls in seconds (default 5 minutes)
+            min_interval: Shortest wait between polls in seconds
+            page_size: Items fetched per poll before deciding whether to page through a backlog
         """
         logger.info(f"Starting mod queue monitoring for r/{self.subreddit_name}")
-        logger.info(f"Check interval: {check_interval} seconds ({check_interval//60} minutes)")
+        logger.info(f"Poll interval: {min_interval}-{check_interval} seconds, adapted to queue activity")
         logger.info("⚠️  Using conservative API rate limiting to respect Reddit's limits")
         
+        interval = AdaptiveInterval(min_interval=min_interval, max_interval=check_interval)
+        wait = check_interval
+        last_poll = None
+        
         while True:
             try:
-                # Get items from mod queue (reduced limit)
-                mod_queue_items = list(self.subreddit.mod.modqueue(limit=5))
+                poll_started = time.monotonic()
+                counts = self.poll_mod_queue(page_size=page_size)
+                changed = counts['new'] + counts['edited']
                 
-                if mod_queue_items:
-                    logger.info(f"Found {len(mod_queue_items)} items in mod queue")
-                    
-                    for item in mod_queue_items:
-                        self.moderate_item(item)
-                        time.sleep(3)  # Increased rate limiting between actions
+                if changed or counts['failed']:
+                    logger.info(f"Mod queue: {counts['fetched']} items, {counts['new']} new, {counts['edited']} edited, "
+                                f"{counts['acted']} acted on, {counts['failed']} failed")
+                elif counts['fetched']:
+                    logger.info(f"No new items in mod queue ({counts['fetched']} already processed)")
                 else:
                     logger.info("Mod queue is empty")
                 
+                elapsed = poll_started - last_poll if last_poll is not None else wait
+                last_poll = poll_started
+                wait = interval.update(changed, elapsed, backlog=bool(counts['backlog']))
+                
                 # Wait before next check
-                logger.info(f"Waiting {check_interval} seconds before next check...")
-                time.sleep(check_interval)
+                logger.info(f"Waiting {wait:.0f} seconds before next check ({len(self.seen)} items seen)...")
+                time.sleep(wait)
                 
             except KeyboardInterrupt:
                 logger.info("Bot stopped by user")
@@ -259,7 +304,11 @@ def main():
             return
         
         # Start monitoring with conservative rate limiting
-        bot.monitor_mod_queue(check_interval=300)
+        bot.monitor_mod_queue(
+            check_interval=int(os.getenv('POLL_MAX_INTERVAL', 300)),
+            min_interval=int(os.getenv('POLL_MIN_INTERVAL', 30)),
+            page_size=int(os.getenv('POLL_PAGE_SIZE', 100))
+        )
         
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Compiled rule engine for local moderation rules.
+
+The rules are compiled once when the engine is created instead of on every
+item: phrase lists become tuples scanned with C-level substring search, URL
+regexes are precompiled and only run when a cheap literal guard is present,
+and the uppercase count comes from a single C-level pass over the text.
+
+A combined alternation regex (or a pure-Python Aho-Corasick automaton) was
+measured slower than repeated ``in`` checks in CPython for these phrase list
+sizes, so literal phrases are matched with ``in``; see benchmark_rules.py.
+"""
+
+import re
+from typing import Dict, Any, Sequence, Tuple
+
+# Rule 1: spam phrases (matched literally) and URL regexes with a literal
+# substring that must be present for the regex to match
+SPAM_PHRASES = [
+    'buy now',
+    'click here',
+    'limited time offer',
+    'make money fast',
+]
+URL_PATTERNS = [
+    (r'www\.[a-zA-Z0-9-]+\.[a-zA-Z]{2,}', 'www.'),  # URLs
+    (r'http[s]?://', '://'),
+]
+
+# Rule 2: hate speech phrases
+HATE_WORDS = [
+    'hate', 'kill yourself', 'kys', 'die',
+    # Add more as needed, but be careful with false positives
+]
+
+# Extra promotional phrases used only by RuleEngine.triage()
+PROMO_PHRASES = [
+    'discount code', 'promo code', 'coupon code', 'use code', '% off', 'free shipping',
+]
+
+_DROP_ASCII_UPPER = str.maketrans('', '', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+
+class RuleEngine:
+    """Evaluates the spam, hate speech, low effort and caps lock rules."""
+
+    def __init__(self, spam_phrases: Sequence[str] = SPAM_PHRASES,
+                 url_patterns: Sequence[Tuple[str, str]] = URL_PATTERNS,
+                 hate_words: Sequence[str] = HATE_WORDS, hate_threshold: int = 2,
+                 min_post_length: int = 10, caps_ratio_threshold: float = 0.5,
+                 promo_phrases: Sequence[str] = PROMO_PHRASES):
+        """
+        Compile the rules.
+
+        Args:
+            spam_phrases: Literal phrases that mark an item as spam
+            url_patterns: (regex, guard) pairs that mark an item as spam; the
+                regex only runs when the guard substring is present
+            hate_words: Literal phrases counted towards the hate speech rule
+            hate_threshold: Distinct hate phrases needed to remove an item
+            min_post_length: Submissions shorter than this are removed as low effort
+            caps_ratio_threshold: Uppercase ratio above which an item is removed
+            promo_phrases: Additional promotional phrases considered by triage()
+        """
+        self.spam_phrases = tuple(spam_phrases)
+        self.url_patterns = tuple((re.compile(pattern), guard) for pattern, guard in url_patterns)
+        self.hate_words = tuple(hate_words)
+        self.hate_threshold = hate_threshold
+        self.min_post_length = min_post_length
+        self.caps_ratio_threshold = caps_ratio_threshold
+        self.promo_phrases = tuple(dict.fromkeys(self.spam_phrases + tuple(promo_phrases)))
+
+    def spam_match(self, content: str):
+        """Return the first spam pattern (in configured order) found in content, or None."""
+        for phrase in self.spam_phrases:
+            if phrase in content:
+                return phrase
+        for compiled, guard in self.url_patterns:
+            if guard in content and compiled.search(content):
+                return compiled.pattern
+        return None
+
+    def promo_count(self, content: str) -> int:
+        """Count distinct spam and promotional phrases that occur in content."""
+        return sum(map(content.__contains__, self.promo_phrases))
+
+    def hate_count(self, content: str) -> int:
+        """Count distinct hate phrases that occur in content."""
+        return sum(map(content.__contains__, self.hate_words))
+
+    @staticmethod
+    def caps_count(content: str) -> int:
+        """Count uppercase characters using C-level string methods where possible."""
+        if content.islower():
+            # Every cased character is lowercase
+            return 0
+        if content.isascii():
+            return len(content) - len(content.translate(_DROP_ASCII_UPPER))
+        return sum(1 for c in content if c.isupper())
+
+    def evaluate(self, content: str, is_submission: bool = False) -> Dict[str, Any]:
+        """
+        Apply the moderation rules in order.
+
+        Args:
+            content: Item text
+            is_submission: Whether the item is a submission (enables the low effort rule)
+
+        Returns:
+            Dict with 'action' ('approve' or 'remove') and 'reason'
+        """
+        # Rule 1: Remove obvious spam patterns
+        pattern = self.spam_match(content)
+        if pattern is not None:
+            return {
+                'action': 'remove',
+                'reason': f'Spam detected: matches pattern "{pattern}"'
+            }
+
+        # Rule 2: Remove excessive profanity or hate speech
+        hate_count = self.hate_count(content)
+        if hate_count >= self.hate_threshold:
+            return {
+                'action': 'remove',
+                'reason': f'Excessive hate speech detected ({hate_count} instances)'
+            }
+
+        # Rule 3: Remove very short posts that are likely low effort
+        if is_submission and len(content.strip()) < self.min_post_length:
+            return {
+                'action': 'remove',
+                'reason': 'Post too short, likely low effort'
+            }
+
+        # Rule 4: Remove posts with excessive caps
+        if len(content) > 10:
+            caps_ratio = self.caps_count(content) / len(content)
+            if caps_ratio > self.caps_ratio_threshold:
+                return {
+                    'action': 'remove',
+                    'reason': 'Excessive caps lock usage'
+                }
+
+        # Rule 5: Approve everything else
+        return {
+            'action': 'approve',
+            'reason': 'Content passed all moderation checks'
+        }
+
+    def triage(self, text: str, is_submission: bool = False) -> Dict[str, Any]:
+        """
+        Make a local decision with a confidence score, for use before an LLM call.
+
+        Only clear-cut removals get a high confidence: promotional phrases
+        together with a link, or several promotional phrases. Text with no
+        spam, link, hate or shouting signals leans towards approval, but only
+        with a middling confidence, since the rules can't tell whether it is
+        off-topic, harassing or otherwise against a subreddit's own rules.
+        Everything else falls back to the ordinary rules with a low confidence
+        so the caller can escalate it.
+
+        Args:
+            text: Item text in its original case
+            is_submission: Whether the item is a submission
+
+        Returns:
+            Dict with 'action' ('APPROVE' or 'REMOVE'), 'reason' and 'confidence' (1-10)
+        """
+        content = text.lower()
+        promo_count = self.promo_count(content)
+        has_link = any(guard in content and compiled.search(content) for compiled, guard in self.url_patterns)
+
+        if promo_count and has_link:
+            return {'action': 'REMOVE', 'reason': 'Promotional phrasing with a link', 'confidence': 9}
+        if promo_count >= 2:
+            return {'action': 'REMOVE', 'reason': 'Multiple promotional phrases', 'confidence': 8}
+
+        caps_ratio = self.caps_count(text) / len(text) if text else 0.0
+        if (not promo_count and not has_link and not self.hate_count(content)
+                and caps_ratio <= self.caps_ratio_threshold / 2
+                and len(content.strip()) >= 2 * self.min_post_length):
+            return {'action': 'APPROVE', 'reason': 'No spam, link, hate or caps signals', 'confidence': 5}
+
+        decision = self.evaluate(content, is_submission)
+        return {'action': decision['action'].upper(), 'reason': decision['reason'], 'confidence': 4}
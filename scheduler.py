@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Priority scheduling for the analysis stage.
+
+PriorityExecutor is a drop-in for the ThreadPoolExecutor used by
+moderate_subreddit, except that submit() takes a priority and idle workers
+always pick the highest-priority pending work, not the oldest. A heavily
+reported item found on page 30 of a queue is analyzed before the benign
+items still waiting from pages 1-29.
+
+Items are grouped into priority bands (see priority_band) and
+LatencyStats records, per band, how long items took from being fetched to
+having their decision on the moderator's screen.
+"""
+
+import itertools
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, Any, Callable
+
+# Bands by minimum priority score (features.priority_scores), highest first
+PRIORITY_BANDS = (
+    ('critical', 6.0),
+    ('high', 3.0),
+    ('normal', 0.5),
+    ('low', float('-inf')),
+)
+
+
+def priority_band(priority: float) -> str:
+    """Return the name of the band a priority score falls in."""
+    for band, threshold in PRIORITY_BANDS:
+        if priority >= threshold:
+            return band
+    return PRIORITY_BANDS[-1][0]
+
+
+class PriorityExecutor:
+    """Fixed pool of worker threads that run the highest-priority work first."""
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = 'priority-worker'):
+        """
+        Start the workers.
+
+        Args:
+            max_workers: Worker threads
+            thread_name_prefix: Prefix for worker thread names
+        """
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()  # FIFO among equal priorities
+        self._workers = [
+            threading.Thread(target=self._work, name=f'{thread_name_prefix}_{n}', daemon=True)
+            for n in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, priority: float, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Schedule fn(*args, **kwargs).
+
+        Args:
+            priority: Higher runs sooner
+            fn: Callable to run on a worker
+
+        Returns:
+            Future for the call's result
+        """
+        future = Future()
+        self._queue.put((-priority, next(self._sequence), future, fn, args, kwargs))
+        return future
+
+    def _work(self):
+        while True:
+            _, _, future, fn, args, kwargs = self._queue.get()
+            if future is None:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """
+        Stop the workers once queued work is done.
+
+        Args:
+            wait: Block until the workers exit
+            cancel_futures: Cancel work that hasn't started instead of running it
+        """
+        if cancel_futures:
+            while True:
+                try:
+                    _, _, future, *_ = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if future is not None:
+                    future.cancel()
+
+        # Sentinels sort after all real work
+        for _ in self._workers:
+            self._queue.put((float('inf'), next(self._sequence), None, None, (), {}))
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown(wait=True)
+        return False
+
+
+class LatencyStats:
+    """Thread-safe latency samples per priority band."""
+
+    def __init__(self, window: int = 1000):
+        """
+        Args:
+            window: Most recent samples kept per band
+        """
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, band: str, seconds: float):
+        """Add a latency sample for a band."""
+        with self._lock:
+            self._samples.setdefault(band, deque(maxlen=self.window)).append(seconds)
+            self._counts[band] = self._counts.get(band, 0) + 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return count and p50/p95/max latency (seconds) per band, in band order."""
+        with self._lock:
+            samples = {band: sorted(values) for band, values in self._samples.items()}
+            counts = dict(self._counts)
+
+        result = {}
+        for band, _ in PRIORITY_BANDS:
+            values = samples.get(band)
+            if not values:
+                continue
+            result[band] = {
+                'count': counts[band],
+                'p50': round(values[len(values) // 2], 3),
+                'p95': round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+                'max': round(values[-1], 3)
+            }
+        return result
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Shared state for multi-process deployments.
+
+Job records, cancellation flags, login credentials and the Flask secret key
+have to be visible to every web worker once gunicorn runs more than one
+process. This module provides a small key-value interface with two
+backends: an in-process store (the default, one worker only) and Redis
+(any server speaking the Redis protocol, including mini_redis.py for
+offline testing). Values are stored as JSON.
+"""
+
+import json
+import threading
+import time
+from typing import Any, Optional, Set
+
+
+class MemoryStore:
+    """In-process store; state is only shared between threads of one worker."""
+
+    def __init__(self):
+        self._data = {}
+        self._expires = {}
+        self._lock = threading.Lock()
+
+    def _expired(self, key: str) -> bool:
+        """Drop key if its TTL has passed. Caller holds the lock."""
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.time():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+            return True
+        return False
+
+    def get(self, key: str) -> Any:
+        """Return the value stored at key, or None."""
+        with self._lock:
+            if self._expired(key):
+                return None
+            value = self._data.get(key)
+            return None if isinstance(value, set) else value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, nx: bool = False) -> bool:
+        """
+        Store a value.
+
+        Args:
+            key: Key to set
+            value: JSON-serializable value
+            ttl: Seconds until the key expires (never if None)
+            nx: Only set the key if it does not already exist
+
+        Returns:
+            True if the value was stored
+        """
+        with self._lock:
+            if nx and not self._expired(key) and key in self._data:
+                return False
+            self._data[key] = json.loads(json.dumps(value))
+            if ttl is not None:
+                self._expires[key] = time.time() + ttl
+            else:
+                self._expires.pop(key, None)
+            return True
+
+    def delete(self, key: str):
+        """Remove a key."""
+        with self._lock:
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+
+    def sadd(self, key: str, member: str):
+        """Add a member to the set at key."""
+        with self._lock:
+            self._data.setdefault(key, set()).add(member)
+
+    def srem(self, key: str, member: str):
+        """Remove a member from the set at key."""
+        with self._lock:
+            self._data.get(key, set()).discard(member)
+
+    def smembers(self, key: str) -> Set[str]:
+        """Return the members of the set at key."""
+        with self._lock:
+            return set(self._data.get(key, set()))
+
+
+class RedisStore:
+    """Store backed by a Redis-protocol server, shared by every worker and node."""
+
+    def __init__(self, url: str):
+        """
+        Connect to the server.
+
+        Args:
+            url: Redis URL, e.g. redis://localhost:6379/0
+        """
+        import redis  # Optional dependency, only needed for multi-worker deployments
+
+        self.url = url
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Any:
+        """Return the value stored at key, or None."""
+        value = self._redis.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, nx: bool = False) -> bool:
+        """Store a value; see MemoryStore.set."""
+        px = int(ttl * 1000) if ttl is not None else None
+        return bool(self._redis.set(key, json.dumps(value), px=px, nx=nx))
+
+    def delete(self, key: str):
+        """Remove a key."""
+        self._redis.delete(key)
+
+    def sadd(self, key: str, member: str):
+        """Add a member to the set at key."""
+        self._redis.sadd(key, member)
+
+    def srem(self, key: str, member: str):
+        """Remove a member from the set at key."""
+        self._redis.srem(key, member)
+
+    def smembers(self, key: str) -> Set[str]:
+        """Return the members of the set at key."""
+        return set(self._redis.smembers(key))
+
+
+def create_store(url: Optional[str] = None):
+    """
+    Create the store for a URL.
+
+    Args:
+        url: redis:// or rediss:// URL, or None/'memory://' for the in-process store
+
+    Returns:
+        MemoryStore or RedisStore
+    """
+    if not url or url.startswith('memory://'):
+        return MemoryStore()
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisStore(url)
+    raise ValueError(f"Unsupported shared state URL: {url}")
@@ -1,5 +1,7 @@
 // Reddit Moderation Dashboard JavaScript
-const socket = io();
+// With several server workers the transports may be restricted (see SOCKETIO_TRANSPORTS)
+const socket = io(window.SOCKETIO_TRANSPORTS && window.SOCKETIO_TRANSPORTS.length
+    ? { transports: window.SOCKETIO_TRANSPORTS } : {});
 
 // DOM elements
 const redditOAuthBtn = document.getElementById('reddit-oauth-btn');
@@ -9,6 +11,8 @@ const loggedInSection = document.getElementById('logged-in-section');
 const currentUserEl = document.getElementById('current-user');
 const logoutBtn = document.getElementById('logout-btn');
 const startBtn = document.getElementById('start-btn');
+const cancelBtn = document.getElementById('cancel-btn');
+let currentJobId = null;
 const subredditSelect = document.getElementById('subreddit-select');
 const subredditInput = document.getElementById('subreddit-input');
 const customSubredditCheckbox = document.getElementById('custom-subreddit-checkbox');
@@ -274,6 +278,14 @@ async function loadModeratedSubreddits() {
         // Clear existing options except the first one
         subredditSelect.innerHTML = '<option value="">Select a subreddit...</option>';
         
+        // Combined queue of every moderated subreddit
+        if (data.subreddits.length > 1) {
+            const allOption = document.createElement('option');
+            allOption.value = 'mod';
+            allOption.textContent = `All moderated subreddits (${data.subreddits.length})`;
+            subredditSelect.appendChild(allOption);
+        }
+        
         // Add moderated subreddits to dropdown
         data.subreddits.forEach(sub => {
             const option = document.createElement('option');
@@ -317,9 +329,13 @@ startBtn.addEventListener('click', () => {
     startBtn.disabled = true;
     startBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Running...';
     
+    // A comma-separated list moderates several subreddits in one run
+    const subreddits = subreddit.split(',').map((name) => name.trim().replace(/^r\//, '')).filter(Boolean);
+    
     // Emit start moderation event
     socket.emit('start_moderation', {
         subreddit: subreddit,
+        subreddits: subreddits.length > 1 ? subreddits : undefined,
         limit: limit,
         human_review: humanReview
     });
@@ -332,7 +348,12 @@ socket.on('status_update', (data) => {
 
 socket.on('item_analyzing', (data) => {
     const itemDiv = displayModerationItem(data, data.item_number || Date.now());
-    resultsContainer.appendChild(itemDiv);
+    
+    // Items are analyzed concurrently, so keep cards in queue order
+    const nextItem = Array.from(resultsContainer.children).find(
+        (el) => parseInt(el.getAttribute('data-item')) > data.item_number
+    );
+    resultsContainer.insertBefore(itemDiv, nextItem || null);
     
     addLogEntry(`Analyzing ${data.type} by u/${data.author}...`, 'info');
 });
@@ -341,11 +362,17 @@ socket.on('ai_decision', (data) => {
     const itemDiv = document.querySelector(`[data-item="${data.item_number}"]`);
     if (itemDiv) {
         updateItemWithDecision(itemDiv, data);
-        stats.apiCalls++;
+        if (data.tier === 'ai') {
+            stats.apiCalls++;
+        }
         updateStats();
     }
     
-    addLogEntry(`AI Decision: ${data.action} (${data.confidence}/10 confidence)`, 
+    let source = data.tier && data.tier !== 'ai' ? ` [${data.tier}]` : '';
+    if (data.dedup_of) {
+        source = ` [near-duplicate of ${data.dedup_of}]`;
+    }
+    addLogEntry(`AI Decision: ${data.action} (${data.confidence}/10 confidence)${source}`, 
                data.action === 'APPROVE' ? 'success' : 'error');
 });
 
@@ -355,7 +382,9 @@ socket.on('action_result', (data) => {
         updateItemWithResult(itemDiv, data);
         
         stats.processed++;
-        if (data.action === 'APPROVE') {
+        if (data.human_review) {
+            // Left for the moderator; counted once they act on it
+        } else if (data.action === 'APPROVE') {
             stats.approved++;
         } else if (data.action === 'REMOVE') {
             stats.removed++;
@@ -363,7 +392,10 @@ socket.on('action_result', (data) => {
         updateStats();
     }
     
-    if (data.dry_run) {
+    if (data.human_review) {
+        addLogEntry(`Item ${data.item_number} left for review: ${data.reason}`, 'info');
+        batchActions.style.display = 'block';
+    } else if (data.dry_run) {
         addLogEntry(`[DRY RUN] Would ${data.action.toLowerCase()} this item`, 'info');
     } else if (data.action_taken) {
         addLogEntry(`✅ ${data.action} action completed`, 'success');
@@ -374,8 +406,7 @@ socket.on('action_result', (data) => {
 
 socket.on('moderation_complete', (data) => {
     addLogEntry(data.message, 'success');
-    startBtn.disabled = false;
-    startBtn.innerHTML = '<i class="fas fa-play"></i> Start Moderation';
+    resetStartButton();
     
     // Show batch actions if in human review mode
     if (humanReviewCheckbox.checked) {
@@ -385,9 +416,43 @@ socket.on('moderation_complete', (data) => {
 
 socket.on('error', (data) => {
     addLogEntry(`Error: ${data.message}`, 'error');
+    resetStartButton();
+});
+
+// Moderation job lifecycle
+socket.on('job_status', (data) => {
+    if (!data.job_id) {
+        return;
+    }
+    
+    if (data.status === 'queued' || data.status === 'running') {
+        currentJobId = data.job_id;
+        cancelBtn.style.display = 'inline-flex';
+        if (data.status === 'queued' && data.active >= 1) {
+            addLogEntry(`Waiting for a free worker (${data.queued} queued, ${data.active} running)`, 'info');
+        }
+    } else if (data.job_id === currentJobId) {
+        resetStartButton();
+    }
+});
+
+socket.on('moderation_cancelled', (data) => {
+    addLogEntry(data.message, 'info');
+    resetStartButton();
+});
+
+cancelBtn.addEventListener('click', () => {
+    if (currentJobId) {
+        socket.emit('cancel_moderation', { job_id: currentJobId });
+    }
+});
+
+function resetStartButton() {
+    currentJobId = null;
+    cancelBtn.style.display = 'none';
     startBtn.disabled = false;
     startBtn.innerHTML = '<i class="fas fa-play"></i> Start Moderation';
-});
+}
 
 // Helper functions
 function addLogEntry(message, type = 'info') {
@@ -584,6 +649,10 @@ function toggleAIChat(itemNumber) {
         chatMessages.style.display = 'none';
         chatInput.style.display = 'none';
         toggleBtn.innerHTML = '<i class="fas fa-comments"></i>';
+        // Stop a reply that is still streaming into the closed panel
+        if (document.getElementById(`loading-${itemNumber}`) || document.getElementById(`streaming-${itemNumber}`)) {
+            socket.emit('cancel_ai_stream', { kind: 'chat', item_number: itemNumber });
+        }
     } else {
         chatMessages.style.display = 'block';
         chatInput.style.display = 'flex';
@@ -746,6 +815,18 @@ function setHumanDecision(itemNumber, action) {
     }
     window.humanDecisions[itemNumber] = action;
 
+    // Record the override in the server's decision history
+    const item = window.itemData && window.itemData[itemNumber];
+    if (item && item.fullname) {
+        socket.emit('human_decision', {
+            item_number: itemNumber,
+            fullname: item.fullname,
+            subreddit: item.subreddit,
+            author: item.author,
+            action: action
+        });
+    }
+
     // Show removal reason section if REMOVE is selected
     const removalSection = document.getElementById(`removal-reason-${itemNumber}`);
     if (action === 'REMOVE' && removalSection) {
@@ -753,6 +834,9 @@ function setHumanDecision(itemNumber, action) {
         // Auto-generate removal reason
         generateRemovalReason(itemNumber);
     } else if (removalSection) {
+        if (removalSection.style.display !== 'none') {
+            socket.emit('cancel_ai_stream', { kind: 'removal_reason', item_number: itemNumber });
+        }
         removalSection.style.display = 'none';
     }
 
@@ -796,6 +880,21 @@ function updateItemWithDecision(itemDiv, data) {
 }
 
 function updateItemWithResult(itemDiv, data) {
+    if (data.human_review) {
+        // Not acted on: show the review buttons, with nothing selected until the moderator decides
+        const resultDiv = document.createElement('div');
+        resultDiv.className = 'action-result dry-run';
+        resultDiv.innerHTML = `<i class="fas fa-user-check"></i> Left for review: ${data.reason}`;
+        itemDiv.appendChild(resultDiv);
+        
+        const actionButtonsTop = itemDiv.querySelector('.action-buttons-top');
+        const cardFooter = itemDiv.querySelector('.card-footer');
+        if (actionButtonsTop) actionButtonsTop.style.display = 'flex';
+        if (cardFooter) cardFooter.style.display = 'block';
+        setItemAction(itemDiv.getAttribute('data-item'), 'skip', true);
+        return;
+    }
+    
     itemDiv.className = `result-item ${data.action.toLowerCase()}`;
     
     const resultDiv = document.createElement('div');
@@ -906,11 +1005,24 @@ processActionsBtn.addEventListener('click', () => {
     processActionsBtn.disabled = true;
     processActionsBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Processing...';
     
-    // Convert Map to object for transmission
-    const actionsObj = Object.fromEntries(pendingActions);
+    // Address items by the fullnames they were fetched with, so the server
+    // doesn't have to fetch the queue again
+    const actions = [];
+    pendingActions.forEach((action, itemNumber) => {
+        const item = window.itemData && window.itemData[itemNumber];
+        if (item && item.fullname) {
+            actions.push({
+                item_number: itemNumber,
+                fullname: item.fullname,
+                subreddit: item.subreddit,
+                author: item.author,
+                action: action
+            });
+        }
+    });
     
     socket.emit('process_batch_actions', {
-        actions: actionsObj
+        actions: actions
     });
 });
 
@@ -935,13 +1047,26 @@ socket.on('batch_progress', (data) => {
                data.success ? 'success' : 'error');
 });
 
-socket.on('batch_complete', (data) => {
-    addLogEntry(data.message, 'success');
-    processActionsBtn.disabled = false;
-    processActionsBtn.innerHTML = '<i class="fas fa-cogs"></i> Process All Actions';
+// AI Chat event handlers
+socket.on('ai_chat_chunk', (data) => {
+    // Replace the loading message with the reply as it streams in
+    let streamingMsg = document.getElementById(`streaming-${data.item_number}`);
+    if (!streamingMsg) {
+        const loadingMsg = document.getElementById(`loading-${data.item_number}`);
+        if (loadingMsg) {
+            loadingMsg.remove();
+        }
+        addChatMessage(data.item_number, '', 'ai');
+        const messagesDiv = document.getElementById(`chat-messages-${data.item_number}`);
+        if (!messagesDiv) return;
+        streamingMsg = messagesDiv.lastElementChild;
+        streamingMsg.id = `streaming-${data.item_number}`;
+    }
+    streamingMsg.querySelector('.message-content').textContent += data.delta;
+    const messagesDiv = streamingMsg.parentElement;
+    messagesDiv.scrollTop = messagesDiv.scrollHeight;
 });
 
-// AI Chat event handlers
 socket.on('ai_chat_response', (data) => {
     console.log('Received AI chat response:', data);
     
@@ -951,8 +1076,18 @@ socket.on('ai_chat_response', (data) => {
         loadingMsg.remove();
     }
     
+    // A streamed reply is already on screen; settle it on the final text
+    const streamingMsg = document.getElementById(`streaming-${data.item_number}`);
+    if (streamingMsg) {
+        streamingMsg.removeAttribute('id');
+        streamingMsg.querySelector('.message-content').textContent = data.response;
+        return;
+    }
+    
     // Add AI response
-    addChatMessage(data.item_number, data.response, 'ai');
+    if (!data.cancelled) {
+        addChatMessage(data.item_number, data.response, 'ai');
+    }
 });
 
 socket.on('ai_chat_error', (data) => {
@@ -969,11 +1104,29 @@ socket.on('ai_chat_error', (data) => {
 });
 
 // Removal reason event handlers
+socket.on('removal_reason_chunk', (data) => {
+    const textarea = document.getElementById(`removal-text-${data.item_number}`);
+    if (textarea) {
+        if (textarea.disabled) {
+            // First chunk replaces the "Generating..." placeholder
+            textarea.value = '';
+            textarea.disabled = false;
+            textarea.dataset.streaming = 'true';
+        }
+        if (textarea.dataset.streaming === 'true') {
+            textarea.value += data.delta;
+        }
+    }
+});
+
 socket.on('removal_reason_generated', (data) => {
     const textarea = document.getElementById(`removal-text-${data.item_number}`);
     if (textarea) {
-        textarea.value = data.reason;
+        if (!data.cancelled) {
+            textarea.value = data.reason;
+        }
         textarea.disabled = false;
+        delete textarea.dataset.streaming;
     }
 });
 
@@ -986,7 +1139,7 @@ socket.on('removal_reason_error', (data) => {
 });
 
 socket.on('batch_complete', (data) => {
-    addLogEntry(data.message, 'success');
+    addLogEntry(data.message, data.failed_count ? 'error' : 'success');
     processActionsBtn.disabled = false;
     processActionsBtn.innerHTML = '<i class="fas fa-cogs"></i> Process All Actions';
     
@@ -995,6 +1148,12 @@ socket.on('batch_complete', (data) => {
     updateStats();
 });
 
+socket.on('batch_process_error', (data) => {
+    addLogEntry(`❌ ${data.error}`, 'error');
+    processActionsBtn.disabled = false;
+    processActionsBtn.innerHTML = '<i class="fas fa-cogs"></i> Process All Actions';
+});
+
 // Keyboard shortcuts for power users
 let currentFocusedItem = null;
 
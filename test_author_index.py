@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the author history index and its incremental SQLite persistence.
+"""
+
+from author_index import AuthorIndex
+
+
+def record_many(index, author, action, count, prefix):
+    for n in range(count):
+        index.record(author, action, f"{prefix}{n}")
+
+
+def test_repeat_offender_is_removed_after_min_items():
+    index = AuthorIndex(min_items=5, remove_ratio=0.9)
+    record_many(index, 'spammer', 'REMOVE', 4, 't1_')
+    assert index.fast_decision('spammer') is None
+
+    index.record('spammer', 'REMOVE', 't1_last')
+    decision = index.fast_decision('spammer')
+    assert decision['action'] == 'REMOVE'
+    assert decision['tier'] == 'author'
+
+
+def test_trusted_author_is_not_approved_when_reported():
+    index = AuthorIndex(min_items=3, approve_ratio=0.0)
+    record_many(index, 'regular', 'APPROVE', 3, 't1_')
+    assert index.fast_decision('regular')['action'] == 'APPROVE'
+    assert index.fast_decision('regular', allow_approve=False) is None
+
+
+def test_mixed_history_is_escalated():
+    index = AuthorIndex(min_items=4, remove_ratio=0.9, approve_ratio=0.0)
+    record_many(index, 'mixed', 'REMOVE', 3, 'r')
+    record_many(index, 'mixed', 'APPROVE', 2, 'a')
+    assert index.fast_decision('mixed') is None
+
+
+def test_changed_action_replaces_earlier_outcome():
+    index = AuthorIndex(min_items=1)
+    index.record('author', 'REMOVE', 't1_x')
+    index.record('author', 'APPROVE', 't1_x')
+    stats = index.lookup('author')
+    assert (stats['approvals'], stats['removals'], stats['recent_items']) == (1, 0, 1)
+
+
+def test_ignored_authors_and_actions():
+    index = AuthorIndex()
+    index.record('[deleted]', 'REMOVE', 't1_a')
+    index.record(None, 'REMOVE', 't1_b')
+    index.record('author', 'SKIP', 't1_c')
+    assert index.stats()['authors'] == 0
+
+
+def test_workers_sharing_a_file_add_to_each_other(tmp_path):
+    path = str(tmp_path / 'authors.sqlite')
+    first = AuthorIndex(db_path=path, flush_interval=3600)
+    second = AuthorIndex(db_path=path, flush_interval=3600)
+
+    record_many(first, 'author', 'REMOVE', 3, 'w1_')
+    record_many(second, 'author', 'APPROVE', 2, 'w2_')
+    first.flush()
+    second.flush()
+
+    reloaded = AuthorIndex(db_path=path, flush_interval=3600)
+    stats = reloaded.lookup('author')
+    assert (stats['removals'], stats['approvals'], stats['recent_items']) == (3, 2, 5)
+    for index in (first, second, reloaded):
+        index.close()
+
+
+def test_replaced_outcome_is_corrected_after_write(tmp_path):
+    path = str(tmp_path / 'authors.sqlite')
+    index = AuthorIndex(db_path=path, flush_interval=3600)
+    index.record('author', 'APPROVE', 't1_x')
+    index.flush()
+    index.record('author', 'REMOVE', 't1_x')
+    index.flush()
+
+    stats = AuthorIndex(db_path=path, flush_interval=3600).lookup('author')
+    assert (stats['approvals'], stats['removals']) == (0, 1)
+    assert stats['last_action'] == 'REMOVE'
+
+
+def test_stored_recent_window_is_capped(tmp_path):
+    path = str(tmp_path / 'authors.sqlite')
+    index = AuthorIndex(db_path=path, window=4, flush_interval=3600)
+    record_many(index, 'author', 'REMOVE', 3, 'a')
+    index.flush()
+    record_many(index, 'author', 'APPROVE', 3, 'b')
+    index.flush()
+
+    stats = AuthorIndex(db_path=path, window=4, flush_interval=3600).lookup('author')
+    assert stats['recent_items'] == 4
+    assert stats['recent_removal_ratio'] == 0.25
+
+
+def test_only_model_and_moderator_outcomes_are_recorded(app_module, monkeypatch):
+    app = app_module
+    index = AuthorIndex()
+    monkeypatch.setattr(app, 'author_index', index)
+
+    # Fast-path and local-tier actions must not feed the index that made them
+    app.record_final_action('t1_a', 'REMOVE', author='u', by='auto', success=True, tier='author')
+    app.record_final_action('t1_b', 'REMOVE', author='u', by='auto', success=True, tier='rules')
+    # Analysis errors are passed without a tier, failed actions never count
+    app.record_final_action('t1_c', 'APPROVE', author='u', by='auto', success=True, tier=None)
+    app.record_final_action('t1_d', 'REMOVE', author='u', by='mod', success=False)
+    assert index.lookup('u') is None
+
+    app.record_final_action('t1_e', 'REMOVE', author='u', by='auto', success=True, tier='ai')
+    app.record_final_action('t1_f', 'APPROVE', author='u', by='mod', success=True)
+    stats = index.lookup('u')
+    assert (stats['removals'], stats['approvals']) == (1, 1)
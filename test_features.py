@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for the vectorized page features in features.py.
+"""
+
+from features import extract_features, priority_scores, low_risk_mask
+
+# Text of the spam wave in benchmark_e2e.py
+SPAM_WAVE = "Get free followers today! Visit cheapfollowers{n}.com and use code SAVE{n} for an extra bonus right now"
+
+NOW = 1_700_000_000
+
+
+def make_item(content, score=10, user_reports=(), mod_reports=(), removal_reason=None, item_type='comment'):
+    """Item in the shape built by ModerationDashboard._extract_item."""
+    return {
+        'type': item_type,
+        'title': 'Post title' if item_type == 'submission' else 'Comment on: Post title...',
+        'content': content,
+        'author': 'someone',
+        'subreddit': 'test',
+        'score': score,
+        'created_utc': NOW - 3600,
+        'user_reports': list(user_reports),
+        'mod_reports': list(mod_reports),
+        'reports': list(user_reports) + list(mod_reports),
+        'removal_reason': removal_reason,
+    }
+
+
+def url_counts(*texts):
+    return extract_features([make_item(text) for text in texts], now=NOW)['url_count'].tolist()
+
+
+def test_scheme_and_www_links_are_counted_once():
+    assert url_counts('see https://www.example.com/page',
+                      'see www.example.com',
+                      'see http://localhost:8000',
+                      'no links here') == [1, 1, 1, 0]
+
+
+def test_bare_domains_are_counted_as_links():
+    assert url_counts(SPAM_WAVE.format(n=123),
+                      'mirror at files.example.net and backup.example.io',
+                      'CHECK OUT DEALS.SHOP') == [1, 2, 1]
+
+
+def test_dotted_words_are_not_domains():
+    assert url_counts('i.e. the company.compiler uses node.js',
+                      'ends with a period.',
+                      '.com on its own') == [0, 0, 0]
+
+
+def test_domains_do_not_span_items():
+    # The page buffer joins items with a separator, so neither item ends in a domain
+    assert url_counts('trailing word', 'com is not a domain') == [0, 0]
+
+
+def test_upvoted_spam_wave_is_not_low_risk():
+    features = extract_features([make_item(SPAM_WAVE.format(n=n), score=25) for n in (12, 345, 6789)], now=NOW)
+    assert not low_risk_mask(features).any()
+
+
+def test_low_risk_needs_an_upvoted_quiet_item():
+    items = [
+        make_item('Great write-up, thanks for sharing your build log with us'),
+        make_item('Great write-up, thanks for sharing your build log with us', score=1),
+        make_item('Great write-up, thanks for sharing your build log with us', user_reports=[['spam', 1]]),
+        make_item('Great write-up, thanks for sharing your build log with us', removal_reason='Rule 2'),
+        make_item('GREAT WRITE-UP, THANKS FOR SHARING'),
+    ]
+    assert low_risk_mask(extract_features(items, now=NOW)).tolist() == [True, False, False, False, False]
+
+
+def test_reported_and_linked_items_score_first():
+    items = [
+        make_item('Great write-up, thanks for sharing your build log with us'),
+        make_item(SPAM_WAVE.format(n=42)),
+        make_item('this is spam', user_reports=[['spam', 2]], mod_reports=[['spam', 'mod']]),
+    ]
+    scores = priority_scores(extract_features(items, now=NOW))
+    assert scores.argsort()[::-1].tolist() == [2, 1, 0]
+
+
+def test_empty_page():
+    features = extract_features([], now=NOW)
+    assert low_risk_mask(features).size == 0
+    assert priority_scores(features).size == 0
+
+
+def test_features_tier_never_approves_promotional_text(app_module, monkeypatch):
+    monkeypatch.setattr(app_module.author_index, 'fast_decision', lambda author, allow_approve=True: None)
+    dashboard = app_module.ModerationDashboard()
+
+    # Even if the mask were fooled, promotional phrasing is escalated rather than approved
+    spam = make_item('Get free followers today and use code SAVE10 for an extra bonus right now', score=25)
+    spam['low_risk'] = True
+    assert dashboard.local_decision(spam) is None
+
+    clean = make_item('Great write-up, thanks for sharing your build log with us', score=25)
+    clean['low_risk'] = True
+    assert dashboard.local_decision(clean)['tier'] == 'features'
+
+
+def test_features_tier_approvals_wait_for_a_moderator(app_module, monkeypatch):
+    monkeypatch.setattr(app_module.author_index, 'fast_decision', lambda author, allow_approve=True: None)
+    dashboard = app_module.ModerationDashboard()
+    sent = []
+    monkeypatch.setattr(dashboard, '_send_action', lambda fullname, action: sent.append(fullname) or True)
+    events = []
+    dashboard.emit = lambda event, data: events.append((event, data))
+
+    item = make_item('Great write-up, thanks for sharing your build log with us', score=25)
+    item.update(low_risk=True, fullname='t1_abc')
+    decision = dashboard.local_decision(item)
+    assert decision['tier'] == 'features'
+    assert decision['confidence'] < app_module.AUTO_ACTION_MIN_CONFIDENCE
+
+    dashboard._apply_decisions([(1, item, decision)], human_review=False,
+                               action_limiter=app_module.TokenBucket(rate=100, capacity=10))
+    assert not sent
+    assert events == [('action_result', {
+        'item_number': 1, 'action': 'APPROVE', 'action_taken': False, 'human_review': True,
+        'reason': f"Confidence {decision['confidence']}/10 is below {app_module.AUTO_ACTION_MIN_CONFIDENCE}",
+        'error': None
+    })]
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests that the SQLite stores keep their writes off the gevent hub.
+
+Monkey-patching can't be undone, so the check runs in a subprocess.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SCRIPT = """
+from gevent import monkey
+monkey.patch_all()
+
+import json, os, sys, tempfile
+import author_index
+import decision_store
+from author_index import AuthorIndex
+from decision_store import DecisionStore
+
+get_ident = monkey.get_original('threading', 'get_ident')
+writers = {'store': [], 'index': []}
+connect = decision_store.connect
+
+def recording_connect(*args, **kwargs):
+    writers['index'].append(get_ident())
+    return connect(*args, **kwargs)
+
+real_write_batch = DecisionStore._write_batch
+def write_batch(self, conn, ops):
+    writers['store'].append(get_ident())
+    real_write_batch(self, conn, ops)
+DecisionStore._write_batch = write_batch
+
+directory = tempfile.mkdtemp()
+store = DecisionStore(os.path.join(directory, 'decisions.sqlite'), flush_interval=0.05)
+store.record_decision({'id': 't3_1', 'subreddit': 'test', 'author': 'someone', 'type': 'submission',
+                       'title': 'Title', 'content': 'Body', 'permalink': ''},
+                      {'action': 'APPROVE', 'reason': 'Fine', 'confidence': 9, 'tier': 'ai'})
+assert store.flush(5)
+rows = len(store.history())
+store.close()
+
+index = AuthorIndex(os.path.join(directory, 'authors.sqlite'), flush_interval=60)
+index.record('someone', 'REMOVE', 't3_1')
+author_index.connect = recording_connect
+index.close()
+author_index.connect = connect
+authors = AuthorIndex(os.path.join(directory, 'authors.sqlite')).stats()['authors']
+
+print(json.dumps({'hub': get_ident(), 'writers': writers, 'rows': rows, 'authors': authors}))
+"""
+
+
+def test_sqlite_writes_run_on_os_threads_under_gevent():
+    pytest.importorskip('gevent')
+    result = subprocess.run([sys.executable, '-c', SCRIPT], capture_output=True, text=True,
+                            timeout=60, cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert report['rows'] == 1
+    assert report['authors'] == 1
+    for kind in ('store', 'index'):
+        assert report['writers'][kind]
+        assert report['hub'] not in report['writers'][kind]
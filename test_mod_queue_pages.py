@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for fetching several mod queues in parallel (iter_multi_mod_queue_pages).
+"""
+
+import threading
+import time
+
+
+def endless_queues(app_module, monkeypatch):
+    """Give every subreddit a mod queue that never ends and return the number of pages fetched so far."""
+    fetched = []
+
+    def iter_mod_queue_pages(self, name, headers, limit=None):
+        while True:
+            time.sleep(0.01)
+            fetched.append(name)
+            yield [{'data': {'name': f"t3_{name}{len(fetched)}"}}]
+
+    monkeypatch.setattr(app_module.ModerationDashboard, 'iter_mod_queue_pages', iter_mod_queue_pages)
+    return fetched
+
+
+def wait_for_fetch_threads():
+    deadline = time.monotonic() + 2
+    while any(thread.name.startswith('modqueue-fetch') for thread in threading.enumerate()):
+        assert time.monotonic() < deadline, 'mod queue fetches kept running'
+        time.sleep(0.02)
+
+
+def test_pages_from_every_subreddit_are_yielded(app_module):
+    dashboard = app_module.ModerationDashboard()
+    dashboard.emit = lambda event, data: None
+    pages = {'a': [[1], [2]], 'b': [[3]]}
+    dashboard.iter_mod_queue_pages = lambda name, headers, limit=None: iter(pages[name])
+
+    yielded = list(dashboard.iter_multi_mod_queue_pages(['a', 'b'], {}))
+    assert sorted(yielded) == [[1], [2], [3]]
+
+
+def test_closing_the_generator_stops_fetching(app_module, monkeypatch):
+    fetched = endless_queues(app_module, monkeypatch)
+    dashboard = app_module.ModerationDashboard()
+    stream = dashboard.iter_multi_mod_queue_pages(['a', 'b', 'c'], {})
+    next(stream)
+
+    start = time.monotonic()
+    stream.close()
+    assert time.monotonic() - start < 0.5
+    wait_for_fetch_threads()
+    # Only the bounded read-ahead buffer was filled, not whole queues
+    assert len(fetched) < 20
+
+
+def test_cancelling_the_run_stops_fetching(app_module, monkeypatch):
+    endless_queues(app_module, monkeypatch)
+    dashboard = app_module.ModerationDashboard()
+    stream = dashboard.iter_multi_mod_queue_pages(['a', 'b'], {})
+    next(stream)
+
+    dashboard.cancel_event.set()
+    assert list(stream) == []
+    wait_for_fetch_threads()
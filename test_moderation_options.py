@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the moderation options a Socket.IO client can send with start_moderation.
+"""
+
+import pytest
+
+
+def test_client_int_parses_and_rejects(app_module):
+    assert app_module.client_int({}, 'concurrency') is None
+    assert app_module.client_int({'concurrency': None}, 'concurrency') is None
+    assert app_module.client_int({'concurrency': '8'}, 'concurrency') == 8
+    assert app_module.client_int({'limit': 0}, 'limit', minimum=0) == 0
+    for bad in ('eight', [4], True, 0, -3):
+        with pytest.raises(ValueError):
+            app_module.client_int({'concurrency': bad}, 'concurrency')
+
+
+def analysis_workers(app_module, monkeypatch, **kwargs):
+    """Run moderate_subreddit until it creates its analysis pool and return the pool size."""
+    sizes = []
+
+    class RecordingExecutor:
+        def __init__(self, max_workers, **_):
+            sizes.append(max_workers)
+            raise RuntimeError('stop')
+
+    monkeypatch.setattr(app_module, 'PriorityExecutor', RecordingExecutor)
+    dashboard = app_module.ModerationDashboard()
+    dashboard.reddit_token = 'token'
+    dashboard.emit = lambda event, data: None
+    dashboard.moderate_subreddit('test', **kwargs)
+    return sizes[0]
+
+
+def test_workers_never_exceed_possible_batches(app_module, monkeypatch):
+    assert analysis_workers(app_module, monkeypatch, limit=3, max_concurrency=50) == 3
+    assert analysis_workers(app_module, monkeypatch, limit=10, max_concurrency=50, batch_size=4) == 3
+    assert analysis_workers(app_module, monkeypatch, limit=0, max_concurrency=2) == 2
+    assert analysis_workers(app_module, monkeypatch, limit=None) == app_module.AI_MAX_CONCURRENCY
+
+
+def test_start_moderation_rejects_and_caps_client_options(app_module, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(app_module.job_manager, 'submit',
+                        lambda user, key, run, room=None: submitted.append(run) or (_Job(), True))
+    http = app_module.app.test_client()
+    with http.session_transaction() as session:
+        session['authenticated'] = True
+        session['reddit_access_token'] = 'token'
+        session['reddit_username'] = 'mod'
+    client = app_module.socketio.test_client(app_module.app, flask_test_client=http)
+    client.get_received()
+
+    client.emit('start_moderation', {'subreddit': 'test', 'concurrency': '100000x'})
+    errors = [event['args'][0]['message'] for event in client.get_received() if event['name'] == 'error']
+    assert errors and 'concurrency' in errors[0]
+    assert not submitted
+
+    captured = {}
+    monkeypatch.setattr(app_module.ModerationDashboard, 'moderate_subreddit',
+                        lambda self, name, limit, human_review, max_concurrency, batch_size, local_rules:
+                        captured.update(limit=limit, max_concurrency=max_concurrency))
+    client.emit('start_moderation', {'subreddit': 'test', 'limit': '20', 'concurrency': 100000})
+    submitted[0](_Job())
+    assert captured == {'limit': 20, 'max_concurrency': app_module.AI_MAX_CONCURRENCY}
+    client.disconnect()
+
+
+class _Job:
+    job_id = 'job'
+    status = 'queued'
+    cancel_event = None
+
+    def as_dict(self):
+        return {'job_id': self.job_id, 'status': self.status}
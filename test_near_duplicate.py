@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the SimHash near-duplicate index and the exact-match decision cache.
+"""
+
+from decision_cache import DecisionCache, make_cache_key
+from near_duplicate import NearDuplicateIndex, simhash
+
+SPAM = "Grow your account overnight! Visit cheapfollowers123.com and use code SAVE for 50% off"
+SPAM_EDIT = "Grow your account overnight! Visit cheapfollowers124.com and use code SAVE for 50% off"
+OTHER = "Does anyone know a good recipe for sourdough that doesn't need a starter?"
+
+REMOVE = {'action': 'REMOVE', 'reason': 'Spam', 'confidence': 9}
+ERROR = {'action': 'APPROVE', 'reason': 'Error in analysis: timeout', 'confidence': 1, 'error': True}
+
+
+def test_simhash_is_close_for_small_edits():
+    distance = bin(simhash(SPAM) ^ simhash(SPAM_EDIT)).count('1')
+    assert distance <= 6
+    assert bin(simhash(SPAM) ^ simhash(OTHER)).count('1') > 6
+
+
+def test_near_duplicate_reuses_decision_in_same_subreddit_only():
+    index = NearDuplicateIndex(capacity=16)
+    assert index.add(SPAM, 'sub', REMOVE, ref='t1_a')
+
+    match = index.find(SPAM_EDIT, 'Sub')
+    assert match['action'] == 'REMOVE'
+    assert match['dedup_of'] == 't1_a'
+    assert index.find(SPAM_EDIT, 'othersub') is None
+    assert index.find(OTHER, 'sub') is None
+
+
+def test_error_and_low_confidence_decisions_are_not_indexed():
+    index = NearDuplicateIndex(capacity=16)
+    assert not index.add(SPAM, 'sub', ERROR)
+    assert not index.add(SPAM, 'sub', {'action': 'APPROVE', 'reason': 'unsure', 'confidence': 1})
+    assert index.find(SPAM_EDIT, 'sub') is None
+    assert index.stats()['size'] == 0
+
+
+def test_short_texts_are_not_indexed():
+    index = NearDuplicateIndex(capacity=16)
+    assert not index.add('buy now', 'sub', REMOVE)
+
+
+def test_ring_buffer_overwrites_oldest():
+    index = NearDuplicateIndex(capacity=2)
+    for n in range(3):
+        index.add(f"{OTHER} variant number {n} with some extra words", 'sub', REMOVE, ref=str(n))
+    assert index.stats()['size'] == 2
+
+
+def test_expired_decisions_are_not_reused():
+    index = NearDuplicateIndex(capacity=16, ttl=0)
+    index.add(SPAM, 'sub', REMOVE)
+    assert index.find(SPAM, 'sub') is None
+
+
+def test_decision_cache_skips_errors():
+    cache = DecisionCache(max_size=4)
+    key = make_cache_key('sub', 'title', 'body', '1', 'model')
+    assert not cache.set(key, ERROR)
+    assert cache.get(key) is None
+    assert cache.set(key, REMOVE)
+    assert cache.get(key) == REMOVE
+
+
+def test_decision_cache_lru_and_persistence(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = DecisionCache(max_size=2, db_path=path)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, REMOVE)
+    assert 'a' not in cache._entries
+
+    reopened = DecisionCache(max_size=2, db_path=path)
+    assert reopened.get('c') == REMOVE
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental polling state in queue_tracker.py and how
+RedditModerator.poll_mod_queue uses it.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from queue_tracker import SeenSet, AdaptiveInterval, content_hash
+
+
+def submission(number, text='text'):
+    return SimpleNamespace(fullname=f"t3_{number}", title=f"Post {number}", selftext=text)
+
+
+def test_content_hash_follows_the_moderated_text():
+    post = submission(1)
+    digest = content_hash(post)
+    assert digest == content_hash(submission(1))
+    post.selftext = 'edited'
+    assert content_hash(post) != digest
+
+    comment = SimpleNamespace(fullname='t1_1', body='text')
+    assert content_hash(comment) != digest
+
+
+def test_seen_set_classifies_new_edited_and_seen():
+    seen = SeenSet()
+    assert seen.status('t3_1', 'a') == SeenSet.NEW
+    seen.add('t3_1', 'a')
+    assert seen.status('t3_1', 'a') == SeenSet.SEEN
+    assert seen.status('t3_1', 'b') == SeenSet.EDITED
+    assert seen.pending_decision('t3_1') is None
+
+    decision = {'action': 'REMOVE'}
+    seen.add('t3_1', 'a', pending_decision=decision)
+    assert seen.pending_decision('t3_1') is decision
+    assert seen.pending_decision('t3_2') is None
+
+
+def test_seen_set_forgets_least_recently_seen_first():
+    seen = SeenSet(max_size=2)
+    seen.add('t3_1', 'a')
+    seen.add('t3_2', 'b')
+    seen.status('t3_1', 'a')  # Touching an item keeps it
+    seen.add('t3_3', 'c')
+    assert len(seen) == 2
+    assert seen.status('t3_2', 'b') == SeenSet.NEW
+    assert seen.status('t3_1', 'a') == SeenSet.SEEN
+
+
+def test_adaptive_interval_follows_arrival_rate():
+    interval = AdaptiveInterval(min_interval=30, max_interval=300, target_items=10, smoothing=0.5)
+    # 10 items in 100 seconds: polling every 100 seconds finds the target
+    assert interval.update(10, 100) == 100
+    # The rate is smoothed: 0.5 * 0.5 + 0.5 * 0.1 items/s
+    assert interval.update(50, 100) == pytest.approx(10 / 0.3)
+    assert interval.update(1000, 100) == 30  # Clamped to min_interval
+
+
+def test_adaptive_interval_backs_off_when_quiet_and_hurries_on_backlog():
+    interval = AdaptiveInterval(min_interval=30, max_interval=300)
+    assert interval.update(0, 60) == 300
+    assert interval.update(0, 0) == 300
+    assert interval.update(0, 60, backlog=True) == 30
+
+
+class FakeModqueue:
+    """Mod queue that pages like Reddit: acted-on items leave it, and a cursor that left it ends the listing."""
+
+    def __init__(self, items, page_size=100):
+        self.items = list(items)
+        self.page_size = page_size
+
+    def modqueue(self, limit=None):
+        after = None
+        while True:
+            names = [item.fullname for item in self.items]
+            if after is not None and after not in names:
+                return
+            start = names.index(after) + 1 if after else 0
+            page = self.items[start:start + self.page_size]
+            if not page:
+                return
+            yield from page
+            after = page[-1].fullname
+
+
+@pytest.fixture
+def moderator(monkeypatch, tmp_path):
+    # The module logs to a file in the working directory
+    monkeypatch.chdir(tmp_path)
+    reddit_moderator = pytest.importorskip('reddit_moderator')
+
+    bot = object.__new__(reddit_moderator.RedditModerator)
+    bot.queue = FakeModqueue([])
+    bot.subreddit = SimpleNamespace(mod=bot.queue)
+    bot.reddit = SimpleNamespace(auth=SimpleNamespace(limits={}))
+    bot.action_limiter = SimpleNamespace(acquire=lambda timeout=None: True)
+    bot.seen = SeenSet()
+    bot.analyzed = []
+    bot.analyze_content = lambda item: bot.analyzed.append(item.fullname) or {'action': 'APPROVE'}
+    bot.moderate_item = lambda item, decision: True
+    return bot
+
+
+def test_poll_skips_unchanged_items(moderator):
+    moderator.queue.items = [submission(n) for n in range(3)]
+    assert moderator.poll_mod_queue(page_size=10)['new'] == 3
+
+    moderator.queue.items[1].selftext = 'edited'
+    counts = moderator.poll_mod_queue(page_size=10)
+    assert (counts['fetched'], counts['new'], counts['edited'], counts['acted']) == (3, 0, 1, 1)
+    assert moderator.analyzed == ['t3_0', 't3_1', 't3_2', 't3_1']
+
+
+def test_poll_retries_failed_actions_without_reanalyzing(moderator):
+    moderator.queue.items = [submission(1)]
+    moderator.moderate_item = lambda item, decision: False
+    assert moderator.poll_mod_queue()['failed'] == 1
+
+    acted = []
+    moderator.moderate_item = lambda item, decision: acted.append(decision) or True
+    assert moderator.poll_mod_queue()['acted'] == 1
+    assert acted == [{'action': 'APPROVE'}]
+    assert moderator.analyzed == ['t3_1']
+
+
+def test_poll_pages_through_whole_backlog_when_actions_empty_the_queue(moderator):
+    moderator.queue = FakeModqueue([submission(n) for n in range(25)], page_size=10)
+    moderator.subreddit = SimpleNamespace(mod=moderator.queue)
+    moderator.moderate_item = lambda item, decision: moderator.queue.items.remove(item) or True
+
+    counts = moderator.poll_mod_queue(page_size=10)
+    assert counts['backlog'] == 1
+    assert counts['acted'] == 25
+    assert not moderator.queue.items
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the token-bucket scheduler in rate_limiter.py.
+"""
+
+import threading
+import time
+
+from rate_limiter import TokenBucket
+
+
+def test_starts_full_and_bursts():
+    bucket = TokenBucket(rate=1, capacity=5)
+    start = time.monotonic()
+    for _ in range(5):
+        assert bucket.acquire(timeout=0)
+    assert time.monotonic() - start < 0.1
+    assert bucket.stats()['acquired'] == 5
+
+
+def test_waits_for_refill_once_empty():
+    bucket = TokenBucket(rate=20, capacity=1)
+    assert bucket.acquire()
+    start = time.monotonic()
+    assert bucket.acquire()
+    assert 0.03 <= time.monotonic() - start < 0.5
+
+
+def test_acquire_times_out():
+    bucket = TokenBucket(rate=0.1, capacity=1)
+    assert bucket.acquire()
+    start = time.monotonic()
+    assert not bucket.acquire(timeout=0.05)
+    assert time.monotonic() - start < 0.5
+
+
+def test_tune_spreads_remaining_budget_over_window():
+    bucket = TokenBucket(rate=1, capacity=60, max_burst=60)
+    bucket.tune(remaining=100, reset_in=50)
+    stats = bucket.stats()
+    assert stats['rate'] == 2
+    assert stats['capacity'] == 60  # Capped by max_burst
+
+    bucket.tune(remaining=3, reset_in=30)
+    stats = bucket.stats()
+    assert stats['capacity'] == 3
+    assert stats['available'] <= 3
+
+
+def test_tune_keeps_a_minimum_rate_when_budget_is_gone():
+    bucket = TokenBucket(rate=1, capacity=10, min_rate=0.5)
+    bucket.tune(remaining=0, reset_in=600)
+    stats = bucket.stats()
+    assert stats['rate'] == 0.5
+    assert stats['capacity'] == 1
+    assert stats['available'] < 1
+
+
+def test_tune_ignores_expired_windows():
+    bucket = TokenBucket(rate=1, capacity=10)
+    bucket.tune(remaining=0, reset_in=0)
+    assert bucket.stats()['rate'] == 1
+
+
+def test_tune_wakes_waiters():
+    bucket = TokenBucket(rate=0.01, capacity=1, max_burst=10)
+    assert bucket.acquire()
+    acquired = threading.Event()
+    waiter = threading.Thread(target=lambda: bucket.acquire(timeout=5) and acquired.set())
+    waiter.start()
+    time.sleep(0.05)
+    assert bucket.stats()['queue_depth'] == 1
+
+    # A fresh window with plenty of budget lets the waiter through without waiting out the old rate
+    bucket.tune(remaining=1000, reset_in=10)
+    assert acquired.wait(1)
+    waiter.join()
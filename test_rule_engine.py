@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled moderation rules in rule_engine.py.
+"""
+
+from rule_engine import RuleEngine
+
+engine = RuleEngine()
+
+# Default of app.LOCAL_RULES_MIN_CONFIDENCE
+LOCAL_RULES_MIN_CONFIDENCE = 8
+
+
+def test_spam_phrase_is_removed():
+    decision = engine.evaluate('click here for free stuff')
+    assert decision['action'] == 'remove'
+    assert 'click here' in decision['reason']
+
+
+def test_url_pattern_only_runs_behind_its_guard():
+    assert engine.spam_match('see www.example.com for details') is not None
+    assert engine.spam_match('see https://example.com') is not None
+    assert engine.spam_match('no links in this one') is None
+
+
+def test_hate_speech_needs_threshold_phrases():
+    assert engine.evaluate('i hate mondays')['action'] == 'approve'
+    assert engine.evaluate('i hate you, kys')['action'] == 'remove'
+
+
+def test_short_submission_is_low_effort_but_short_comment_is_not():
+    assert engine.evaluate('meh', is_submission=True)['action'] == 'remove'
+    assert engine.evaluate('meh')['action'] == 'approve'
+
+
+def test_caps_lock_rule():
+    assert engine.evaluate('THIS IS ALL SHOUTING')['action'] == 'remove'
+    assert engine.evaluate('This is Normal text')['action'] == 'approve'
+
+
+def test_caps_count_handles_non_ascii():
+    assert engine.caps_count('ÉCOLE école') == 5
+    assert engine.caps_count('all lower') == 0
+
+
+def test_triage_removes_promo_with_link_confidently():
+    decision = engine.triage('Use code SAVE20 at www.cheapfollowers123.com')
+    assert decision['action'] == 'REMOVE'
+    assert decision['confidence'] >= 8
+
+
+def test_triage_removes_multiple_promo_phrases():
+    decision = engine.triage('Free shipping today, use code SAVE20')
+    assert decision['action'] == 'REMOVE'
+    assert decision['confidence'] >= 8
+
+
+def test_triage_never_approves_at_the_local_threshold():
+    # Clean text may still break subreddit rules (off-topic, harassment), so it is escalated
+    for text in ('honestly this place is a joke and everyone here is clueless',
+                 'Great write-up, thanks for sharing your build log with us'):
+        decision = engine.triage(text)
+        assert decision['action'] == 'APPROVE'
+        assert decision['confidence'] < LOCAL_RULES_MIN_CONFIDENCE
+
+
+def test_triage_falls_back_to_rules_with_low_confidence():
+    decision = engine.triage('i hate you, kys')
+    assert decision['action'] == 'REMOVE'
+    assert decision['confidence'] < 8
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the priority executor and per-band latency stats in scheduler.py.
+"""
+
+import threading
+
+import pytest
+
+from scheduler import PriorityExecutor, LatencyStats, priority_band
+
+
+def test_priority_bands():
+    assert priority_band(12.0) == 'critical'
+    assert priority_band(6.0) == 'critical'
+    assert priority_band(3.5) == 'high'
+    assert priority_band(1.0) == 'normal'
+    assert priority_band(0.0) == 'low'
+    assert priority_band(-4.0) == 'low'
+
+
+def test_highest_priority_pending_work_runs_first():
+    order = []
+    release = threading.Event()
+    with PriorityExecutor(max_workers=1) as executor:
+        # Hold the only worker so everything else queues up
+        executor.submit(100, release.wait, 5)
+        for priority, name in ((1, 'low-a'), (9, 'critical'), (4, 'high'), (1, 'low-b')):
+            executor.submit(priority, order.append, name)
+        release.set()
+    assert order == ['critical', 'high', 'low-a', 'low-b']
+
+
+def test_futures_carry_results_and_exceptions():
+    def fail():
+        raise ValueError('boom')
+
+    with PriorityExecutor(max_workers=2) as executor:
+        ok = executor.submit(1, lambda a, b=0: a + b, 2, b=3)
+        bad = executor.submit(1, fail)
+    assert ok.result() == 5
+    with pytest.raises(ValueError):
+        bad.result()
+
+
+def test_shutdown_can_cancel_pending_work():
+    started = threading.Event()
+    release = threading.Event()
+    executor = PriorityExecutor(max_workers=1)
+    running = executor.submit(1, lambda: started.set() or release.wait(5))
+    assert started.wait(1)
+    pending = [executor.submit(1, lambda: None) for _ in range(3)]
+    threading.Timer(0.05, release.set).start()
+    executor.shutdown(wait=True, cancel_futures=True)
+    assert running.result() is True
+    assert all(future.cancelled() for future in pending)
+
+
+def test_latency_stats_per_band_in_band_order():
+    stats = LatencyStats(window=3)
+    for seconds in (0.4, 0.1, 0.2, 0.3):
+        stats.record('normal', seconds)
+    stats.record('critical', 0.05)
+
+    result = stats.stats()
+    assert list(result) == ['critical', 'normal']
+    # Count includes every sample; percentiles only the most recent window
+    assert result['normal'] == {'count': 4, 'p50': 0.2, 'p95': 0.3, 'max': 0.3}
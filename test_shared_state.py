@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared key-value stores and the job manager built on them.
+"""
+
+import threading
+import time
+
+import pytest
+
+from job_manager import JobManager, JobQueueFull
+from shared_state import MemoryStore, create_store
+
+
+def test_memory_store_set_get_delete():
+    store = MemoryStore()
+    store.set('key', {'a': [1, 2]})
+    assert store.get('key') == {'a': [1, 2]}
+    store.delete('key')
+    assert store.get('key') is None
+
+
+def test_memory_store_ttl_expires():
+    store = MemoryStore()
+    store.set('credentials:mod:openai', 'sk-test', ttl=0.05)
+    assert store.get('credentials:mod:openai') == 'sk-test'
+    time.sleep(0.1)
+    assert store.get('credentials:mod:openai') is None
+
+
+def test_memory_store_nx_only_sets_missing_keys():
+    store = MemoryStore()
+    assert store.set('claim', 'first', nx=True)
+    assert not store.set('claim', 'second', nx=True)
+    assert store.get('claim') == 'first'
+
+
+def test_memory_store_nx_succeeds_after_expiry():
+    store = MemoryStore()
+    store.set('claim', 'first', ttl=0.05, nx=True)
+    time.sleep(0.1)
+    assert store.set('claim', 'second', nx=True)
+
+
+def test_memory_store_sets():
+    store = MemoryStore()
+    store.sadd('jobs', 'a')
+    store.sadd('jobs', 'b')
+    store.srem('jobs', 'a')
+    assert store.smembers('jobs') == {'b'}
+
+
+def test_create_store_rejects_unknown_urls():
+    assert isinstance(create_store(None), MemoryStore)
+    assert isinstance(create_store('memory://'), MemoryStore)
+    with pytest.raises(ValueError):
+        create_store('postgres://localhost/db')
+
+
+def test_redis_store_ttl_against_mini_redis():
+    pytest.importorskip('redis')
+    from mini_redis import MiniRedisServer
+
+    server = MiniRedisServer(('127.0.0.1', 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        store = create_store(f"redis://127.0.0.1:{server.server_address[1]}/0")
+        store.set('credentials:mod:openai', 'sk-test', ttl=0.1)
+        assert store.get('credentials:mod:openai') == 'sk-test'
+        time.sleep(0.2)
+        assert store.get('credentials:mod:openai') is None
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_job_manager_deduplicates_active_jobs():
+    manager = JobManager(max_workers=1, max_queued=5)
+    release = threading.Event()
+    first, created = manager.submit('mod', 'Sub', lambda job: release.wait(5))
+    assert created
+    duplicate, created = manager.submit('mod', 'sub', lambda job: None)
+    assert not created
+    assert duplicate.job_id == first.job_id
+    release.set()
+
+
+def test_job_manager_queue_limit_and_cancel():
+    manager = JobManager(max_workers=1, max_queued=1)
+    release = threading.Event()
+    manager.submit('mod', 'running', lambda job: release.wait(5))
+    time.sleep(0.05)
+    queued, _ = manager.submit('mod', 'queued', lambda job: None)
+    with pytest.raises(JobQueueFull):
+        manager.submit('mod', 'overflow', lambda job: None)
+
+    assert manager.cancel(queued.job_id, user='mod')
+    assert manager.get(queued.job_id).status == 'cancelled'
+    assert not manager.cancel(queued.job_id)
+    release.set()
+
+
+def test_cancel_from_another_worker_is_seen_through_the_store():
+    store = MemoryStore()
+    owner = JobManager(max_workers=1, store=store)
+    other = JobManager(max_workers=1, store=store)
+    started = threading.Event()
+    seen = threading.Event()
+
+    def target(job):
+        started.set()
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if job.cancel_event.is_set():
+                seen.set()
+                return
+            time.sleep(0.01)
+
+    job, _ = owner.submit('mod', 'sub', target)
+    assert started.wait(2)
+    assert other.cancel(job.job_id)
+    assert seen.wait(2)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Timing spans for the moderation pipeline.
+
+Each stage (token fetch, mod queue page, item extraction, AI call,
+moderation action, socket emit) runs inside a named span:
+
+    with tracer.span('reddit.modqueue_page', job_id=job_id, page=3) as span:
+        response = ...
+        span.set(items=len(children))
+
+Spans are timed with time.perf_counter(), nest per thread (a span started
+inside another records it as its parent) and carry whatever attributes the
+caller attaches, such as job and item ids. The tracer keeps count, error
+count and recent-duration percentiles per span name, and can append every
+finished span as one JSON line to a file; lines are written in batches by a
+background thread so tracing doesn't add file I/O to the hot path.
+"""
+
+import atexit
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, Any
+
+
+class Span:
+    """One timed stage. Use through Tracer.span()."""
+
+    __slots__ = ('tracer', 'name', 'attrs', 'span_id', 'parent_id', 'log', 'start', 'started_at', 'duration',
+                 'error')
+
+    def __init__(self, tracer: 'Tracer', name: str, attrs: Dict[str, Any], log: bool):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.log = log
+        self.span_id = next(tracer._ids)
+        self.parent_id = None
+        self.start = None
+        self.started_at = None
+        self.duration = None
+        self.error = None
+
+    def set(self, **attrs):
+        """Attach attributes to the span."""
+        self.attrs.update(attrs)
+
+    def fail(self, exc: BaseException):
+        """Mark the span failed by an exception that was handled inside it."""
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the span started (its duration once finished)."""
+        return self.duration if self.duration is not None else time.perf_counter() - self.start
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        self.parent_id = stack[-1].span_id if stack else None
+        stack.append(self)
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None and self.error is None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        stack = self.tracer._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        self.tracer._finish(self)
+        return False
+
+    def as_dict(self) -> Dict[str, Any]:
+        record = {
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start': round(self.started_at, 6),
+            'duration_ms': round(self.duration * 1000, 3),
+            'thread': threading.current_thread().name,
+            'attrs': self.attrs
+        }
+        if self.error:
+            record['error'] = self.error
+        return record
+
+
+class Tracer:
+    """Thread-safe span recorder with per-stage stats and optional JSON lines export."""
+
+    def __init__(self, export_path: Optional[str] = None, window: int = 1000, flush_interval: float = 1.0,
+                 max_buffer: int = 100000):
+        """
+        Initialize the tracer.
+
+        Args:
+            export_path: File that finished spans are appended to as JSON lines (no export if None)
+            window: Recent durations kept per span name for percentiles
+            flush_interval: Seconds between background writes of the export buffer
+            max_buffer: Spans buffered for export before new ones are dropped
+        """
+        self.export_path = export_path
+        self.window = window
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._stages = {}
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        if export_path:
+            threading.Thread(target=self._flush_loop, name='trace-writer', daemon=True).start()
+            atexit.register(self.close)
+
+    def span(self, name: str, log: bool = False, **attrs) -> Span:
+        """
+        Create a span to use as a context manager.
+
+        Args:
+            name: Stage name, e.g. 'openai.analyze'
+            log: Also print the span as a [PERF] line when it finishes
+            **attrs: Attributes such as job_id, fullname or subreddit
+
+        Returns:
+            The span (entered with ``with``)
+        """
+        return Span(self, name, attrs, log)
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _finish(self, span: Span):
+        with self._lock:
+            stage = self._stages.get(span.name)
+            if stage is None:
+                stage = self._stages[span.name] = {'count': 0, 'errors': 0, 'total': 0.0,
+                                                   'recent': deque(maxlen=self.window)}
+            stage['count'] += 1
+            stage['errors'] += span.error is not None
+            stage['total'] += span.duration
+            stage['recent'].append(span.duration)
+            if self.export_path:
+                if len(self._buffer) < self.max_buffer:
+                    self._buffer.append(span.as_dict())
+                else:
+                    self.dropped += 1
+
+        if span.log:
+            details = ' '.join(f"{key}={value}" for key, value in span.attrs.items() if value is not None)
+            status = f" failed ({span.error})" if span.error else ''
+            print(f"[PERF] {span.name} took {span.duration:.2f} seconds{status} {details}".rstrip())
+
+    def _flush_loop(self):
+        """Write buffered spans every flush_interval seconds."""
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Append buffered spans to the export file."""
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if not records or not self.export_path:
+            return
+        try:
+            with open(self.export_path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(record, default=str) + '\n' for record in records))
+        except OSError as e:
+            print(f"[ERROR] Writing {len(records)} trace span(s) to {self.export_path} failed: {e}")
+
+    def close(self):
+        """Stop the background writer and write pending spans."""
+        self._stop.set()
+        self.flush()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return count, errors, mean and p50/p95/max duration (seconds) per span name."""
+        with self._lock:
+            stages = {name: (stage['count'], stage['errors'], stage['total'], sorted(stage['recent']))
+                      for name, stage in self._stages.items()}
+
+        result = {}
+        for name, (count, errors, total, recent) in sorted(stages.items()):
+            result[name] = {
+                'count': count,
+                'errors': errors,
+                'mean': round(total / count, 4),
+                'p50': round(recent[len(recent) // 2], 4),
+                'p95': round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 4),
+                'max': round(recent[-1], 4)
+            }
+        return result